@@ -2,6 +2,7 @@
 
 from typing import Dict, List  # noqa: F401
 import importlib
+import os
 import pkgutil
 import logging
 
@@ -25,6 +26,7 @@ from fastapi import (  # noqa: F401
     Request,
 )
 
+from fastapi.responses import FileResponse
 from models.extra_models import TokenModel  # noqa: F401
 from pydantic import Field, StrictStr
 from typing import Any, Optional
@@ -38,9 +40,12 @@ from models.affirmation.create_affirmation_request import CreateAffirmationReque
 from models.affirmation.edit_affirmation200_response import EditAffirmation200Response
 from models.affirmation.edit_affirmation404_response import EditAffirmation404Response
 from models.affirmation.edit_affirmation_request import EditAffirmationRequest
+from models.affirmation.get_affirmation_audio200_response import GetAffirmationAudio200Response
+from models.affirmation.get_affirmation_feed200_response import GetAffirmationFeed200Response
 from models.affirmation.get_affirmations200_response import GetAffirmations200Response
 from models.affirmation.get_affirmations401_response import GetAffirmations401Response
 from models.affirmation.schedule_affirmation200_response import ScheduleAffirmation200Response
+from models.affirmation.record_affirmation_event_request import RecordAffirmationEventRequest
 from models.affirmation.schedule_affirmation_request import ScheduleAffirmationRequest
 from security_api import get_token_bearerAuth
 
@@ -283,6 +288,8 @@ async def edit_affirmation(
 async def get_affirmations(
     category: Annotated[Optional[AffirmationCategory], Field(description="Filter by affirmation category")] = Query(None, description="Filter by affirmation category", alias="category"),
     scheduled_only: Annotated[Optional[bool], Field(description="Return only scheduled affirmations")] = Query(False, description="Return only scheduled affirmations", alias="scheduled_only"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    response: Response = None,
     token_bearerAuth: TokenModel = Security(
         get_token_bearerAuth
     ),
@@ -302,6 +309,10 @@ async def get_affirmations(
         # Get user_id from token
         user_id = int(token_bearerAuth.sub)
         
+        from impl.services.collection_etags import collection_etag, etag_matches, not_modified, set_etag_headers
+        from db.models.collection_version import AFFIRMATIONS
+        from impl.services.affirmations.get_affirmations_service import GetAffirmationsService
+        
         # Create request object for filters
         class GetAffirmationsRequest:
             def __init__(self):
@@ -311,9 +322,74 @@ async def get_affirmations(
         
         request = GetAffirmationsRequest()
         
+        # Version and rows from the same server, so the ETag describes the rows served
+        with services.session_factory().pinned_reads():
+            # Unchanged since the client's copy: answer from the version counter alone
+            etag = collection_etag(services, user_id, AFFIRMATIONS, category, scheduled_only)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            
+            service = GetAffirmationsService(
+                request=request,
+                dependencies=services
+            )
+        
+        set_etag_headers(response, etag)
+        return service.response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get(
+    "/affirmations/feed",
+    responses={
+        200: {"model": GetAffirmationFeed200Response, "description": "Next affirmations to show"},
+        400: {"model": CreateAffirmation400Response, "description": "Bad request"},
+        401: {"model": GetAffirmations401Response, "description": "Unauthorized"},
+    },
+    tags=["Affirmations"],
+    summary="Get the spaced-repetition affirmation feed",
+    response_model_by_alias=True,
+)
+async def get_affirmation_feed(
+    limit: Annotated[int, Field(le=100, ge=1)] = Query(20, ge=1, le=100, description="Number of affirmations to return"),
+    cursor: Optional[StrictStr] = Query(None, description="next_cursor from the previous page"),
+    category: Annotated[Optional[AffirmationCategory], Field(description="Filter by affirmation category")] = Query(None, description="Filter by affirmation category", alias="category"),
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    services: Services = Depends(get_services),
+) -> GetAffirmationFeed200Response:
+    """Next affirmations to show, most overdue for review first"""
+    if token_bearerAuth is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid bearer token",
+        )
+    
+    try:
+        logger.debug("get_affirmation_feed is called")
+        logger.debug(f"limit: {limit}, cursor: {cursor}, category: {category}")
+        
+        # Get user_id from token
+        user_id = int(token_bearerAuth.sub)
+        
+        # Create request object
+        class GetAffirmationFeedRequest:
+            def __init__(self):
+                self.user_id = user_id
+                self.limit = limit
+                self.cursor = cursor
+                self.category = category
+        
+        request = GetAffirmationFeedRequest()
+        
         # Import and use the service
-        from impl.services.affirmations.get_affirmations_service import GetAffirmationsService
-        service = GetAffirmationsService(
+        from impl.services.affirmations.get_affirmation_feed_service import GetAffirmationFeedService
+        service = GetAffirmationFeedService(
             request=request,
             dependencies=services
         )
@@ -439,4 +515,174 @@ async def unschedule_affirmation(
         raise
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.post(
+    "/affirmations/{affirmation_id}/events",
+    responses={
+        202: {"description": "Event accepted"},
+        400: {"model": CreateAffirmation400Response, "description": "Bad request"},
+        401: {"model": GetAffirmations401Response, "description": "Unauthorized"},
+    },
+    tags=["Affirmations"],
+    summary="Record that an affirmation was seen or played",
+    response_model_by_alias=True,
+)
+async def record_affirmation_event(
+    affirmation_id: StrictStr = Path(..., description=""),
+    record_affirmation_event_request: RecordAffirmationEventRequest = Body(..., description=""),
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    services: Services = Depends(get_services),
+) -> None:
+    """Count a view or play; counters are written in the background"""
+    if token_bearerAuth is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid bearer token",
+        )
+    
+    try:
+        logger.debug("record_affirmation_event is called")
+        logger.debug(f"affirmation_id: {affirmation_id}, event: {record_affirmation_event_request.event}")
+        
+        # Get user_id from token
+        user_id = int(token_bearerAuth.sub)
+        
+        # Create request object
+        class RecordEventRequest:
+            def __init__(self):
+                self.affirmation_id = int(affirmation_id)
+                self.user_id = user_id
+                self.event = record_affirmation_event_request.event
+                self.occurred_at = record_affirmation_event_request.occurred_at
+        
+        request = RecordEventRequest()
+        
+        # Import and use the service
+        from impl.services.affirmations.record_affirmation_event_service import RecordAffirmationEventService
+        RecordAffirmationEventService(
+            request=request,
+            dependencies=services
+        )
+        
+        return Response(status_code=status.HTTP_202_ACCEPTED)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get(
+    "/affirmations/{affirmation_id}/audio",
+    responses={
+        200: {"model": GetAffirmationAudio200Response, "description": "Audio is ready"},
+        202: {"model": GetAffirmationAudio200Response, "description": "Audio is being synthesized"},
+        401: {"model": GetAffirmations401Response, "description": "Unauthorized"},
+        404: {"model": EditAffirmation404Response, "description": "Resource not found"},
+    },
+    tags=["Affirmations"],
+    summary="Get the voice audio of an affirmation",
+    response_model_by_alias=True,
+)
+async def get_affirmation_audio(
+    affirmation_id: StrictStr = Path(..., description=""),
+    response: Response = None,
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    services: Services = Depends(get_services),
+) -> GetAffirmationAudio200Response:
+    """Locate the affirmation's audio file; queues synthesis if it does not exist yet"""
+    if token_bearerAuth is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid bearer token",
+        )
+    
+    try:
+        logger.debug("get_affirmation_audio is called")
+        logger.debug(f"affirmation_id: {affirmation_id}")
+        
+        # Get user_id from token
+        user_id = int(token_bearerAuth.sub)
+        
+        # Create request object
+        class GetAudioRequest:
+            def __init__(self):
+                self.affirmation_id = int(affirmation_id)
+                self.user_id = user_id
+        
+        request = GetAudioRequest()
+        
+        # Import and use the service
+        from impl.services.affirmations.get_affirmation_audio_service import GetAffirmationAudioService
+        service = GetAffirmationAudioService(
+            request=request,
+            dependencies=services
+        )
+        
+        if service.response.status == "pending":
+            response.status_code = status.HTTP_202_ACCEPTED
+            response.headers["Retry-After"] = "2"
+        return service.response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get(
+    "/affirmations/audio/{audio_key}",
+    responses={
+        200: {"description": "Audio file"},
+        206: {"description": "Requested byte range of the audio file"},
+        401: {"model": GetAffirmations401Response, "description": "Unauthorized"},
+        404: {"model": EditAffirmation404Response, "description": "Resource not found"},
+    },
+    tags=["Affirmations"],
+    summary="Stream affirmation audio",
+    response_model_by_alias=True,
+)
+async def stream_affirmation_audio(
+    audio_key: StrictStr = Path(..., description="Content-addressed audio key"),
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    services: Services = Depends(get_services),
+):
+    """Serve an audio file with Range support; keys are content hashes, so responses never change"""
+    if token_bearerAuth is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid bearer token",
+        )
+    
+    from impl.services.affirmations.affirmation_audio import AUDIO_KEY_RE
+    if not AUDIO_KEY_RE.match(audio_key):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
+    
+    audio_cache = services.affirmation_audio_cache()
+    
+    # Files are shared across users; only serve keys one of the caller's own affirmations maps to
+    session = services.session_factory()()
+    try:
+        voices = services.affirmation_repository(session=session).get_user_voices(int(token_bearerAuth.sub))
+    finally:
+        session.close()
+    if not any(audio_cache.key_for(content, voice_id) == audio_key for content, voice_id in voices):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
+    
+    path = audio_cache.path_for_key(audio_key)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
+    
+    # FileResponse streams from disk (sendfile where the server supports it) and handles Range
+    return FileResponse(
+        path,
+        media_type=audio_cache.media_type,
+        headers={"Cache-Control": "private, max-age=31536000, immutable"},
+    )
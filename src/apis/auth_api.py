@@ -5,7 +5,7 @@
 import logging
 logger = logging.getLogger(__name__)
 
-from typing import Dict, List  # noqa: F401
+from typing import Dict, List, Optional  # noqa: F401
 import importlib
 import pkgutil
 from pydantic import Field, StrictStr, StrictInt
@@ -27,6 +27,8 @@ from fastapi import (  # noqa: F401
     Security,
     status,
 )
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials
 
 from models.extra_models import TokenModel  # noqa: F401
 from models.auth_login_post200_response import AuthLoginPost200Response
@@ -45,12 +47,13 @@ from models.refresh_token_request import RefreshTokenRequest
 from models.verify_email200_response import VerifyEmail200Response
 
 from models.auth_login_with_refresh_logic_post200_response import AuthLoginWithRefreshLogicPost200Response
-from security_api import get_token_bearerAuth
+from security_api import bearer_auth, get_token_bearerAuth
 
 
 from impl.services.auth.register_service import RegisterService
-from impl.services.auth.login_with_refresh_service import LoginWithRefreshService
+from impl.services.auth.login_with_refresh_service import LoginWithRefreshService, RefreshAccessTokenService
 from impl.services.auth.login_service import LoginService
+from impl.services.auth.logout_service import LogoutService
 from dotenv import load_dotenv
 
 router = APIRouter()
@@ -106,17 +109,15 @@ async def auth_register_post(
         logger.debug("auth_register_post is called")
         logger.debug(f"incoming data: {auth_register_post_request} ")
       
-        reg = RegisterService(auth_register_post_request, dependencies=services)
-        
-        # create the starter chat in a new session
-        from impl.services.chat.create_chat_service import CreateChatService
-        CreateChatService(user_id=reg.new_user_id, dependencies=services)
-
-        logger.debug("new chat created for user")
+        # Blocking work (bcrypt, DB) runs in the threadpool so the event loop stays free.
+        # The service creates the user, its details and the starter chat in one transaction.
+        reg = await run_in_threadpool(RegisterService, auth_register_post_request, dependencies=services)
         
         return reg.response
         
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}", exc_info=True)  # Log the exception details
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -151,11 +152,13 @@ async def auth_login_with_refresh_logic_post(
                 self.password = password
         
         mr = MyRequest()
-        p = LoginWithRefreshService(mr, dependencies=services, response=response)
+        p = await run_in_threadpool(LoginWithRefreshService, mr, dependencies=services, response=response)
         
         return p.response
 
         # return rh.handle_login_with_refresh(email, password, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -188,11 +191,13 @@ async def auth_login_post(
         
         mr = MyRequest()
         logger.debug(f" [raw incoming package] email {email}, password {password}")
-        p= LoginService(mr ,dependencies=services) 
+        p = await run_in_threadpool(LoginService, mr, dependencies=services)
         return p.response
 
        
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}", exc_info=True)  # Log the exception details
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -224,9 +229,11 @@ async def auth_login_json_post(
                 self.password = login_request.password.get_secret_value() if hasattr(login_request.password, 'get_secret_value') else login_request.password
         
         mr = MyRequest()
-        service = LoginService(mr, dependencies=services)
+        service = await run_in_threadpool(LoginService, mr, dependencies=services)
         return service.response
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing login: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -243,8 +250,63 @@ async def auth_login_json_post(
     response_model_by_alias=True,
 )
 async def auth_logout_post(
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_auth),
+    services: Services = Depends(get_services),
 ) -> AuthLogoutPost200Response:
-    ...
+    """Revokes the access token used for this request."""
+    try:
+
+        class MyRequest:
+            def __init__(self):
+                self.token = credentials.credentials
+                self.everywhere = False
+
+        p = await run_in_threadpool(LogoutService, MyRequest(), dependencies=services)
+        return p.response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing file: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+
+@router.post(
+    "/auth/logout-all",
+    responses={
+        200: {"model": AuthLogoutPost200Response, "description": "Every token of the user revoked"},
+        401: {"model": ErrorResponse, "description": "Unauthorized. Authentication credentials are missing or invalid."},
+    },
+    tags=["auth"],
+    summary="Log out a user on all devices",
+    response_model_by_alias=True,
+)
+async def auth_logout_all_post(
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_auth),
+    services: Services = Depends(get_services),
+) -> AuthLogoutPost200Response:
+    """Revokes every access and refresh token issued to the user so far."""
+    try:
+
+        class MyRequest:
+            def __init__(self):
+                self.token = credentials.credentials
+                self.everywhere = True
+
+        p = await run_in_threadpool(LogoutService, MyRequest(), dependencies=services)
+        return p.response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing file: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
 @router.get(
@@ -329,18 +391,24 @@ async def auth_reset_password_post(
 )
 async def refresh_token(
     refresh_token_request: RefreshTokenRequest = Body(None, description=""),
+    refresh_token_cookie: Optional[str] = Cookie(None, alias="refresh_token"),
+    services: Services = Depends(get_services),
 ) -> RefreshToken200Response:
-    """Regenerates a JWT token based on the provided email address."""
-   
-    load_dotenv()
-    import os
-    logging.basicConfig(level=logging.DEBUG)
-    SECRET = os.getenv("SECRET_KEY")
-
-    from fastapi_login import LoginManager
-    manager = LoginManager(SECRET, token_url='/auth/login')
-    access_token = manager.create_access_token(data={'sub': refresh_token_request.email})
-    return {'access_token': access_token, 'token_type': 'bearer'}
+    """Issues a new access token for the refresh token cookie set at login, unless it was revoked."""
+    try:
+
+        class MyRequest:
+            def __init__(self):
+                self.refresh_token = refresh_token_cookie
+
+        p = await run_in_threadpool(RefreshAccessTokenService, MyRequest(), dependencies=services)
+        return p.response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing file: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
 @router.get(
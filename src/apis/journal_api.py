@@ -135,6 +135,9 @@ async def get_journal_entries(
     limit: int = Query(20, description="Number of entries to return", le=100),
     offset: int = Query(0, description="Number of entries to skip", ge=0),
     search: Optional[str] = Query(None, description="Search query for entry content"),
+    includeTotal: bool = Query(True, description="Count all entries when more pages follow; pass false to rely on hasMore only"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    response: Response = None,
     token_bearerAuth: TokenModel = Security(
         get_token_bearerAuth
     ),
@@ -143,16 +146,31 @@ async def get_journal_entries(
     """Get journal entries with filtering"""
     try:
         logger.debug("get_journal_entries is called")
+        user_id = int(token_bearerAuth.sub)
+        
+        from impl.services.collection_etags import collection_etag, etag_matches, not_modified, set_etag_headers
+        from db.models.collection_version import JOURNAL_ENTRIES
         from impl.services.journal_service import JournalService
-        journal_service = JournalService(dependencies=services)
         
-        return journal_service.get_entries(
-            filter=filter,
-            limit=limit,
-            offset=offset,
-            search=search,
-            user_id=int(token_bearerAuth.sub)
-        )
+        # Version and rows from the same server, so the ETag describes the rows served
+        with services.session_factory().pinned_reads():
+            # Unchanged since the client's copy: answer from the version counter alone
+            etag = collection_etag(services, user_id, JOURNAL_ENTRIES, filter, limit, offset, search, includeTotal)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            
+            journal_service = JournalService(dependencies=services)
+            
+            entries = journal_service.get_entries(
+                filter=filter,
+                limit=limit,
+                offset=offset,
+                search=search,
+                include_total=includeTotal,
+                user_id=user_id
+            )
+        set_etag_headers(response, etag)
+        return entries
     except HTTPException:
         raise
     except Exception as e:
@@ -207,6 +225,7 @@ async def get_journal_entry(
     response_model_by_alias=True,
 )
 async def update_journal_entry(
+    background_tasks: BackgroundTasks,
     entryId: str = Path(..., description=""),
     update_journal_entry_request: UpdateJournalEntryRequest = Body(None),
     token_bearerAuth: TokenModel = Security(
@@ -224,7 +243,8 @@ async def update_journal_entry(
             entry_id=entryId,
             content=update_journal_entry_request.content,
             mood=update_journal_entry_request.mood,
-            user_id=int(token_bearerAuth.sub)
+            user_id=int(token_bearerAuth.sub),
+            background_tasks=background_tasks
         )
     except HTTPException:
         raise
@@ -341,6 +361,43 @@ async def get_entry_suggestions(
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
+@router.get(
+    "/journal/entries/{entryId}/similar",
+    responses={
+        200: {"model": SearchResults, "description": "Semantically similar entries"},
+        404: {"model": ErrorResponse, "description": "Not found"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+    },
+    tags=["AI Processing"],
+    summary="Get entries similar to a journal entry",
+    response_model_by_alias=True,
+)
+async def get_similar_entries(
+    entryId: str = Path(..., description=""),
+    limit: int = Query(5, description="Maximum number of similar entries", ge=1, le=50),
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    services: Services = Depends(get_services),
+) -> SearchResults:
+    """Get entries similar to a journal entry"""
+    try:
+        logger.debug("get_similar_entries is called")
+        from impl.services.journal_service import JournalService
+        journal_service = JournalService(dependencies=services)
+        
+        return journal_service.get_similar_entries(
+            entry_id=entryId,
+            user_id=int(token_bearerAuth.sub),
+            limit=limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting similar entries: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+
 @router.post(
     "/journal/entries/{entryId}/create-affirmation",
     responses={
@@ -492,7 +549,38 @@ async def search_journal_entries(
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
-
+@router.get(
+    "/journal/patterns",
+    responses={
+        200: {"model": JournalPatterns, "description": "Journal patterns"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+    },
+    tags=["Analytics"],
+    summary="Get mood and theme patterns",
+    response_model_by_alias=True,
+)
+async def get_journal_patterns(
+    tags: Optional[ListType[str]] = Query(None, description="Only analyse entries with these tags"),
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    services: Services = Depends(get_services),
+) -> JournalPatterns:
+    """Get mood and theme patterns"""
+    try:
+        logger.debug("get_journal_patterns is called")
+        from impl.services.journal_service import JournalService
+        journal_service = JournalService(dependencies=services)
+        
+        return journal_service.get_patterns(
+            user_id=int(token_bearerAuth.sub),
+            tags=tags
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting journal patterns: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
 @router.get(
@@ -533,3 +621,40 @@ async def export_journal_entries(
         logger.error(f"Error exporting journal entries: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+
+
+@router.post(
+    "/journal/batch-tags",
+    responses={
+        200: {"model": BatchTagResponse, "description": "Tags updated"},
+        400: {"model": ErrorResponse, "description": "Bad request"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+    },
+    tags=["Journal Entries"],
+    summary="Add, remove or replace tags on multiple entries",
+    response_model_by_alias=True,
+)
+async def batch_tag_management(
+    batch_tag_request: BatchTagRequest = Body(None),
+    token_bearerAuth: TokenModel = Security(
+        get_token_bearerAuth
+    ),
+    services: Services = Depends(get_services),
+) -> BatchTagResponse:
+    """Add, remove or replace tags on multiple entries"""
+    try:
+        logger.debug("batch_tag_management is called")
+        from impl.services.journal_service import JournalService
+        journal_service = JournalService(dependencies=services)
+        
+        return journal_service.batch_tag_management(
+            action=batch_tag_request.action,
+            entry_ids=batch_tag_request.entryIds,
+            tags=batch_tag_request.tags,
+            user_id=int(token_bearerAuth.sub)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error managing journal tags: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
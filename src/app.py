@@ -151,8 +151,34 @@ async def lifespan(app: FastAPI):
     # Startup
     app.state.services = services
     logger.debug("Configurations loaded and services initialized")
+    services.token_revocations().start()
+    services.affirmation_stats_buffer().start()
+    services.login_event_buffer().start()
+    services.background_tasks().start()
+    # Off by default; enable it in exactly one process when scaling out
+    scheduler_enabled = os.getenv("AFFIRMATION_SCHEDULER_ENABLED", "0") == "1"
+    if scheduler_enabled:
+        services.notification_dispatcher().start()
+        services.affirmation_scheduler().start()
+    # Likewise one archiver process is enough
+    archiver_enabled = os.getenv("MESSAGE_ARCHIVER_ENABLED", "1") == "1"
+    if archiver_enabled:
+        services.message_archiver().start()
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    if archiver_enabled:
+        services.message_archiver().stop()
+    if scheduler_enabled:
+        services.affirmation_scheduler().stop()
+        services.notification_dispatcher().stop()
+    # Flushes whatever seen/played counters are still buffered
+    services.affirmation_stats_buffer().stop()
+    services.login_event_buffer().stop()
+    # Sends mail that is still queued
+    services.background_tasks().stop()
+    services.affirmation_audio_cache().shutdown()
+    services.password_hasher().shutdown()
+    services.token_revocations().stop()
 
 app.router.lifespan_context = lifespan
 
@@ -4,17 +4,37 @@ from dependency_injector import containers, providers
 import logging
 logger = logging.getLogger(__name__)
 import os
+import threading
 
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from db.routing import RoutingSessionFactory
+from db.sharding import ShardMap
 from db.repositories.user_repository import UserRepository
 from db.repositories.chat_repository import ChatRepository
 from db.repositories.message_repository import MessageRepository
 from db.repositories.affirmation_repository import AffirmationRepository
 from db.repositories.journal_repository import JournalRepository
+from db.repositories.collection_version_repository import CollectionVersionRepository
+from db.repositories.token_revocation_repository import TokenRevocationRepository
+from impl.services.journal_patterns import JournalPatternCache
+from impl.services.journal_embeddings import HashingEmbedder, JournalEmbeddingStore
+from impl.services.journal_ai_processor import ReanalysisDebouncer
+from impl.services.affirmations.affirmation_scheduler import AffirmationScheduler
+from impl.services.affirmations.affirmation_stats_buffer import AffirmationStatsBuffer
+from impl.services.affirmations.affirmation_dedup import AffirmationDeduplicator
+from impl.services.affirmations.affirmation_audio import AffirmationAudioCache, ToneSynthesizer
+from impl.services.affirmations.notification_dispatcher import FileQueueTransport, NotificationDispatcher
+from impl.services.auth.login_event_buffer import LoginEventBuffer
+from impl.services.auth.password_hasher import PasswordHasher
+from impl.services.auth.verification_mail import FileOutboxMailSender
+from impl.services.background_tasks import BackgroundTaskQueue
+from impl.services.messages.message_archiver import MessageArchiver
+from impl.services.auth.token_cache import VerifiedTokenCache
+from impl.services.auth.token_revocation import TokenRevocations
 # from db.repositories.file_repository import FileRepository
-from db.session import get_engine
+from db.session import get_engine, get_replica_engines, get_shard_engines
 import yaml
 
 
@@ -23,17 +43,47 @@ import yaml
 class Services(containers.DeclarativeContainer):
     config = providers.Configuration()
 
-    # Engine provider
+    # Engine provider; SQLite gets the tuning profile, server databases the pool sizing (db/session.py)
     engine = providers.Singleton(
-        create_engine,
+        get_engine,
         config.db_url,
-        echo=False
+        echo=False,
+        sqlite_profile=config.sqlite_profile,
+        pool_options=config.db_pool
     )
 
-    # Session factory provider
+    replica_engines = providers.Singleton(
+        get_replica_engines,
+        config.replica_db_urls,
+        echo=False,
+        sqlite_profile=config.sqlite_profile,
+        pool_options=config.db_pool
+    )
+
+    # Session factory provider: session_factory()() opens a primary session,
+    # session_factory().for_read(user_id) a replica session for read-only work
     session_factory = providers.Singleton(
-        sessionmaker,
-        bind=engine
+        RoutingSessionFactory,
+        bind=engine,
+        replica_engines=replica_engines,
+        stickiness_seconds=config.read_your_writes_seconds
+    )
+
+    chat_shard_engines = providers.Singleton(
+        get_shard_engines,
+        config.shard_db_urls,
+        echo=False,
+        sqlite_profile=config.sqlite_profile,
+        pool_options=config.db_pool
+    )
+
+    # Where a user's chats and messages live: chat_shards().session_for(user_id)
+    # opens a session on their shard (db/sharding.py)
+    chat_shards = providers.Singleton(
+        ShardMap,
+        session_factory=session_factory,
+        shard_engines=chat_shard_engines,
+        cache_ttl_seconds=config.shard_map_ttl_seconds
     )
 
 
@@ -64,3 +114,129 @@ class Services(containers.DeclarativeContainer):
         session=providers.Dependency()
     )
 
+    collection_version_repository = providers.Factory(
+        CollectionVersionRepository,
+        session=providers.Dependency()
+    )
+
+    token_revocation_repository = providers.Factory(
+        TokenRevocationRepository,
+        session=providers.Dependency()
+    )
+
+    # Per-user cache of /journal/patterns results
+    journal_pattern_cache = providers.Singleton(
+        JournalPatternCache
+    )
+
+    # Embeddings for semantic journal retrieval; override `journal_embedder`
+    # to plug in a hosted model
+    journal_embedder = providers.Singleton(
+        HashingEmbedder
+    )
+
+    journal_embedding_store = providers.Singleton(
+        JournalEmbeddingStore,
+        base_dir=config.embeddings_dir,
+        embedder=journal_embedder
+    )
+
+    # Coalesces AI re-analysis after bursts of journal edits
+    journal_reanalysis_debouncer = providers.Singleton(
+        ReanalysisDebouncer
+    )
+
+    # Local stand-in transport; override with a push provider's transport
+    notification_transport = providers.Singleton(
+        FileQueueTransport,
+        path=config.notification_outbox
+    )
+
+    notification_dispatcher = providers.Singleton(
+        NotificationDispatcher,
+        session_factory=session_factory,
+        affirmation_repository=affirmation_repository.provider,
+        transport=notification_transport
+    )
+
+    # Fires scheduled affirmations off the next_fire_at index
+    affirmation_scheduler = providers.Singleton(
+        AffirmationScheduler,
+        session_factory=session_factory,
+        affirmation_repository=affirmation_repository.provider,
+        on_fire=notification_dispatcher.provided.submit
+    )
+
+    # Moves old messages into compressed per-chat segments on every shard
+    message_archiver = providers.Singleton(
+        MessageArchiver,
+        chat_shards=chat_shards,
+        message_repository=message_repository.provider,
+        archive_after_days=config.message_archive_after_days
+    )
+
+    # Side effects that run after the response (verification mail, ...)
+    background_tasks = providers.Singleton(
+        BackgroundTaskQueue
+    )
+
+    # Local stand-in mail sender; override with an SMTP or provider sender
+    mail_sender = providers.Singleton(
+        FileOutboxMailSender,
+        path=config.mail_outbox
+    )
+
+    # bcrypt process pool with admission control, shared by the auth services
+    password_hasher = providers.Singleton(
+        PasswordHasher
+    )
+
+    # Write-behind login_time_logs and user_details.last_login_at
+    login_event_buffer = providers.Singleton(
+        LoginEventBuffer,
+        session_factory=session_factory,
+        user_repository=user_repository.provider
+    )
+
+    # Verified bearer tokens, so repeat requests skip JWT decoding
+    token_cache = providers.Singleton(
+        VerifiedTokenCache
+    )
+
+    # Per-user token epochs + Bloom filter of revoked jtis, checked in memory on every request
+    token_revocations = providers.Singleton(
+        TokenRevocations,
+        session_factory=session_factory,
+        revocation_repository=token_revocation_repository.provider,
+        token_cache=token_cache
+    )
+
+    # Caps concurrent affirmation LLM calls across all requests, including fan-out chunks
+    affirmation_llm_limiter = providers.Singleton(
+        threading.BoundedSemaphore,
+        8
+    )
+
+    # MinHash near-duplicate filter for AI-generated affirmations
+    affirmation_deduplicator = providers.Singleton(
+        AffirmationDeduplicator
+    )
+
+    # Local stand-in synthesizer; override with a TTS provider's synthesizer
+    affirmation_synthesizer = providers.Singleton(
+        ToneSynthesizer
+    )
+
+    # Content-addressed voice audio, synthesized in the background
+    affirmation_audio_cache = providers.Singleton(
+        AffirmationAudioCache,
+        base_dir=config.audio_dir,
+        synthesizer=affirmation_synthesizer
+    )
+
+    # Write-behind seen/played counters
+    affirmation_stats_buffer = providers.Singleton(
+        AffirmationStatsBuffer,
+        session_factory=session_factory,
+        affirmation_repository=affirmation_repository.provider
+    )
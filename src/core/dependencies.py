@@ -3,6 +3,7 @@
 
 from pathlib import Path
 from core.containers import  Services
+from db.session import database_url, pool_options_from_env, replica_database_urls, shard_database_urls
 import logging
 import logging
 logger = logging.getLogger(__name__)
@@ -11,19 +12,36 @@ import os
 def setup_dependencies():
     base_dir = os.path.dirname(__file__)
 
-    # Paths for the databases
-    main_db_path = os.path.join(base_dir, "..", "db", "data", "voicechat.db")
+    # Paths for the local data
+    embeddings_dir = os.path.join(base_dir, "..", "db", "data", "embeddings")
+    notification_outbox = os.path.join(base_dir, "..", "db", "data", "notifications", "outbox.jsonl")
+    audio_dir = os.path.join(base_dir, "..", "db", "data", "audio")
+    mail_outbox = os.path.join(base_dir, "..", "db", "data", "mail", "outbox.jsonl")
    
 
     # Resolve absolute paths
-    main_db_path = os.path.abspath(main_db_path)
+    embeddings_dir = os.path.abspath(embeddings_dir)
+    notification_outbox = os.path.abspath(notification_outbox)
+    audio_dir = os.path.abspath(audio_dir)
+    mail_outbox = os.path.abspath(mail_outbox)
    
-    # Create database URLs
-    main_db_url = f"sqlite:///{main_db_path}"
+    # DATABASE_URL, or the local SQLite file
+    main_db_url = database_url()
     
     services = Services()
     services.config.from_dict({
         'db_url': main_db_url,
+        'embeddings_dir': embeddings_dir,
+        'notification_outbox': notification_outbox,
+        'audio_dir': audio_dir,
+        'mail_outbox': mail_outbox,
+        'sqlite_profile': os.getenv("SQLITE_PROFILE", "production"),
+        'db_pool': pool_options_from_env(),
+        'replica_db_urls': replica_database_urls(),
+        'read_your_writes_seconds': float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")),
+        'shard_db_urls': shard_database_urls(),
+        'shard_map_ttl_seconds': float(os.getenv("SHARD_MAP_TTL_SECONDS", "30")),
+        'message_archive_after_days': float(os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", "90")),
       
     })
 
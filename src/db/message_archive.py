@@ -0,0 +1,69 @@
+# db/message_archive.py
+"""
+Encoding of archived message segments.
+
+A segment payload is the JSON list of the messages' columns, compressed
+with zstd.  Without the optional `zstandard` package, new segments fall
+back to zlib.  Each segment records its codec, so both kinds stay
+readable side by side.
+
+Decoded messages come back as transient `Message` instances.  They are
+not attached to any session, and callers read them exactly like rows of
+the hot table.
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import DateTime
+
+from db.models.message import Message
+
+try:
+    import zstandard
+except ImportError:  # optional; see requirements.txt
+    zstandard = None
+
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+
+_MESSAGE_COLUMNS = [column.name for column in Message.__table__.columns]
+_DATETIME_COLUMNS = {column.name for column in Message.__table__.columns if isinstance(column.type, DateTime)}
+
+
+def message_to_dict(row) -> Dict[str, object]:
+    """Column values of a Message (or a Core row mapping), JSON-ready."""
+    values = {}
+    for name in _MESSAGE_COLUMNS:
+        value = row[name] if isinstance(row, dict) else getattr(row, name)
+        values[name] = value.isoformat() if isinstance(value, datetime) else value
+    return values
+
+
+def message_from_dict(values: Dict[str, object]) -> Message:
+    values = dict(values)
+    for name in _DATETIME_COLUMNS:
+        if values.get(name) is not None:
+            values[name] = datetime.fromisoformat(values[name])
+    return Message(**{name: values.get(name) for name in _MESSAGE_COLUMNS})
+
+
+def encode_messages(messages: List[Dict[str, object]]) -> Tuple[str, bytes]:
+    """(codec, payload) for messages as returned by `message_to_dict`."""
+    raw = json.dumps(messages, separators=(",", ":")).encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decode_messages(codec: str, payload: bytes) -> List[Message]:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Archived messages are zstd-compressed; install the zstandard package")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == "zlib":
+        raw = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown message archive codec {codec!r}")
+    return [message_from_dict(values) for values in json.loads(raw)]
@@ -10,11 +10,18 @@ from .chat import Chat
 from .message import Message
 from .affirmation import Affirmation
 from .journal import JournalEntry
+from .journal_tag import JournalTag
 from .llm_operations import LlmOperations
+from .collection_version import CollectionVersion
+from .revoked_token import RevokedToken
+from .user_shard import UserShard, ShardSequence, ShardFence
+from .message_archive import MessageArchiveSegment
 
 
 __all__ = [
     'Base', 'get_current_time', 'User', 'UserDetails', 'LoginTimeLog',
-    'Chat', 'Message', 'Affirmation', 'JournalEntry', 'LlmOperations'
+    'Chat', 'Message', 'Affirmation', 'JournalEntry', 'JournalTag', 'LlmOperations',
+    'CollectionVersion', 'RevokedToken', 'UserShard', 'ShardSequence', 'ShardFence',
+    'MessageArchiveSegment'
 
 ]
@@ -1,13 +1,33 @@
 # db/models/affirmation.py
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 from .base import Base
 
+# Spaced-repetition review intervals (days) indexed by how_many_times_seen; the last one repeats
+FEED_REVIEW_INTERVALS_DAYS = (0.0, 1 / 6, 0.5, 1.0, 3.0, 7.0, 14.0, 30.0)
+
+# due_at of never-seen affirmations, so they sort before every seen one
+NEVER_SEEN_DUE_AT = datetime(1970, 1, 1)
+
+
+def feed_due_at(how_many_times_seen: Optional[int], last_time_seen: Optional[datetime]) -> datetime:
+    """When an affirmation is next due in the feed: its last view plus a growing review interval."""
+    if last_time_seen is None:
+        return NEVER_SEEN_DUE_AT
+    interval = FEED_REVIEW_INTERVALS_DAYS[min(how_many_times_seen or 0, len(FEED_REVIEW_INTERVALS_DAYS) - 1)]
+    return last_time_seen + timedelta(days=interval)
+
+
 class Affirmation(Base):
     __tablename__ = 'affirmations'
+    __table_args__ = (
+        # Spaced-repetition feed: a user's active affirmations in due order, paged by (due_at, id)
+        Index('ix_affirmations_user_active_due', 'user_id', 'is_active', 'due_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=True)
@@ -24,8 +44,13 @@ class Affirmation(Base):
     # Remove the old schedule_config_id as we're storing config directly
     # schedule_config_id = Column(Integer, nullable=True)
     
+    # Next notification time (UTC) derived from schedule_config; NULL when not scheduled
+    next_fire_at = Column(DateTime, nullable=True, index=True)
+    
     last_time_seen = Column(DateTime, nullable=True)
     how_many_times_seen = Column(Integer, default=0, nullable=True)
+    # feed_due_at(how_many_times_seen, last_time_seen); kept in step by AffirmationRepository
+    due_at = Column(DateTime, default=NEVER_SEEN_DUE_AT, nullable=False)
     last_time_played = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
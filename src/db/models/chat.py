@@ -1,24 +1,30 @@
 # models/chat.py
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, create_engine
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Text, JSON, create_engine
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from datetime import datetime
 
 
 from .base import Base  
 
+# 64-bit on PostgreSQL, where sharded ids (db/sharding.py) outgrow INTEGER;
+# SQLite needs INTEGER for the rowid alias and stores 64 bits either way
+ChatId = BigInteger().with_variant(Integer(), 'sqlite')
+
 
 
 class Chat(Base):
     __tablename__ = 'chats'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(ChatId, primary_key=True, autoincrement=True)
     user_id = Column(Integer, nullable=False, index=True)  # Owner of the chat session
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     settings = Column(JSON, default=dict, nullable=False)
 
     # Relationship to messages
     messages = relationship('Message', back_populates='chat', cascade='all, delete-orphan')
+    # Archived older messages (db/message_archive.py)
+    archive_segments = relationship('MessageArchiveSegment', back_populates='chat', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f"<Chat id={self.id} user_id={self.user_id} created_at={self.created_at}>"
@@ -0,0 +1,69 @@
+# db/models/collection_version.py
+
+from sqlalchemy import Column, Integer, String, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .base import Base
+
+
+# Collections with a version counter, keyed by the tables whose rows they list
+AFFIRMATIONS = 'affirmations'
+JOURNAL_ENTRIES = 'journal_entries'
+TRACKED_TABLES = {
+    'affirmations': AFFIRMATIONS,
+    'journal_entries': JOURNAL_ENTRIES,
+    'journal_tags': JOURNAL_ENTRIES,
+}
+
+
+class CollectionVersion(Base):
+    """
+    Per-user version counter of a listed collection.
+
+    Bumped in the same transaction as every change to the collection, so
+    list endpoints can answer conditional GETs from this row alone.
+    """
+    __tablename__ = 'collection_versions'
+
+    user_id = Column(Integer, primary_key=True)
+    collection = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CollectionVersion user_id={self.user_id} collection={self.collection} version={self.version}>"
+
+
+def bump_collection_versions(connection, changes):
+    """Increment the version of each (user_id, collection) pair with one upsert."""
+    changes = sorted(set(changes))
+    if not changes:
+        return
+    table = CollectionVersion.__table__
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(table).values([
+        {'user_id': user_id, 'collection': collection, 'version': 1}
+        for user_id, collection in changes
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.collection],
+        set_={'version': table.c.version + 1}
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_collections(session, flush_context):
+    """Bump versions for ORM inserts, updates and deletes of tracked rows."""
+    changes = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        collection = TRACKED_TABLES.get(getattr(obj, '__tablename__', None))
+        if collection is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        user_id = inspect(obj).dict.get('user_id')
+        if user_id is not None:
+            changes.add((user_id, collection))
+    if changes:
+        bump_collection_versions(session.connection(), changes)
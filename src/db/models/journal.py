@@ -1,11 +1,16 @@
 # models/journal.py
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Boolean, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import hashlib
+import re
+import unicodedata
 
 from .base import Base
 
+PREVIEW_LENGTH = 200
+
 
 class JournalEntry(Base):
     __tablename__ = 'journal_entries'
@@ -20,13 +25,53 @@ class JournalEntry(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # AI-generated fields
+    # Legacy tags from before journal_tags, copied over by migrate_voicechat_db;
+    # no longer written or read, journal_tags is the only source of tags
     tags = Column(JSON, default=list)
     insights = Column(JSON, default=list)
     processed = Column(Boolean, default=False, nullable=False)
     processing_status = Column(String(20), default='pending', nullable=False)  # pending, processing, completed, failed
     
+    # Derived at write time so the list endpoint never loads content / insights
+    preview = Column(String(PREVIEW_LENGTH))
+    insights_flat = Column(JSON)
+    
+    # sha256 of the normalized content, and of the content the current insights were computed from
+    content_hash = Column(String(64))
+    analyzed_hash = Column(String(64))
+    
     # Soft delete
     is_deleted = Column(Boolean, default=False, nullable=False)
     
     def __repr__(self):
-        return f"<JournalEntry id={self.id} user_id={self.user_id} mood={self.mood} created_at={self.created_at}>"
\ No newline at end of file
+        return f"<JournalEntry id={self.id} user_id={self.user_id} mood={self.mood} created_at={self.created_at}>"
+
+
+def content_hash_of(content: str) -> str:
+    """Hash of the content with Unicode and whitespace differences normalized away"""
+    normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFC", content or "")).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def flatten_insights(insights) -> list:
+    """Flatten AI insights into the display strings used by the API"""
+    if not insights:
+        return []
+    if isinstance(insights, list):
+        return insights
+    if isinstance(insights, dict):
+        lines = []
+        if 'emotionalState' in insights:
+            lines.append(f"Emotional state: {insights['emotionalState']}")
+        for theme in insights.get('themes', []):
+            lines.append(f"Theme: {theme}")
+        return lines
+    return []
+
+
+@event.listens_for(JournalEntry, 'before_insert')
+@event.listens_for(JournalEntry, 'before_update')
+def _refresh_derived_columns(mapper, connection, target):
+    target.preview = (target.content or "")[:PREVIEW_LENGTH]
+    target.insights_flat = flatten_insights(target.insights)
+    target.content_hash = content_hash_of(target.content)
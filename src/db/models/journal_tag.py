@@ -0,0 +1,24 @@
+# db/models/journal_tag.py
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+
+from .base import Base
+
+TAG_MAX_LENGTH = 100
+
+
+class JournalTag(Base):
+    """One row per (entry, tag); replaces the JSON `tags` column for lookups."""
+    __tablename__ = 'journal_tags'
+
+    entry_id = Column(Integer, ForeignKey('journal_entries.id', ondelete='CASCADE'), primary_key=True)
+    tag = Column(String(TAG_MAX_LENGTH), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # "which of my entries carry tag X" - search / patterns filtering
+        Index('ix_journal_tags_user_tag', 'user_id', 'tag'),
+    )
+
+    def __repr__(self):
+        return f"<JournalTag entry_id={self.entry_id} user_id={self.user_id} tag={self.tag}>"
@@ -1,7 +1,7 @@
 
 # db/models/login_time_log.py
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -9,6 +9,10 @@ from .base import Base  # or wherever your Base is defined
 
 class LoginTimeLog(Base):
     __tablename__ = 'login_time_logs'
+    __table_args__ = (
+        # A user's login history in time order
+        Index('ix_login_time_logs_setting_login', 'setting_id', 'login_datetime'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     setting_id = Column(Integer, ForeignKey('user_details.setting_id'), nullable=False)
@@ -1,16 +1,21 @@
 # db/models/message.py
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, create_engine
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, Text, JSON, create_engine
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from datetime import datetime
 
 from .base import Base  # or wherever your Base is defined
+from .chat import ChatId
 
 class Message(Base):
     __tablename__ = 'messages'
+    __table_args__ = (
+        # A chat's page in timestamp order, and the archival job's cut-off
+        Index('ix_messages_chat_timestamp', 'chat_id', 'timestamp'),
+    )
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    chat_id = Column(Integer, ForeignKey('chats.id', ondelete='CASCADE'), nullable=False)
+    id = Column(ChatId, primary_key=True, autoincrement=True)
+    chat_id = Column(ChatId, ForeignKey('chats.id', ondelete='CASCADE'), nullable=False)
     user_id = Column(Integer, nullable=False)
     user_name = Column(String, nullable=True)
     user_type = Column(String, nullable=True)
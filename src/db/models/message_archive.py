@@ -0,0 +1,38 @@
+# db/models/message_archive.py
+"""
+Cold storage for old chat messages (see db/message_archive.py).
+
+A segment holds a run of one chat's messages, oldest first, as one
+compressed blob.  Segments live on the chat's shard next to `messages`,
+and a chat's segments always come before its hot rows.
+`message_count` and the timestamp bounds let a page skip a segment
+without decompressing it.
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import relationship
+
+from .base import Base, get_current_time
+from .chat import ChatId
+
+
+class MessageArchiveSegment(Base):
+    __tablename__ = 'message_archive_segments'
+    __table_args__ = (
+        Index('ix_message_archive_segments_chat_first', 'chat_id', 'first_timestamp'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(ChatId, ForeignKey('chats.id', ondelete='CASCADE'), nullable=False)
+    message_count = Column(Integer, nullable=False)
+    first_message_id = Column(ChatId, nullable=False)
+    last_message_id = Column(ChatId, nullable=False)
+    first_timestamp = Column(DateTime, nullable=False)
+    last_timestamp = Column(DateTime, nullable=False)
+    codec = Column(String(8), nullable=False)          # "zstd" or "zlib"
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=get_current_time, nullable=False)
+
+    chat = relationship('Chat', back_populates='archive_segments')
+
+    def __repr__(self):
+        return f"<MessageArchiveSegment id={self.id} chat_id={self.chat_id} messages={self.message_count}>"
@@ -0,0 +1,20 @@
+# db/models/revoked_token.py
+"""
+Denylist of individually revoked tokens (logout).
+
+Rows are only needed until the token would have expired anyway, so
+`expires_at` lets them be purged.  "Log out everywhere" and password
+resets don't add rows; they bump `users.token_epoch` instead.
+"""
+from sqlalchemy import Column, DateTime, Integer, String
+
+from .base import Base, get_current_time
+
+
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=get_current_time, nullable=False)
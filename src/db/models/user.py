@@ -23,6 +23,9 @@ class User(Base):
     created_at = Column(DateTime, default=get_current_time)
     is_verified = Column(Boolean, default=False)
     can_see_admin_panel = Column(Boolean, default=False)
+    # Tokens carry the epoch they were issued under (claim `tep`); bumping it
+    # revokes every token issued before
+    token_epoch = Column(Integer, default=0, nullable=False)
 
 
     user_details = relationship(
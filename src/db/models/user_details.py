@@ -55,18 +55,14 @@ class UserDetails(Base):
     created_at = Column(DateTime, default=get_current_time, nullable=False)
     updated_at = Column(DateTime, default=get_current_time, onupdate=get_current_time, nullable=False)
     
+    # Latest login_time_logs.login_datetime, kept in step by the login event buffer
+    last_login_at = Column(DateTime, nullable=True)
+    
     login_time_logs = relationship(
         "LoginTimeLog",
         back_populates="user_details",
         cascade="all, delete-orphan"
     )
     
-    @property
-    def last_login_at(self) -> Optional[datetime]:
-        """Returns the latest login datetime."""
-        if not self.login_time_logs:
-            return None
-        return max(log.login_datetime for log in self.login_time_logs)
-    
     user = relationship("User", back_populates="user_details")
     # user = relationship("User", back_populates="settings")
\ No newline at end of file
@@ -0,0 +1,39 @@
+# db/models/user_shard.py
+"""
+Chat storage sharding (see db/sharding.py).
+
+`user_shards` lives on the primary database and maps a user to the shard
+holding their chats and messages.  Users without a row predate sharding
+and live on shard 0, the primary itself.  `moving` is set by the
+rebalancing tool while a user's rows are being copied.
+
+`shard_sequences` exists on every shard and hands out the shard's chat
+and message ids.  `shard_fences`, also on every shard, freezes a user's
+rows on that shard while they are copied away.
+"""
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String
+
+from .base import Base, get_current_time
+
+
+class UserShard(Base):
+    __tablename__ = 'user_shards'
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(Integer, nullable=False, index=True)
+    moving = Column(Boolean, default=False, nullable=False)
+    updated_at = Column(DateTime, default=get_current_time, onupdate=get_current_time, nullable=False)
+
+
+class ShardSequence(Base):
+    __tablename__ = 'shard_sequences'
+
+    name = Column(String(64), primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
+
+
+class ShardFence(Base):
+    __tablename__ = 'shard_fences'
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime, default=get_current_time, nullable=False)
@@ -4,6 +4,7 @@ import logging
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from sqlalchemy import asc, desc
+from db.sql_functions import date_format
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, Any, List
 
@@ -148,7 +149,7 @@ class AdminPanelReportRepository:
 
         period_map = {
             "day":   "%Y-%m-%d",
-            "week":  "%Y-%W",
+            "week":  "%G-W%V",
             "month": "%Y-%m",
             "year":  "%Y",
         }
@@ -178,7 +179,7 @@ class AdminPanelReportRepository:
         # (3) Build the base query
         query = (
             self.session.query(
-                func.strftime(strftime_pattern, InitialData.upload_timestamp).label("period_label"),
+                date_format(strftime_pattern, InitialData.upload_timestamp).label("period_label"),
                 func.count(InitialData.document_id).label("files_count")
             )
             .outerjoin(UserSettings, UserSettings.user_id == InitialData.user_id)
@@ -1,16 +1,25 @@
 # db/repositories/affirmation_repository.py
 
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import DateTime, and_, bindparam, case, func, insert, or_, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
 
-from db.models.affirmation import Affirmation
+from db.models.affirmation import Affirmation, feed_due_at
+from db.models.collection_version import AFFIRMATIONS, bump_collection_versions
+from db.routing import note_user_writes
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-row INSERT; keeps bound parameters under SQLite's default limit of 999
+BULK_INSERT_CHUNK = 80
+
+# Ids per statement when recomputing due_at after Core updates
+DUE_AT_CHUNK = 500
+
 
 class AffirmationRepository:
     """
@@ -63,6 +72,72 @@ class AffirmationRepository:
             logger.error(f"Error creating affirmation: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to create affirmation")
     
+    def create_affirmations_bulk(self, user_id: int, affirmations: List[Dict], source: str = 'user_created',
+                                 journal_id: Optional[int] = None) -> List[Dict]:
+        """
+        Create many affirmations for a user in one INSERT and one commit.
+        
+        Args:
+            user_id: The ID of the user owning the affirmations
+            affirmations: Dicts with content and optional category, voice_enabled, voice_id
+            source: Source of the affirmations (user_created or ai_generated)
+            journal_id: Optional ID of the journal entry they are based on
+            
+        Returns:
+            Dicts with id, content, category, voice_id, created_at and updated_at,
+            in the order of `affirmations`
+        """
+        if not affirmations:
+            return []
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                'user_id': user_id,
+                'journal_id': journal_id,
+                'content': affirmation['content'],
+                'category': affirmation.get('category'),
+                'source': source,
+                'voice_enabled': affirmation.get('voice_enabled', False),
+                'voice_id': affirmation.get('voice_id'),
+                'is_active': True,
+                'how_many_times_seen': 0,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for affirmation in affirmations
+        ]
+        columns = (Affirmation.id, Affirmation.content, Affirmation.category, Affirmation.voice_id,
+                   Affirmation.created_at, Affirmation.updated_at)
+        
+        try:
+            if self.session.get_bind().dialect.insert_returning:
+                # One multi-row INSERT ... VALUES (...), (...) RETURNING; ids are handed
+                # out in VALUES order, so sorting by id restores the input order
+                created = []
+                for start in range(0, len(rows), BULK_INSERT_CHUNK):
+                    result = self.session.execute(
+                        insert(Affirmation).values(rows[start:start + BULK_INSERT_CHUNK]).returning(*columns)
+                    )
+                    created.extend(sorted((dict(row._mapping) for row in result), key=lambda row: row['id']))
+                # Core inserts skip the ORM flush hook that versions the collection
+                bump_collection_versions(self.session.connection(), [(user_id, AFFIRMATIONS)])
+                note_user_writes(self.session, [user_id])
+            else:
+                objects = [Affirmation(**row) for row in rows]
+                self.session.add_all(objects)
+                self.session.flush()
+                created = [{column.key: getattr(obj, column.key) for column in columns} for obj in objects]
+            
+            self.session.commit()
+            logger.debug(f"Bulk created {len(created)} affirmations for user {user_id}")
+            return created
+            
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error bulk creating affirmations: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to create affirmations")
+    
     def get_affirmation_by_id(self, affirmation_id: int) -> Optional[Affirmation]:
         """
         Get an affirmation by its ID.
@@ -107,6 +182,72 @@ class AffirmationRepository:
             logger.error(f"Error fetching user affirmations: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to fetch affirmations")
     
+    def get_feed(self, user_id: int, limit: int = 20, after_key: Optional[Tuple[datetime, int]] = None,
+                 category: Optional[str] = None) -> List[Tuple[Affirmation, datetime]]:
+        """
+        Next affirmations to show, most overdue first.
+        
+        Reads the stored due_at through the (user_id, is_active, due_at, id)
+        index, so a page is a range scan that stops after `limit` rows.
+        
+        Args:
+            user_id: The ID of the user
+            limit: Page size
+            after_key: (due_at, id) of the last row of the previous page
+            category: Optional category filter
+            
+        Returns:
+            List of (Affirmation, due_at) ordered by due_at, id
+        """
+        try:
+            query = select(Affirmation).where(
+                Affirmation.user_id == user_id,
+                Affirmation.is_active == True
+            )
+            if category:
+                query = query.where(Affirmation.category == category)
+            if after_key is not None:
+                after_due, affirmation_id = after_key
+                query = query.where(or_(
+                    Affirmation.due_at > after_due,
+                    and_(Affirmation.due_at == after_due, Affirmation.id > affirmation_id)
+                ))
+            query = query.order_by(Affirmation.due_at, Affirmation.id).limit(limit)
+            return [(affirmation, affirmation.due_at) for affirmation in self.session.execute(query).scalars()]
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching affirmation feed: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to fetch affirmation feed")
+    
+    def get_user_affirmation_texts(self, user_id: int) -> List[str]:
+        """Contents of the user's active affirmations, without loading ORM objects."""
+        try:
+            return list(self.session.execute(
+                select(Affirmation.content).where(
+                    Affirmation.user_id == user_id,
+                    Affirmation.is_active == True
+                )
+            ).scalars())
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching affirmation texts: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to fetch affirmations")
+    
+    def get_user_voices(self, user_id: int) -> List[Tuple[str, Optional[str]]]:
+        """(content, voice_id) of the user's active affirmations that have voice enabled."""
+        try:
+            return [tuple(row) for row in self.session.execute(
+                select(Affirmation.content, Affirmation.voice_id).where(
+                    Affirmation.user_id == user_id,
+                    Affirmation.is_active == True,
+                    Affirmation.voice_enabled == True
+                )
+            )]
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching affirmation voices: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to fetch affirmations")
+    
     def update_affirmation(self, affirmation_id: int, **kwargs) -> Optional[Affirmation]:
         """
         Update an affirmation with the provided fields.
@@ -125,7 +266,7 @@ class AffirmationRepository:
             
             # Update allowed fields
             updateable_fields = ['content', 'category', 'voice_enabled', 'voice_id', 
-                               'schedule_config', 'is_active']
+                               'schedule_config', 'next_fire_at', 'is_active']
             
             for field, value in kwargs.items():
                 if field in updateable_fields:
@@ -194,6 +335,7 @@ class AffirmationRepository:
             if seen:
                 affirmation.how_many_times_seen = (affirmation.how_many_times_seen or 0) + 1
                 affirmation.last_time_seen = now
+                affirmation.due_at = feed_due_at(affirmation.how_many_times_seen, now)
             
             if played:
                 affirmation.last_time_played = now
@@ -209,4 +351,195 @@ class AffirmationRepository:
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error updating affirmation stats: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to update affirmation stats")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail="Failed to update affirmation stats")
+    
+    def get_due_affirmations(self, until: datetime, after_key: Optional[Tuple[datetime, int]] = None,
+                             limit: int = 500) -> List[Tuple[int, datetime]]:
+        """
+        Range scan over the next_fire_at index.
+        
+        Args:
+            until: Upper bound (inclusive) for next_fire_at
+            after_key: (next_fire_at, id) of the last row of the previous page
+            limit: Page size
+            
+        Returns:
+            List of (id, next_fire_at) tuples ordered by next_fire_at, id
+        """
+        try:
+            query = select(Affirmation.id, Affirmation.next_fire_at).where(
+                Affirmation.next_fire_at <= until,
+                Affirmation.is_active == True
+            )
+            if after_key is not None:
+                fire_at, affirmation_id = after_key
+                query = query.where(or_(
+                    Affirmation.next_fire_at > fire_at,
+                    and_(Affirmation.next_fire_at == fire_at, Affirmation.id > affirmation_id)
+                ))
+            query = query.order_by(Affirmation.next_fire_at, Affirmation.id).limit(limit)
+            return [tuple(row) for row in self.session.execute(query)]
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching due affirmations: {str(e)}")
+            raise
+    
+    def get_upcoming_schedules(self, now: datetime, after_id: int = 0,
+                               limit: int = 500) -> List[Tuple[int, dict, datetime]]:
+        """
+        Page through scheduled affirmations that are not due yet.
+        
+        Args:
+            now: Rows with next_fire_at after this instant are returned
+            after_id: Last ID of the previous page
+            limit: Page size
+            
+        Returns:
+            List of (id, schedule_config, next_fire_at) ordered by id
+        """
+        query = select(Affirmation.id, Affirmation.schedule_config, Affirmation.next_fire_at).where(
+            Affirmation.next_fire_at > now,
+            Affirmation.is_active == True,
+            Affirmation.id > after_id
+        ).order_by(Affirmation.id).limit(limit)
+        return [tuple(row) for row in self.session.execute(query)]
+    
+    def get_affirmations_by_ids(self, affirmation_ids: List[int]) -> List[Affirmation]:
+        """
+        Get affirmations by their IDs.
+        
+        Args:
+            affirmation_ids: The IDs to fetch
+            
+        Returns:
+            List of Affirmation objects (missing IDs are left out)
+        """
+        if not affirmation_ids:
+            return []
+        return self.session.query(Affirmation).filter(Affirmation.id.in_(affirmation_ids)).all()
+    
+    def set_next_fire_times(self, updates: List[dict]) -> List[int]:
+        """
+        Move next_fire_at forward for fired affirmations, in one transaction.
+        
+        Each row is a compare-and-set: rows whose next_fire_at no longer equals
+        `expected_fire_at` were rescheduled, or already fired by another worker,
+        and are left untouched.  The statements run one per row because an
+        executemany UPDATE cannot report which rows matched.
+        
+        Args:
+            updates: Dicts with affirmation_id, expected_fire_at and new_fire_at
+            
+        Returns:
+            IDs of the affirmations whose next_fire_at was moved
+        """
+        if not updates:
+            return []
+        try:
+            table = Affirmation.__table__
+            stmt = (
+                table.update()
+                .where(table.c.id == bindparam('affirmation_id'))
+                .where(table.c.next_fire_at == bindparam('expected_fire_at'))
+                .values(next_fire_at=bindparam('new_fire_at'))
+            )
+            moved = [
+                update['affirmation_id'] for update in updates
+                if self.session.execute(stmt, update).rowcount == 1
+            ]
+            self.session.commit()
+            return moved
+            
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error updating next fire times: {str(e)}")
+            raise
+    
+    def _refresh_due_at(self, affirmation_ids: List[int]) -> None:
+        """
+        Recompute due_at after a Core UPDATE changed the seen counters.  Runs in the
+        caller's transaction, which holds the updated rows' locks.
+        """
+        table = Affirmation.__table__
+        ids = sorted(set(affirmation_ids))
+        for start in range(0, len(ids), DUE_AT_CHUNK):
+            rows = self.session.execute(
+                select(table.c.id, table.c.how_many_times_seen, table.c.last_time_seen)
+                .where(table.c.id.in_(ids[start:start + DUE_AT_CHUNK]))
+            ).all()
+            if rows:
+                self.session.execute(
+                    table.update()
+                    .where(table.c.id == bindparam('affirmation_id'))
+                    .values(due_at=bindparam('new_due_at')),
+                    [
+                        {'affirmation_id': affirmation_id, 'new_due_at': feed_due_at(seen_count, last_seen)}
+                        for affirmation_id, seen_count, last_seen in rows
+                    ]
+                )
+    
+    def mark_seen(self, affirmation_ids: List[int], seen_at: datetime) -> None:
+        """
+        Set last_time_seen for delivered affirmations in one UPDATE.
+        
+        Args:
+            affirmation_ids: IDs of the affirmations that were shown
+            seen_at: Delivery time (UTC)
+        """
+        if not affirmation_ids:
+            return
+        try:
+            self.session.query(Affirmation).filter(Affirmation.id.in_(affirmation_ids)).update(
+                {Affirmation.last_time_seen: seen_at}, synchronize_session=False
+            )
+            self._refresh_due_at(affirmation_ids)
+            self.session.commit()
+            
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error marking affirmations seen: {str(e)}")
+            raise
+    
+    def apply_stats_deltas(self, deltas: List[Dict]) -> None:
+        """
+        Apply aggregated seen/played events in one executemany UPDATE.
+        
+        Args:
+            deltas: Dicts with affirmation_id, owner_id, seen_delta and the latest
+                    seen_at / played_at (None when there was no such event)
+        """
+        if not deltas:
+            return
+        table = Affirmation.__table__
+        seen_at = bindparam('seen_at', type_=DateTime)
+        played_at = bindparam('played_at', type_=DateTime)
+        try:
+            self.session.execute(
+                table.update()
+                .where(table.c.id == bindparam('affirmation_id'))
+                .where(table.c.user_id == bindparam('owner_id'))
+                .values(
+                    how_many_times_seen=func.coalesce(table.c.how_many_times_seen, 0) + bindparam('seen_delta'),
+                    last_time_seen=case(
+                        (seen_at.is_(None), table.c.last_time_seen),
+                        (or_(table.c.last_time_seen.is_(None), table.c.last_time_seen < seen_at), seen_at),
+                        else_=table.c.last_time_seen
+                    ),
+                    last_time_played=case(
+                        (played_at.is_(None), table.c.last_time_played),
+                        (or_(table.c.last_time_played.is_(None), table.c.last_time_played < played_at), played_at),
+                        else_=table.c.last_time_played
+                    ),
+                ),
+                deltas
+            )
+            self._refresh_due_at([
+                delta['affirmation_id'] for delta in deltas
+                if delta['seen_delta'] or delta['seen_at'] is not None
+            ])
+            self.session.commit()
+            
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error applying affirmation stats: {str(e)}")
+            raise
@@ -0,0 +1,41 @@
+# db/repositories/collection_version_repository.py
+
+import logging
+from typing import Iterable, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.models.collection_version import CollectionVersion, bump_collection_versions
+from db.routing import note_user_writes
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionVersionRepository:
+    """
+    Per-user collection version counters.
+
+    ORM changes to tracked tables bump versions automatically (see
+    db/models/collection_version.py); Core INSERT/UPDATE/DELETE statements
+    on those tables call `bump` in the same transaction.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_version(self, user_id: int, collection: str) -> int:
+        """Current version of a user's collection; 0 if it never changed."""
+        version = self.session.execute(
+            select(CollectionVersion.version).where(
+                CollectionVersion.user_id == user_id,
+                CollectionVersion.collection == collection
+            )
+        ).scalar()
+        return version or 0
+
+    def bump(self, changes: Iterable[Tuple[int, str]]) -> None:
+        """Increment versions for (user_id, collection) pairs; the caller commits."""
+        changes = list(changes)
+        bump_collection_versions(self.session.connection(), changes)
+        note_user_writes(self.session, [user_id for user_id, _ in changes])
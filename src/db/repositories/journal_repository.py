@@ -1,8 +1,14 @@
 # db/repositories/journal_repository.py
 
+from sqlalchemy import select, delete, func, literal, true, union_all, String
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from db.models.journal import JournalEntry
+from db.models.journal import JournalEntry, PREVIEW_LENGTH
+from db.models.journal_tag import TAG_MAX_LENGTH, JournalTag
+from db.models.collection_version import JOURNAL_ENTRIES, bump_collection_versions
+from db.routing import note_user_writes
 from datetime import datetime
+from typing import Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,6 +55,39 @@ class JournalRepository:
         
         return entries, total
 
+    def get_entry_previews(self, user_id: int, limit: int = 20, offset: int = 0):
+        """
+        Lean list query: only the preview columns, newest first.
+
+        Fetches one row past `limit` so the caller can tell whether more
+        entries exist without counting. Rows written before `preview` existed
+        fall back to a SQL-side substring of the content.
+        """
+        rows = self.session.execute(
+            select(
+                JournalEntry.id,
+                func.coalesce(JournalEntry.preview, func.substr(JournalEntry.content, 1, PREVIEW_LENGTH)).label('preview'),
+                JournalEntry.mood,
+                JournalEntry.created_at,
+                JournalEntry.insights_flat
+            ).where(
+                JournalEntry.user_id == user_id,
+                JournalEntry.is_deleted == False
+            ).order_by(JournalEntry.created_at.desc(), JournalEntry.id.desc())
+            .limit(limit + 1)
+            .offset(offset)
+        ).all()
+        return rows[:limit], len(rows) > limit
+
+    def count_entries(self, user_id: int) -> int:
+        """Number of live entries for a user"""
+        return self.session.execute(
+            select(func.count()).select_from(JournalEntry).where(
+                JournalEntry.user_id == user_id,
+                JournalEntry.is_deleted == False
+            )
+        ).scalar_one()
+
     def update_entry(self, entry_id: int, user_id: int, **kwargs):
         """Update a journal entry"""
         entry = self.get_entry_by_id(entry_id, user_id)
@@ -72,4 +111,155 @@ class JournalRepository:
         entry.is_deleted = True
         entry.updated_at = datetime.utcnow()
         self.session.flush()
-        return True
\ No newline at end of file
+        return True
+
+    # ──────────────────────────────────────────────────────────────
+    # tags (journal_tags)
+    # ──────────────────────────────────────────────────────────────
+    @staticmethod
+    def normalize_tags(tags) -> List[str]:
+        """Strip, cut to the column length, drop empties and de-duplicate while keeping order."""
+        seen = []
+        for tag in tags or []:
+            tag = str(tag).strip()[:TAG_MAX_LENGTH].strip()
+            if tag and tag not in seen:
+                seen.append(tag)
+        return seen
+
+    def _insert_ignoring_duplicates(self):
+        """INSERT into journal_tags that skips (entry_id, tag) pairs already present."""
+        dialect = self.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            return postgresql.insert(JournalTag).on_conflict_do_nothing()
+        return sqlite.insert(JournalTag).on_conflict_do_nothing()
+
+    def get_owned_entry_ids(self, user_id: int, entry_ids: List[int]) -> List[int]:
+        """Return the subset of `entry_ids` that are live entries owned by the user."""
+        if not entry_ids:
+            return []
+        return list(self.session.execute(
+            select(JournalEntry.id).where(
+                JournalEntry.id.in_(entry_ids),
+                JournalEntry.user_id == user_id,
+                JournalEntry.is_deleted == False
+            ).order_by(JournalEntry.id)
+        ).scalars())
+
+    def get_entries_by_ids(self, user_id: int, entry_ids: List[int]) -> List[JournalEntry]:
+        """Live entries owned by the user, in the order of `entry_ids`."""
+        if not entry_ids:
+            return []
+        entries = self.session.execute(
+            select(JournalEntry).where(
+                JournalEntry.id.in_(entry_ids),
+                JournalEntry.user_id == user_id,
+                JournalEntry.is_deleted == False
+            )
+        ).scalars().all()
+        by_id = {entry.id: entry for entry in entries}
+        return [by_id[entry_id] for entry_id in entry_ids if entry_id in by_id]
+
+    def add_tags(self, user_id: int, entry_ids: List[int], tags: List[str]):
+        """Attach every tag to every owned entry with one INSERT ... SELECT."""
+        tags = self.normalize_tags(tags)
+        if not entry_ids or not tags:
+            return
+        tag_values = union_all(*[select(literal(tag, String).label('tag')) for tag in tags]).subquery()
+        # Keep the WHERE last: SQLite needs it to parse INSERT ... SELECT ... ON CONFLICT
+        rows = (
+            select(JournalEntry.id, JournalEntry.user_id, tag_values.c.tag)
+            .join(tag_values, true())
+            .where(
+                JournalEntry.id.in_(entry_ids),
+                JournalEntry.user_id == user_id,
+                JournalEntry.is_deleted == False
+            )
+        )
+        stmt = self._insert_ignoring_duplicates().from_select(['entry_id', 'user_id', 'tag'], rows)
+        self.session.execute(stmt)
+        bump_collection_versions(self.session.connection(), [(user_id, JOURNAL_ENTRIES)])
+        note_user_writes(self.session, [user_id])
+
+    def remove_tags(self, user_id: int, entry_ids: List[int], tags: List[str] = None):
+        """Detach the given tags (all tags when `tags` is None) with one DELETE."""
+        if not entry_ids:
+            return
+        stmt = delete(JournalTag).where(
+            JournalTag.user_id == user_id,
+            JournalTag.entry_id.in_(entry_ids)
+        )
+        if tags is not None:
+            stmt = stmt.where(JournalTag.tag.in_(self.normalize_tags(tags)))
+        self.session.execute(stmt)
+        bump_collection_versions(self.session.connection(), [(user_id, JOURNAL_ENTRIES)])
+        note_user_writes(self.session, [user_id])
+
+    def replace_tags(self, user_id: int, entry_ids: List[int], tags: List[str]):
+        """Make `tags` the exact tag set of every owned entry."""
+        self.remove_tags(user_id, entry_ids)
+        self.add_tags(user_id, entry_ids, tags)
+
+    def set_entry_tags(self, entry_id: int, user_id: int, tags: List[str]):
+        """Replace the tags of a single entry (used after AI analysis / edits)."""
+        self.replace_tags(user_id, [entry_id], tags)
+
+    def get_tags_for_entries(self, user_id: int, entry_ids: List[int]) -> Dict[int, List[str]]:
+        """Map entry id -> tags for a page of entries in one indexed query."""
+        tags_by_entry = {entry_id: [] for entry_id in entry_ids}
+        if not entry_ids:
+            return tags_by_entry
+        rows = self.session.execute(
+            select(JournalTag.entry_id, JournalTag.tag)
+            .where(JournalTag.user_id == user_id, JournalTag.entry_id.in_(entry_ids))
+            .order_by(JournalTag.entry_id, JournalTag.tag)
+        )
+        for entry_id, tag in rows:
+            tags_by_entry[entry_id].append(tag)
+        return tags_by_entry
+
+    def entry_ids_with_tags(self, user_id: int, tags: List[str]):
+        """Subquery of the user's entry ids carrying any of `tags` (hits ix_journal_tags_user_tag)."""
+        return select(JournalTag.entry_id).where(
+            JournalTag.user_id == user_id,
+            JournalTag.tag.in_(self.normalize_tags(tags))
+        )
+
+    def search_entries(self, user_id: int, query: str = None, mood: str = None, tags: List[str] = None,
+                       date_from: datetime = None, date_to: datetime = None, limit: int = 20):
+        """Search the user's entries by content, mood, tags and date range"""
+        q = self.session.query(JournalEntry).filter(
+            JournalEntry.user_id == user_id,
+            JournalEntry.is_deleted == False
+        )
+        if query:
+            q = q.filter(JournalEntry.content.ilike(f"%{query}%"))
+        if mood:
+            q = q.filter(JournalEntry.mood == mood)
+        if tags:
+            q = q.filter(JournalEntry.id.in_(self.entry_ids_with_tags(user_id, tags)))
+        if date_from:
+            q = q.filter(JournalEntry.created_at >= date_from)
+        if date_to:
+            q = q.filter(JournalEntry.created_at < date_to)
+
+        total = q.count()
+        entries = q.order_by(JournalEntry.created_at.desc()).limit(limit).all()
+        return entries, total
+
+    def get_pattern_extract(self, user_id: int, tags: List[str] = None):
+        """
+        Columnar extract for pattern analysis: (id, created_at, mood) rows of
+        the user's live entries plus their (entry_id, tag) rows.
+        """
+        entries = select(JournalEntry.id, JournalEntry.created_at, JournalEntry.mood).where(
+            JournalEntry.user_id == user_id,
+            JournalEntry.is_deleted == False
+        )
+        if tags:
+            entries = entries.where(JournalEntry.id.in_(self.entry_ids_with_tags(user_id, tags)))
+        entry_rows = self.session.execute(entries.order_by(JournalEntry.created_at)).all()
+
+        tag_rows = self.session.execute(
+            select(JournalTag.entry_id, JournalTag.tag).where(JournalTag.user_id == user_id)
+        ).all()
+        return entry_rows, tag_rows
@@ -1,12 +1,16 @@
 # db/repositories/message_repository.py
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException, status
+from sqlalchemy import func, select
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
+from db.message_archive import decode_messages, encode_messages, message_to_dict
+from db.models.chat import Chat
 from db.models.message import Message
+from db.models.message_archive import MessageArchiveSegment
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,23 +48,45 @@ class MessageRepository:
         Returns
         -------
         list[Message]
+
+        Archived messages come first in the chat's timeline; a page that
+        reaches into them is filled from the archive segments, decoding
+        only the segments it overlaps.
         """
         try:
-            q = (
-                self.session
-                .query(Message)
-                .filter(Message.chat_id == chat_id)
-            )
+            messages: List[Message] = []
+            skip, remaining = offset, limit
+            for segment in self._archive_segments(chat_id, since):
+                if remaining <= 0:
+                    break
+                # Whole segments before the page are skipped by their count
+                if (since is None or segment.first_timestamp > since) and skip >= segment.message_count:
+                    skip -= segment.message_count
+                    continue
+                archived = self._decode_segment(segment)
+                if since is not None:
+                    archived = [m for m in archived if m.timestamp > since]
+                page = archived[skip:skip + remaining]
+                skip = max(0, skip - len(archived))
+                messages.extend(page)
+                remaining -= len(page)
 
-            if since is not None:
-                q = q.filter(Message.timestamp > since)
+            if remaining > 0:
+                q = (
+                    self.session
+                    .query(Message)
+                    .filter(Message.chat_id == chat_id)
+                )
 
-            messages = (
-                q.order_by(Message.timestamp.asc())
-                 .offset(offset)
-                 .limit(limit)
-                 .all()
-            )
+                if since is not None:
+                    q = q.filter(Message.timestamp > since)
+
+                messages.extend(
+                    q.order_by(Message.timestamp.asc(), Message.id.asc())
+                     .offset(skip)
+                     .limit(remaining)
+                     .all()
+                )
 
             logger.debug(
                 "Fetched %s messages (chat_id=%s, limit=%s, offset=%s, since=%s)",
@@ -131,6 +157,14 @@ class MessageRepository:
                 .all()
             )
             rows.reverse()  # oldest → newest
+
+            # A chat that went quiet may have its recent history archived already
+            if len(rows) < n:
+                for segment in reversed(self._archive_segments(chat_id)):
+                    archived = self._decode_segment(segment)
+                    rows = archived[-(n - len(rows)):] + rows
+                    if len(rows) >= n:
+                        break
             return rows
         except SQLAlchemyError as exc:
             self.session.rollback()
@@ -139,3 +173,98 @@ class MessageRepository:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Database error while fetching messages",
             )
+
+    # ──────────────────────────────────────────────────────────────
+    # cold storage (db/message_archive.py)
+    # ──────────────────────────────────────────────────────────────
+    def _archive_segments(self, chat_id: int, since: Optional[datetime] = None) -> List[MessageArchiveSegment]:
+        """The chat's segments, oldest first; payloads load only when a segment is decoded."""
+        q = (
+            self.session.query(MessageArchiveSegment)
+            .options(defer(MessageArchiveSegment.payload))
+            .filter(MessageArchiveSegment.chat_id == chat_id)
+        )
+        if since is not None:
+            q = q.filter(MessageArchiveSegment.last_timestamp > since)
+        return q.order_by(MessageArchiveSegment.first_timestamp.asc(), MessageArchiveSegment.id.asc()).all()
+
+    @staticmethod
+    def _decode_segment(segment: MessageArchiveSegment) -> List[Message]:
+        try:
+            return decode_messages(segment.codec, segment.payload)
+        except (RuntimeError, ValueError) as exc:
+            logger.error("Cannot read archive segment %s: %s", segment.id, exc)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Archived messages are unavailable",
+            )
+
+    def chats_to_archive(self, *, before: datetime, min_messages: int, limit: int) -> List[Tuple[int, int]]:
+        """(chat_id, user_id) of chats with at least `min_messages` messages older than `before`."""
+        try:
+            return [
+                (chat_id, user_id)
+                for chat_id, user_id in self.session.execute(
+                    select(Message.chat_id, Chat.user_id)
+                    .join(Chat, Chat.id == Message.chat_id)
+                    .where(Message.timestamp < before)
+                    .group_by(Message.chat_id, Chat.user_id)
+                    .having(func.count(Message.id) >= min_messages)
+                    .limit(limit)
+                )
+            ]
+        except SQLAlchemyError as exc:
+            self.session.rollback()
+            logger.error("DB error while finding chats to archive: %s", exc, exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error while archiving messages",
+            )
+
+    def archive_messages(self, *, chat_id: int, before: datetime, segment_size: int = 500,
+                         max_messages: int = 10000) -> int:
+        """
+        Move the chat's messages older than `before` into compressed
+        segments, in one transaction.  Returns how many were archived; 0 if
+        another worker archived them first.
+        """
+        try:
+            rows = self.session.execute(
+                select(Message.__table__)
+                .where(Message.chat_id == chat_id, Message.timestamp < before)
+                .order_by(Message.timestamp.asc(), Message.id.asc())
+                .limit(max_messages)
+            ).mappings().all()
+
+            for start in range(0, len(rows), segment_size):
+                chunk = rows[start:start + segment_size]
+                codec, payload = encode_messages([message_to_dict(dict(row)) for row in chunk])
+                self.session.add(MessageArchiveSegment(
+                    chat_id=chat_id,
+                    message_count=len(chunk),
+                    first_message_id=chunk[0]["id"],
+                    last_message_id=chunk[-1]["id"],
+                    first_timestamp=chunk[0]["timestamp"],
+                    last_timestamp=chunk[-1]["timestamp"],
+                    codec=codec,
+                    payload=payload,
+                ))
+                deleted = self.session.execute(
+                    Message.__table__.delete().where(Message.id.in_([row["id"] for row in chunk]))
+                ).rowcount
+                if deleted != len(chunk):
+                    self.session.rollback()
+                    logger.info("Messages of chat_id=%s were archived concurrently, skipping", chat_id)
+                    return 0
+
+            self.session.commit()
+            logger.debug("Archived %s messages (chat_id=%s)", len(rows), chat_id)
+            return len(rows)
+
+        except SQLAlchemyError as exc:
+            self.session.rollback()
+            logger.error("DB error while archiving messages: %s", exc, exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error while archiving messages",
+            )
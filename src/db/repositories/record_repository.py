@@ -12,6 +12,7 @@ from db.models import ProcessedData, InitialData
 from models.split_record_dto import SplitRecordDTO
 
 from sqlalchemy import func, distinct
+from db.sql_functions import date_format
 from typing import List, Tuple
 from datetime import date
 
@@ -563,7 +564,7 @@ class RecordRepository:
 
     #     rows = (self.session
     #             .query(
-    #                 func.cast(func.strftime('%m', ProcessedData.record_date), int).label("month"),
+    #                 func.cast(date_format('%m', ProcessedData.record_date), int).label("month"),
     #                 func.count().label("record_total"),
     #                 func.count(distinct(ProcessedData.document_id)).label("file_count")
     #             )
@@ -582,13 +583,13 @@ class RecordRepository:
         return (
             self.session
                 .query(
-                    func.strftime('%Y-%m', ProcessedData.record_date).label('month'),
+                    date_format('%Y-%m', ProcessedData.record_date).label('month'),
                     func.count(ProcessedData.record_id).label('total_records'),
                     func.count(func.distinct(ProcessedData.document_id)).label('unique_files')
                 )
                 .filter(
                     ProcessedData.user_id == user_id,
-                    func.strftime('%Y', ProcessedData.record_date) == year
+                    date_format('%Y', ProcessedData.record_date) == year
                 )
                 .group_by('month')
                 .order_by('month')
@@ -3,6 +3,7 @@
 
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
+from db.sql_functions import date_format
 from datetime import datetime, date, timedelta
 import calendar
 from typing import Dict, List, Any, Optional, Tuple
@@ -86,7 +87,7 @@ class ReportRepository:
 
     def get_strftime_pattern(self, period_type: str) -> str:
         """
-        Given a period type, return the corresponding SQLite strftime pattern.
+        Given a period type, return the corresponding strftime pattern (see db/sql_functions.py).
         Allowed period types are "daily", "weekly", "monthly", and "yearly".
         """
         period_map = {
@@ -108,7 +109,7 @@ class ReportRepository:
         Build and execute a query to group ProcessedData records by period.
         """
         query = self.session.query(
-            func.strftime(strftime_pattern, ProcessedData.record_date).label("period"),
+            date_format(strftime_pattern, ProcessedData.record_date).label("period"),
             func.count(ProcessedData.record_id).label("frequency")
         ).filter(
             ProcessedData.user_id == user_id,
@@ -395,8 +396,7 @@ class ReportRepository:
         query = query.group_by(ProcessedData.category, ProcessedData.subcategory)
 
         try:
-            from sqlalchemy.dialects import sqlite
-            compiled_query = query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+            compiled_query = query.statement.compile(dialect=self.session.get_bind().dialect, compile_kwargs={"literal_binds": True})
             logger.debug("Compiled SQL Query: %s", compiled_query)
         except Exception as compile_exc:
             logger.debug("Could not compile query: %s", compile_exc)
@@ -575,7 +575,7 @@ class ReportRepository:
             end_date_obj = datetime.fromisoformat(end_date)
 
         months = self.session.query(
-            func.strftime('%Y-%m', ProcessedData.record_date).label('month')
+            date_format('%Y-%m', ProcessedData.record_date).label('month')
         ).filter(
             ProcessedData.user_id == user_id,
             ProcessedData.record_date >= start_date_obj,
@@ -583,7 +583,7 @@ class ReportRepository:
         )
         if bank_account_id is not None:
             months = months.filter(ProcessedData.document_id == bank_account_id)
-        months = months.group_by(func.strftime('%Y-%m', ProcessedData.record_date)).all()
+        months = months.group_by(date_format('%Y-%m', ProcessedData.record_date)).all()
         logger.debug(f"Found months: {months}")
 
         historical_frequencies = []
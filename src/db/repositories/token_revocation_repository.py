@@ -0,0 +1,74 @@
+# db/repositories/token_revocation_repository.py
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from db.models.revoked_token import RevokedToken
+from db.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationRepository:
+    """
+    Persistent side of token revocation: the revoked_tokens denylist and
+    the per-user users.token_epoch counters.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def revoke_jti(self, jti: str, user_id: int, expires_at: datetime) -> None:
+        try:
+            self.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            self.session.commit()
+        except IntegrityError:
+            # Already revoked
+            self.session.rollback()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error revoking token: {str(e)}")
+            raise
+
+    def is_jti_revoked(self, jti: str) -> bool:
+        return self.session.execute(
+            select(RevokedToken.jti).where(RevokedToken.jti == jti)
+        ).first() is not None
+
+    def active_jtis(self, now: datetime, batch_size: int = 5000) -> Iterator[str]:
+        """jtis of revoked tokens that have not expired yet."""
+        result = self.session.execute(
+            select(RevokedToken.jti).where(RevokedToken.expires_at > now)
+            .execution_options(yield_per=batch_size)
+        )
+        for (jti,) in result:
+            yield jti
+
+    def purge_expired(self, now: datetime) -> int:
+        result = self.session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        self.session.commit()
+        return result.rowcount
+
+    def bump_token_epoch(self, user_id: int) -> Optional[int]:
+        """Revoke all of a user's tokens; returns the new epoch, or None for an unknown user."""
+        try:
+            self.session.execute(
+                update(User).where(User.user_id == user_id).values(token_epoch=User.token_epoch + 1)
+            )
+            epoch = self.session.execute(select(User.token_epoch).where(User.user_id == user_id)).scalar()
+            self.session.commit()
+            return epoch
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error bumping token epoch for user {user_id}: {str(e)}")
+            raise
+
+    def token_epochs(self) -> Dict[str, int]:
+        """Epochs of users who ever revoked all their tokens, keyed like the `sub` claim."""
+        rows = self.session.execute(select(User.user_id, User.token_epoch).where(User.token_epoch > 0))
+        return {str(user_id): epoch for user_id, epoch in rows}
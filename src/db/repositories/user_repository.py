@@ -1,14 +1,15 @@
 # db/repositories/user_repository.py
 from sqlalchemy.inspection import inspect
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import DateTime, bindparam, case, or_, select
 from datetime import datetime
 from fastapi import HTTPException
 from passlib.context import CryptContext
 import logging
 
-from db.models import User
-from typing import Optional
+from db.models import Chat, User, UserDetails, UserShard, LoginTimeLog
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +66,52 @@ class UserRepository:
         #     logger.error(f"Error adding new user: {str(e)}")
         #     raise HTTPException(status_code=500, detail="Error adding new user")
         
+    def create_account(self, email: str, hashed_password: str, chat_settings: Optional[dict] = None,
+                       shard: Optional[int] = None) -> Tuple[int, Optional[int]]:
+        """
+        Create the user, its UserDetails row and the default chat in one transaction.
+
+        Either all rows exist afterwards or none do.  A concurrent
+        registration of the same email is caught by the unique constraint.
+        Without `chat_settings` no chat is created; a user placed on
+        another chat shard gets theirs there.  `shard` records the
+        user's chat shard in the same transaction.
+
+        Returns:
+            (user_id, chat_id or None)
+        """
+        try:
+            now = datetime.utcnow()
+            db_user = User(
+                email=email,
+                password_hash=hashed_password,
+                created_at=now,
+                name=""
+            )
+            db_user.user_details = UserDetails()
+            self.session.add(db_user)
+            # The chat needs the generated user_id; flushing stays inside the transaction
+            self.session.flush()
+
+            if shard is not None:
+                self.session.add(UserShard(user_id=db_user.user_id, shard=shard))
+            chat = None
+            if chat_settings is not None:
+                chat = Chat(user_id=db_user.user_id, settings=chat_settings, created_at=now)
+                self.session.add(chat)
+            self.session.commit()
+
+            return db_user.user_id, chat.id if chat is not None else None
+
+        except IntegrityError:
+            self.session.rollback()
+            logger.error(f"Email already registered: {email}")
+            raise HTTPException(status_code=400, detail="Email already registered")
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error creating account: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error adding new user")
+
     def get_user_profile(self, user_id: int) -> Optional[User]:
         """
         Fetch a single User row by its primary-key ID.
@@ -98,6 +145,50 @@ class UserRepository:
         return db_user is not None
     
 
+    def record_logins(self, logins: List[Dict]) -> None:
+        """
+        Write buffered logins: one executemany INSERT into login_time_logs and
+        one executemany UPDATE of user_details.last_login_at.
+
+        Args:
+            logins: Dicts with login_user_id and login_at, one per login event.
+                    Users without a user_details row are skipped.
+        """
+        if not logins:
+            return
+        latest = {}
+        for login in logins:
+            user_id, at = login["login_user_id"], login["login_at"]
+            if user_id not in latest or latest[user_id] < at:
+                latest[user_id] = at
+
+        details = UserDetails.__table__
+        last_login_at = bindparam('login_at', type_=DateTime)
+        try:
+            self.session.execute(
+                LoginTimeLog.__table__.insert().from_select(
+                    ['setting_id', 'login_datetime'],
+                    select(details.c.setting_id, last_login_at)
+                    .where(details.c.user_id == bindparam('login_user_id'))
+                ),
+                logins
+            )
+            self.session.execute(
+                details.update()
+                .where(details.c.user_id == bindparam('login_user_id'))
+                .values(last_login_at=case(
+                    (or_(details.c.last_login_at.is_(None), details.c.last_login_at < last_login_at), last_login_at),
+                    else_=details.c.last_login_at
+                )),
+                [{"login_user_id": user_id, "login_at": at} for user_id, at in latest.items()]
+            )
+            self.session.commit()
+
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error recording logins: {str(e)}")
+            raise
+
     def get_user_list_with_pagination(self, page, page_size, country,  user_id, email,sort_by, sort_order ):
         pass
 
@@ -0,0 +1,153 @@
+# db/routing.py
+"""
+Read/write session routing.
+
+`RoutingSessionFactory` is the container's `session_factory`.  Calling it
+works exactly like the plain sessionmaker it replaces and returns a
+session on the primary, so every existing write path is unchanged.
+Read-only service calls ask for `for_read(user_id)` instead, which
+round-robins over the replica engines.
+
+Replicas lag behind the primary.  So that users see their own changes,
+a user whose data was committed on the primary within the last
+`stickiness_seconds` reads from the primary too.  Commits record the
+`user_id` of every ORM object they flushed.  Core statements that bypass
+the ORM record theirs with `note_user_writes`.  The window is tracked per
+process, so it covers a client that stays on one worker.
+
+Replica sessions refuse to flush, so a misrouted write fails loudly
+instead of reaching a read-only server.
+
+Replicas also lag by different amounts.  Reads that must agree with each
+other, such as a list and its ETag, run inside `pinned_reads()`: the first
+`for_read(user_id)` in the block picks the server, and later ones for the
+same user reuse it.
+"""
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+_WRITTEN_USERS = "written_user_ids"
+
+# (factory id, user_id) -> replica index, None for the primary; set inside pinned_reads()
+_PINNED_READS: ContextVar[Optional[dict]] = ContextVar("pinned_reads", default=None)
+
+
+def note_user_writes(session: Session, user_ids: Iterable[int]):
+    """Record users whose rows a Core statement in this session changed."""
+    session.info.setdefault(_WRITTEN_USERS, set()).update(
+        user_id for user_id in user_ids if user_id is not None
+    )
+
+
+def _refuse_writes(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError("Read replica sessions cannot write; use the primary session_factory()")
+
+
+class RoutingSessionFactory(sessionmaker):
+    """
+    Args:
+        bind: primary engine
+        replica_engines: read replica engines; with none, reads use the primary
+        stickiness_seconds: how long a user's reads stay on the primary after a write
+    """
+
+    def __init__(self, bind, replica_engines: Optional[List] = None, stickiness_seconds: float = 5.0, **kw):
+        super().__init__(bind=bind, **kw)
+        self.stickiness_seconds = stickiness_seconds
+        self.replicas = [sessionmaker(bind=engine, **kw) for engine in replica_engines or []]
+        for replica in self.replicas:
+            event.listen(replica, "before_flush", _refuse_writes)
+        self._next_replica = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+        # user_id -> monotonic time until which the user reads from the primary
+        self._sticky: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._counters = {"primary_reads": 0, "replica_reads": 0, "sticky_reads": 0}
+
+        event.listen(self, "after_flush", self._collect_written_users)
+        event.listen(self, "after_commit", self._commit_written_users)
+        event.listen(self, "after_rollback", self._discard_written_users)
+
+    # ──────────────────────────────────────────────────────────────
+    # write tracking
+    # ──────────────────────────────────────────────────────────────
+    @staticmethod
+    def _collect_written_users(session, flush_context):
+        note_user_writes(
+            session,
+            (getattr(obj, "user_id", None) for obj in (*session.new, *session.dirty, *session.deleted))
+        )
+
+    def _commit_written_users(self, session):
+        user_ids = session.info.pop(_WRITTEN_USERS, None)
+        if user_ids:
+            self.mark_written(user_ids)
+
+    @staticmethod
+    def _discard_written_users(session):
+        session.info.pop(_WRITTEN_USERS, None)
+
+    def mark_written(self, user_ids: Iterable[int]):
+        if not self.replicas:
+            return
+        until = time.monotonic() + self.stickiness_seconds
+        with self._lock:
+            for user_id in user_ids:
+                self._sticky[int(user_id)] = until
+            if len(self._sticky) > 10000:
+                now = time.monotonic()
+                self._sticky = {user_id: t for user_id, t in self._sticky.items() if t > now}
+
+    def is_sticky(self, user_id: int) -> bool:
+        with self._lock:
+            until = self._sticky.get(int(user_id))
+        return until is not None and until > time.monotonic()
+
+    # ──────────────────────────────────────────────────────────────
+    # routing
+    # ──────────────────────────────────────────────────────────────
+    def for_read(self, user_id: Optional[int] = None) -> Session:
+        """A session for read-only work on behalf of `user_id`."""
+        if not self.replicas:
+            self._counters["primary_reads"] += 1
+            return self()
+        pins = _PINNED_READS.get()
+        key = (id(self), user_id)
+        if pins is not None and key in pins:
+            index = pins[key]
+            return self() if index is None else self.replicas[index]()
+
+        if user_id is not None and self.is_sticky(user_id):
+            self._counters["sticky_reads"] += 1
+            index = None
+        else:
+            with self._lock:
+                index = next(self._next_replica)
+            self._counters["replica_reads"] += 1
+        if pins is not None:
+            pins[key] = index
+        return self() if index is None else self.replicas[index]()
+
+    @contextmanager
+    def pinned_reads(self):
+        """Route every for_read(user_id) in the block to the server the first one picked."""
+        token = _PINNED_READS.set({})
+        try:
+            yield
+        finally:
+            _PINNED_READS.reset(token)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self._counters, replicas=len(self.replicas), sticky_users=len(self._sticky))
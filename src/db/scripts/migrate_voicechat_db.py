@@ -0,0 +1,226 @@
+# migrate_voicechat_db.py
+
+#  python -m db.scripts.migrate_voicechat_db
+#
+# Brings an existing database (DATABASE_URL, or the local voicechat.db) up to
+# the current models. Every step is idempotent, so the script can be re-run
+# after each deploy. Column types are spelled so both SQLite and PostgreSQL
+# accept them.
+
+from sqlalchemy import BigInteger, bindparam, exists, func, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+from db.models import Base, Affirmation, JournalEntry, JournalTag, LoginTimeLog, Message, UserDetails  # This imports all models via models/__init__.py
+from db.models.affirmation import feed_due_at
+from db.models.journal import PREVIEW_LENGTH, content_hash_of, flatten_insights
+from db.repositories.journal_repository import JournalRepository
+from db.session import database_url, get_engine
+from datetime import datetime
+
+BATCH_SIZE = 1000
+
+
+def migrate_journal_tags(session):
+    """
+    Copy the JSON `journal_entries.tags` into journal_tags for entries that have
+    no journal_tags rows yet.  Tags are normalized like the app does, which cuts
+    them to the column length.
+    """
+    has_tag_rows = exists().where(JournalTag.entry_id == JournalEntry.id)
+    rows = session.execute(
+        select(JournalEntry.id, JournalEntry.user_id, JournalEntry.tags)
+        .where(JournalEntry.tags.isnot(None), ~has_tag_rows)
+    ).all()
+    batch, copied = [], 0
+    for entry_id, user_id, tags in rows:
+        for tag in JournalRepository.normalize_tags(tags if isinstance(tags, list) else []):
+            batch.append({"entry_id": entry_id, "user_id": user_id, "tag": tag})
+        if len(batch) >= BATCH_SIZE:
+            session.execute(JournalTag.__table__.insert(), batch)
+            copied += len(batch)
+            batch = []
+    if batch:
+        session.execute(JournalTag.__table__.insert(), batch)
+        copied += len(batch)
+    session.commit()
+    print(f"Copied {copied} tags into journal_tags.")
+
+
+def add_missing_columns(engine, table, columns):
+    """ALTER TABLE ... ADD COLUMN for each (name, ddl_type) not present yet."""
+    existing = {column["name"] for column in inspect(engine).get_columns(table)}
+    with engine.begin() as connection:
+        for name, ddl_type in columns:
+            if name not in existing:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl_type}"))
+                print(f"Added {table}.{name}")
+
+
+def widen_chat_ids(engine):
+    """PostgreSQL: chat and message ids become BIGINT, sharded ids (db/sharding.py) outgrow INTEGER."""
+    if engine.dialect.name != "postgresql":
+        return
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table, name in [("chats", "id"), ("messages", "id"), ("messages", "chat_id")]:
+            column = next(c for c in inspector.get_columns(table) if c["name"] == name)
+            if not isinstance(column["type"], BigInteger):
+                connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {name} TYPE BIGINT"))
+                print(f"Widened {table}.{name} to BIGINT")
+
+
+def migrate_journal_previews(session):
+    """Fill `preview` / `insights_flat` for entries written before they existed."""
+    rows = session.execute(
+        select(JournalEntry.id, JournalEntry.content, JournalEntry.insights)
+        .where(JournalEntry.preview.is_(None))
+    ).all()
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(
+            JournalEntry.__table__.update()
+            .where(JournalEntry.id == bindparam("entry_id"))
+            .values(preview=bindparam("preview"), insights_flat=bindparam("insights_flat")),
+            [
+                {"entry_id": entry_id, "preview": (content or "")[:PREVIEW_LENGTH], "insights_flat": flatten_insights(insights)}
+                for entry_id, content, insights in rows[start:start + BATCH_SIZE]
+            ]
+        )
+    session.commit()
+    print(f"Backfilled previews for {len(rows)} journal entries.")
+
+
+def migrate_journal_hashes(session):
+    """Fill `content_hash`; processed entries count as analyzed from their current content."""
+    rows = session.execute(
+        select(JournalEntry.id, JournalEntry.content, JournalEntry.processed)
+        .where(JournalEntry.content_hash.is_(None))
+    ).all()
+    for start in range(0, len(rows), BATCH_SIZE):
+        params = []
+        for entry_id, content, processed in rows[start:start + BATCH_SIZE]:
+            content_hash = content_hash_of(content)
+            params.append({
+                "entry_id": entry_id,
+                "content_hash": content_hash,
+                "analyzed_hash": content_hash if processed else None,
+            })
+        session.execute(
+            JournalEntry.__table__.update()
+            .where(JournalEntry.id == bindparam("entry_id"))
+            .values(content_hash=bindparam("content_hash"), analyzed_hash=bindparam("analyzed_hash")),
+            params
+        )
+    session.commit()
+    print(f"Backfilled content hashes for {len(rows)} journal entries.")
+
+
+def migrate_affirmation_schedules(session):
+    """Compute next_fire_at for scheduled affirmations that don't have one yet."""
+    from impl.services.affirmations.schedule_compiler import compile_schedule, next_occurrences
+
+    rows = session.execute(
+        select(Affirmation.id, Affirmation.schedule_config)
+        .where(Affirmation.schedule_config.isnot(None), Affirmation.next_fire_at.is_(None), Affirmation.is_active == True)
+    ).all()
+    next_times = next_occurrences([compile_schedule(schedule_config) for _, schedule_config in rows], datetime.utcnow())
+    params = [
+        {"affirmation_id": affirmation_id, "new_fire_at": next_fire_at}
+        for (affirmation_id, _), next_fire_at in zip(rows, next_times)
+    ]
+    params = [p for p in params if p["new_fire_at"] is not None]
+    for start in range(0, len(params), BATCH_SIZE):
+        session.execute(
+            Affirmation.__table__.update()
+            .where(Affirmation.id == bindparam("affirmation_id"))
+            .values(next_fire_at=bindparam("new_fire_at")),
+            params[start:start + BATCH_SIZE]
+        )
+    session.commit()
+    print(f"Scheduled {len(params)} affirmations.")
+
+
+def migrate_affirmation_due_at(session):
+    """Fill the feed's due_at for affirmations written before it existed."""
+    rows = session.execute(
+        select(Affirmation.id, Affirmation.how_many_times_seen, Affirmation.last_time_seen)
+        .where(Affirmation.due_at.is_(None))
+    ).all()
+    params = [
+        {"affirmation_id": affirmation_id, "new_due_at": feed_due_at(seen_count, last_seen)}
+        for affirmation_id, seen_count, last_seen in rows
+    ]
+    for start in range(0, len(params), BATCH_SIZE):
+        session.execute(
+            Affirmation.__table__.update()
+            .where(Affirmation.id == bindparam("affirmation_id"))
+            .values(due_at=bindparam("new_due_at")),
+            params[start:start + BATCH_SIZE]
+        )
+    session.commit()
+    print(f"Computed the feed due time of {len(params)} affirmations.")
+
+
+def migrate_last_login(session):
+    """Fill user_details.last_login_at from the existing login_time_logs."""
+    latest = (
+        select(func.max(LoginTimeLog.login_datetime))
+        .where(LoginTimeLog.setting_id == UserDetails.setting_id)
+        .scalar_subquery()
+    )
+    result = session.execute(
+        UserDetails.__table__.update()
+        .where(UserDetails.last_login_at.is_(None))
+        .values(last_login_at=latest)
+    )
+    session.commit()
+    print(f"Backfilled last_login_at for {result.rowcount} users.")
+
+
+def main():
+    # Same engine setup as the app; switches an existing SQLite database to WAL
+    engine = get_engine(database_url())
+
+    # New tables (and their indexes) are created, existing ones are left alone
+    Base.metadata.create_all(engine)
+    print(f"Tables: {', '.join(sorted(inspect(engine).get_table_names()))}")
+
+    add_missing_columns(engine, "journal_entries", [
+        ("preview", f"VARCHAR({PREVIEW_LENGTH})"),
+        ("insights_flat", "JSON"),
+        ("content_hash", "VARCHAR(64)"),
+        ("analyzed_hash", "VARCHAR(64)"),
+    ])
+    add_missing_columns(engine, "affirmations", [
+        ("next_fire_at", "TIMESTAMP"),
+        # Left nullable so migrate_affirmation_due_at finds the rows to fill
+        ("due_at", "TIMESTAMP"),
+    ])
+    add_missing_columns(engine, "users", [
+        ("token_epoch", "INTEGER NOT NULL DEFAULT 0"),
+    ])
+    add_missing_columns(engine, "user_details", [
+        ("last_login_at", "TIMESTAMP"),
+    ])
+    widen_chat_ids(engine)
+    # Superseded by ix_affirmations_user_active_due
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX IF EXISTS ix_affirmations_user_active_seen"))
+    # Chat shards other than the primary get their indexes from `rebalance_chat_shards init`
+    for index in [*Affirmation.__table__.indexes, *LoginTimeLog.__table__.indexes, *Message.__table__.indexes]:
+        index.create(engine, checkfirst=True)
+
+    session = sessionmaker(bind=engine)()
+    try:
+        migrate_journal_tags(session)
+        migrate_journal_previews(session)
+        migrate_journal_hashes(session)
+        migrate_affirmation_schedules(session)
+        migrate_affirmation_due_at(session)
+        migrate_last_login(session)
+    finally:
+        session.close()
+
+    print("Database migrated successfully.")
+
+
+if __name__ == "__main__":
+    main()
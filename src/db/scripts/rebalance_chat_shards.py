@@ -0,0 +1,326 @@
+# rebalance_chat_shards.py
+
+#  python -m db.scripts.rebalance_chat_shards init
+#  python -m db.scripts.rebalance_chat_shards status
+#  python -m db.scripts.rebalance_chat_shards move <user_id> <shard>
+#  python -m db.scripts.rebalance_chat_shards rebalance [--max-moves 100] [--dry-run]
+#
+# Manages the chat shards configured by CHAT_SHARD_URLS (see db/sharding.py).
+# `init` creates the chat tables on every shard, and any of their indexes
+# missing from tables that already exist.  Run it after adding a shard,
+# before the app gets the new CHAT_SHARD_URLS, and after upgrades that add
+# chat indexes.  `rebalance` moves the
+# users with the most messages off the fullest shards.
+#
+# A move flags the users as moving, so the app answers 503 for their chats,
+# and fences them on the source shard.  The app checks the fence in every
+# transaction that writes chats or messages, so requests already running
+# when the move starts fail with 503 too instead of writing behind the copy.
+# The move then waits until every worker's cached shard lookup has expired
+# and copies the rows with their ids to the target.  It compares the source
+# with what was copied, retrying the copy if the source changed meanwhile,
+# flips the map and deletes exactly the copied source rows.  A failed move
+# lifts the fence, clears the flag and leaves the user on the source;
+# re-running it first drops the partial copy.
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.schema import CreateSchema
+
+from db.models import Chat, Message, MessageArchiveSegment, ShardFence, UserShard
+from db.routing import RoutingSessionFactory
+from db.session import database_url, get_engine, get_shard_engines, shard_database_urls
+from db.sharding import SHARDED_TABLES, ShardMap
+
+BATCH_SIZE = 1000
+
+# Copies attempted while the source keeps changing before a move gives up
+COPY_ATTEMPTS = 3
+
+
+def open_shard_map():
+    primary = get_engine(database_url())
+    return ShardMap(RoutingSessionFactory(bind=primary), get_shard_engines(shard_database_urls()))
+
+
+def init_shards(shard_map):
+    """Create the chat tables (and PostgreSQL schemas) and their indexes on every shard."""
+    for shard in range(shard_map.shard_count):
+        engine = shard_map.shards[shard].kw["bind"]
+        schema = (engine.get_execution_options().get("schema_translate_map") or {}).get(None)
+        with engine.begin() as connection:
+            if schema:
+                connection.execute(CreateSchema(schema, if_not_exists=True))
+            SHARDED_TABLES[0].metadata.create_all(connection, tables=SHARDED_TABLES)
+            # create_all skips the indexes of tables that already exist
+            for table in SHARDED_TABLES:
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+        print(f"Shard {shard}: chat tables ready{f' in schema {schema}' if schema else ''}")
+
+
+def shard_loads(shard_map):
+    """{shard: {user_id: message count}} from the data each shard actually holds."""
+    loads = {}
+    for shard in range(shard_map.shard_count):
+        session = shard_map.session_for_shard(shard)
+        try:
+            rows = session.execute(
+                select(Chat.user_id, func.count(Message.id))
+                .select_from(Chat)
+                .outerjoin(Message, Message.chat_id == Chat.id)
+                .group_by(Chat.user_id)
+            )
+            loads[shard] = {user_id: messages for user_id, messages in rows}
+        finally:
+            session.close()
+    return loads
+
+
+def plan_rebalance(loads, max_moves):
+    """
+    Greedy plan: move the largest user from the fullest shard to the
+    emptiest one, as long as that narrows the gap between the two.
+    """
+    loads = {shard: dict(users) for shard, users in loads.items()}
+    totals = {shard: sum(users.values()) for shard, users in loads.items()}
+    moves = []
+    while len(moves) < max_moves:
+        source = max(totals, key=totals.get)
+        target = min(totals, key=totals.get)
+        gap = totals[source] - totals[target]
+        candidates = [(messages, user_id) for user_id, messages in loads[source].items() if 0 < messages <= gap / 2]
+        if not candidates:
+            break
+        messages, user_id = max(candidates)
+        loads[target][user_id] = loads[source].pop(user_id)
+        totals[source] -= messages
+        totals[target] += messages
+        moves.append((user_id, source, target, messages))
+    return moves
+
+
+def current_shard(session, user_id):
+    row = session.get(UserShard, user_id)
+    return row.shard if row else 0
+
+
+def set_moving(shard_map, user_ids, moving):
+    session = shard_map.session_factory()
+    try:
+        for user_id in user_ids:
+            row = session.get(UserShard, user_id)
+            if row is None:
+                row = UserShard(user_id=user_id, shard=0)
+                session.add(row)
+            row.moving = moving
+        session.commit()
+    finally:
+        session.close()
+
+
+def set_fence(shard_map, user_id, shard, fenced):
+    """Freeze (or release) the user's rows on `shard`; see db/sharding.py."""
+    session = shard_map.session_for_shard(shard)
+    try:
+        if fenced:
+            # Waits for in-flight writers holding share locks on these chats
+            session.execute(select(Chat.id).where(Chat.user_id == user_id).with_for_update())
+            if session.get(ShardFence, user_id) is None:
+                session.add(ShardFence(user_id=user_id, created_at=datetime.utcnow()))
+        else:
+            session.execute(ShardFence.__table__.delete().where(ShardFence.user_id == user_id))
+        session.commit()
+    finally:
+        session.close()
+
+
+def user_row_ids(session, user_id):
+    """Ids of the user's chats, messages and archive segments on one shard."""
+    chat_ids = set(session.execute(select(Chat.id).where(Chat.user_id == user_id)).scalars())
+    message_ids, segment_ids = set(), set()
+    ordered = sorted(chat_ids)
+    for start in range(0, len(ordered), BATCH_SIZE):
+        batch = ordered[start:start + BATCH_SIZE]
+        message_ids.update(session.execute(select(Message.id).where(Message.chat_id.in_(batch))).scalars())
+        segment_ids.update(session.execute(
+            select(MessageArchiveSegment.id).where(MessageArchiveSegment.chat_id.in_(batch))
+        ).scalars())
+    return {"chats": chat_ids, "messages": message_ids, "segments": segment_ids}
+
+
+def _delete_rows(session, row_ids):
+    for table, key in [(Message.__table__, "messages"), (MessageArchiveSegment.__table__, "segments"), (Chat.__table__, "chats")]:
+        ids = sorted(row_ids[key])
+        for start in range(0, len(ids), BATCH_SIZE):
+            session.execute(table.delete().where(table.c.id.in_(ids[start:start + BATCH_SIZE])))
+
+
+def copy_user(shard_map, user_id, source, target):
+    """
+    Copy the user's chats, messages and archive segments, message and chat
+    ids included.  Returns the source row ids that were copied.
+    """
+    src = shard_map.session_for_shard(source)
+    dst = shard_map.session_for_shard(target)
+    try:
+        # Leftovers of an earlier, failed attempt
+        _delete_rows(dst, user_row_ids(dst, user_id))
+
+        copied = {"chats": set(), "messages": set(), "segments": set()}
+        chats = src.execute(select(Chat.__table__).where(Chat.user_id == user_id)).mappings().all()
+        if chats:
+            dst.execute(Chat.__table__.insert(), [dict(chat) for chat in chats])
+        copied["chats"].update(chat["id"] for chat in chats)
+
+        chat_ids = [chat["id"] for chat in chats]
+        for start in range(0, len(chat_ids), BATCH_SIZE):
+            messages = src.execute(
+                select(Message.__table__).where(Message.chat_id.in_(chat_ids[start:start + BATCH_SIZE]))
+            ).mappings().all()
+            for offset in range(0, len(messages), BATCH_SIZE):
+                dst.execute(Message.__table__.insert(), [dict(m) for m in messages[offset:offset + BATCH_SIZE]])
+            copied["messages"].update(m["id"] for m in messages)
+            # Archive segments too; their own ids are per shard
+            segments = src.execute(
+                select(MessageArchiveSegment.__table__)
+                .where(MessageArchiveSegment.chat_id.in_(chat_ids[start:start + BATCH_SIZE]))
+            ).mappings().all()
+            if segments:
+                dst.execute(
+                    MessageArchiveSegment.__table__.insert(),
+                    [{k: v for k, v in segment.items() if k != "id"} for segment in segments]
+                )
+            copied["segments"].update(segment["id"] for segment in segments)
+        dst.commit()
+        return copied
+    except Exception:
+        dst.rollback()
+        raise
+    finally:
+        src.close()
+        dst.close()
+
+
+def copy_verified(shard_map, user_id, source, target):
+    """Copy until the source still matches what was copied; None if it never settles."""
+    for _ in range(COPY_ATTEMPTS):
+        copied = copy_user(shard_map, user_id, source, target)
+        src = shard_map.session_for_shard(source)
+        try:
+            current = user_row_ids(src, user_id)
+        finally:
+            src.close()
+        if current == copied:
+            return copied
+        print(f"user {user_id}: shard {source} changed during the copy, copying again")
+    return None
+
+
+def abort_move(shard_map, user_id, source, target):
+    dst = shard_map.session_for_shard(target)
+    try:
+        _delete_rows(dst, user_row_ids(dst, user_id))
+        dst.commit()
+    finally:
+        dst.close()
+    set_fence(shard_map, user_id, source, False)
+    set_moving(shard_map, [user_id], False)
+
+
+def move_users(shard_map, moves, settle_seconds):
+    """moves: [(user_id, target)]."""
+    session = shard_map.session_factory()
+    try:
+        moves = [(user_id, current_shard(session, user_id), target) for user_id, target in moves]
+    finally:
+        session.close()
+    moves = [(user_id, source, target) for user_id, source, target in moves if source != target]
+    if not moves:
+        print("Nothing to move.")
+        return
+
+    user_ids = [user_id for user_id, _, _ in moves]
+    set_moving(shard_map, user_ids, True)
+    for user_id, source, _ in moves:
+        set_fence(shard_map, user_id, source, True)
+    print(f"Flagged {len(user_ids)} users as moving; waiting {settle_seconds:.0f}s for cached lookups to expire")
+    time.sleep(settle_seconds)
+
+    for user_id, source, target in moves:
+        try:
+            copied = copy_verified(shard_map, user_id, source, target)
+        except Exception as e:
+            copied = None
+            print(f"user {user_id}: copy {source} -> {target} failed: {e}")
+        if copied is None:
+            abort_move(shard_map, user_id, source, target)
+            print(f"user {user_id}: move aborted, left on shard {source}")
+            continue
+
+        primary = shard_map.session_factory()
+        try:
+            row = primary.get(UserShard, user_id)
+            row.shard, row.moving = target, False
+            primary.commit()
+        finally:
+            primary.close()
+
+        # Only what was copied; the fence stays until the rows are gone
+        src = shard_map.session_for_shard(source)
+        try:
+            _delete_rows(src, copied)
+            src.execute(ShardFence.__table__.delete().where(ShardFence.user_id == user_id))
+            src.commit()
+        finally:
+            src.close()
+        print(f"user {user_id}: moved {len(copied['chats'])} chats and {len(copied['messages'])} messages "
+              f"from shard {source} to shard {target}")
+
+
+def print_status(shard_map):
+    for shard, users in sorted(shard_loads(shard_map).items()):
+        print(f"shard {shard}: {len(users)} users, {sum(users.values())} messages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage chat shards")
+    parser.add_argument(
+        "--settle-seconds", type=float,
+        # Must outlast the app's shard map cache
+        default=float(os.getenv("SHARD_MAP_TTL_SECONDS", "30")) + 5,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init")
+    commands.add_parser("status")
+    move = commands.add_parser("move")
+    move.add_argument("user_id", type=int)
+    move.add_argument("shard", type=int)
+    rebalance = commands.add_parser("rebalance")
+    rebalance.add_argument("--max-moves", type=int, default=100)
+    rebalance.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    shard_map = open_shard_map()
+    if args.command == "init":
+        init_shards(shard_map)
+    elif args.command == "status":
+        print_status(shard_map)
+    elif args.command == "move":
+        if not 0 <= args.shard < shard_map.shard_count:
+            parser.error(f"shard must be between 0 and {shard_map.shard_count - 1}")
+        move_users(shard_map, [(args.user_id, args.shard)], args.settle_seconds)
+    elif args.command == "rebalance":
+        plan = plan_rebalance(shard_loads(shard_map), args.max_moves)
+        for user_id, source, target, messages in plan:
+            print(f"user {user_id}: {messages} messages, shard {source} -> {target}")
+        if plan and not args.dry_run:
+            move_users(shard_map, [(user_id, target) for user_id, _, target, _ in plan], args.settle_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# db/sharding.py
+"""
+User-sharded storage for chats and messages.
+
+A user's chats and messages all live on one shard.  Shard 0 is the
+primary database.  CHAT_SHARD_URLS adds shards 1..N, which are separate
+SQLite files or PostgreSQL schemas (see `get_shard_engines`).  Everything
+else stays on the primary: users, journal, affirmations and
+llm_operations.  The `user_shards` table on the primary maps a user to
+their shard.  Users without a row predate sharding and stay on shard 0.
+New users go to the least-loaded shard.
+
+`ShardMap` is the container's `chat_shards`.  Chat services ask it for a
+session with `session_for(user_id)` or `read_session_for(user_id)` and
+hand that session to ChatRepository/MessageRepository unchanged.  Lookups
+are cached for `cache_ttl_seconds`.
+
+Once more than one shard is configured, chat and message ids no longer
+come from the table's autoincrement.  Every shard hands them out from
+its own `shard_sequences` row, inside the inserting transaction, as
+`counter * MAX_SHARDS + shard`.  So ids are unique across shards, a user
+keeps their chat ids when moved, and moved rows never collide with the
+target's own ids.  Counters start above every id issued before sharding.
+
+Moving users is the job of db/scripts/rebalance_chat_shards.py.  It flags
+the user as `moving`, and while the flag is set this map answers 503.  It
+also puts a `shard_fences` row on the source shard.  Every flush that
+writes a user's chats, messages or archive segments checks that fence in
+its own transaction and fails with 503.  So a request that resolved the
+shard before the move started cannot commit into rows that are being
+copied.  On PostgreSQL the check share-locks the chat rows that the mover
+locks for update while fencing.  Sessions write ids in the same flush
+hook.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+
+from db.models import Chat, Message, MessageArchiveSegment, ShardFence, ShardSequence, User, UserShard
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of shards; the low bits of every sharded id
+MAX_SHARDS = 1024
+
+# Tables that live on every shard
+SHARDED_TABLES = [
+    Chat.__table__, Message.__table__, MessageArchiveSegment.__table__,
+    ShardSequence.__table__, ShardFence.__table__,
+]
+
+_SEQUENCE_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def sharded_id(counter: int, shard: int) -> int:
+    return counter * MAX_SHARDS + shard
+
+
+class ShardMap:
+    """
+    Args:
+        session_factory: the primary's session factory, which is also shard 0
+        shard_engines: engines of shards 1..N
+        cache_ttl_seconds: how long a user -> shard lookup is trusted
+        placement_refresh_seconds: how often per-shard user counts are re-read for placement
+    """
+
+    def __init__(self, session_factory, shard_engines: Optional[List] = None,
+                 cache_ttl_seconds: float = 30.0, placement_refresh_seconds: float = 60.0,
+                 max_cached_users: int = 100000):
+        if len(shard_engines or []) + 1 > MAX_SHARDS:
+            raise ValueError(f"At most {MAX_SHARDS} chat shards are supported")
+        self.session_factory = session_factory
+        self.primary_engine = session_factory.kw["bind"]
+        self.shards = [session_factory] + [sessionmaker(bind=engine) for engine in shard_engines or []]
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.placement_refresh_seconds = placement_refresh_seconds
+        self.max_cached_users = max_cached_users
+
+        # user_id -> (shard, moving, monotonic expiry)
+        self._cache: Dict[int, Tuple[int, bool, float]] = {}
+        self._user_counts: Optional[List[int]] = None
+        self._user_counts_at = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "cache_hits": 0, "moving_rejections": 0, "placements": 0}
+
+        if self.is_sharded:
+            for index, shard in enumerate(self.shards):
+                event.listen(shard, "before_flush", self._write_guard(index))
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.shards)
+
+    @property
+    def is_sharded(self) -> bool:
+        return len(self.shards) > 1
+
+    # ──────────────────────────────────────────────────────────────
+    # routing
+    # ──────────────────────────────────────────────────────────────
+    def shard_for(self, user_id: int) -> int:
+        """The shard holding `user_id`'s chats; 503 while the user is being moved."""
+        if not self.is_sharded:
+            return 0
+        user_id = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            self._counters["lookups"] += 1
+            entry = self._cache.get(user_id)
+            if entry is not None and entry[2] > now:
+                self._counters["cache_hits"] += 1
+            else:
+                entry = None
+
+        if entry is None:
+            session = self.session_factory()
+            try:
+                row = session.execute(
+                    select(UserShard.shard, UserShard.moving).where(UserShard.user_id == user_id)
+                ).first()
+            finally:
+                session.close()
+            entry = (row.shard, row.moving, now + self.cache_ttl_seconds) if row else (0, False, now + self.cache_ttl_seconds)
+            with self._lock:
+                if len(self._cache) >= self.max_cached_users:
+                    self._cache = {uid: e for uid, e in self._cache.items() if e[2] > now}
+                self._cache[user_id] = entry
+
+        shard, moving, _ = entry
+        if moving:
+            with self._lock:
+                self._counters["moving_rejections"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Chats are being moved to new storage, retry shortly",
+                headers={"Retry-After": str(int(self.cache_ttl_seconds))}
+            )
+        if shard >= len(self.shards):
+            logger.error(f"user {user_id} is mapped to chat shard {shard}, but only {len(self.shards)} are configured")
+            raise HTTPException(status_code=500, detail="Chat storage is misconfigured")
+        return shard
+
+    def session_for(self, user_id: int) -> Session:
+        """A read-write session on `user_id`'s shard."""
+        return self.session_for_shard(self.shard_for(user_id))
+
+    def read_session_for(self, user_id: int) -> Session:
+        """A read-only session on `user_id`'s shard; replicas apply on the primary only."""
+        shard = self.shard_for(user_id)
+        if shard == 0:
+            return self.session_factory.for_read(user_id)
+        return self.shards[shard]()
+
+    def session_for_shard(self, shard: int) -> Session:
+        return self.shards[shard]()
+
+    # ──────────────────────────────────────────────────────────────
+    # placement
+    # ──────────────────────────────────────────────────────────────
+    def place_new_user(self) -> int:
+        """Pick the shard for a user about to be registered: the one with the fewest users."""
+        if not self.is_sharded:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            counts = self._user_counts if now - self._user_counts_at < self.placement_refresh_seconds else None
+        if counts is None:
+            counts = self._read_user_counts()
+        with self._lock:
+            if counts is not self._user_counts:
+                self._user_counts, self._user_counts_at = counts, now
+            shard = min(range(len(counts)), key=counts.__getitem__)
+            # Count it right away, so a burst of registrations spreads out
+            counts[shard] += 1
+            self._counters["placements"] += 1
+        return shard
+
+    def _read_user_counts(self) -> List[int]:
+        session = self.session_factory()
+        try:
+            counts = [0] * len(self.shards)
+            mapped = 0
+            for shard, users in session.execute(
+                select(UserShard.shard, func.count()).group_by(UserShard.shard)
+            ):
+                mapped += users
+                if shard < len(counts):
+                    counts[shard] += users
+            # Users without a row are on shard 0
+            counts[0] += session.execute(select(func.count()).select_from(User)).scalar_one() - mapped
+            return counts
+        finally:
+            session.close()
+
+    # ──────────────────────────────────────────────────────────────
+    # writes: fences and ids
+    # ──────────────────────────────────────────────────────────────
+    def _write_guard(self, shard: int):
+        def guard_writes(session, flush_context, instances):
+            user_ids, chat_ids = set(), set()
+            for obj in (*session.new, *session.dirty, *session.deleted):
+                if isinstance(obj, Chat):
+                    user_ids.add(obj.user_id)
+                    if obj.id is not None:
+                        chat_ids.add(obj.id)
+                elif isinstance(obj, (Message, MessageArchiveSegment)) and obj.chat_id is not None:
+                    chat_ids.add(obj.chat_id)
+            if not user_ids and not chat_ids:
+                return
+
+            # The flush's own transaction: the fence check holds until commit,
+            # and a rollback hands the ids back
+            connection = session.connection()
+            self._check_fences(connection, user_ids, chat_ids)
+
+            pending: Dict[object, list] = {}
+            for obj in session.new:
+                if isinstance(obj, (Chat, Message)) and obj.id is None:
+                    pending.setdefault(obj.__table__, []).append(obj)
+            for table, objs in pending.items():
+                first = self._reserve_ids(connection, shard, table, len(objs))
+                for offset, obj in enumerate(objs):
+                    obj.id = sharded_id(first + offset, shard)
+        return guard_writes
+
+    def _check_fences(self, connection, user_ids, chat_ids):
+        """503 if any of the users, or owners of the chats, is being moved off this shard."""
+        if chat_ids:
+            # Share locks wait for a mover that is fencing these chats (no-op on SQLite,
+            # where the single writer lock already serializes the two)
+            user_ids = user_ids | set(connection.execute(
+                select(Chat.user_id).where(Chat.id.in_(chat_ids)).with_for_update(read=True)
+            ).scalars())
+        fenced = connection.execute(
+            select(ShardFence.user_id).where(ShardFence.user_id.in_(user_ids)).limit(1)
+        ).scalar()
+        if fenced is not None:
+            with self._lock:
+                self._counters["moving_rejections"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Chats are being moved to new storage, retry shortly",
+                headers={"Retry-After": str(int(self.cache_ttl_seconds))}
+            )
+
+    def _reserve_ids(self, connection, shard: int, table, count: int) -> int:
+        """Reserve `count` counters for `table` on this shard, return the first."""
+        sequences = ShardSequence.__table__
+        reserve = (
+            sequences.update()
+            .where(sequences.c.name == table.name)
+            .values(next_value=sequences.c.next_value + count)
+            .returning(sequences.c.next_value)
+        )
+        row = connection.execute(reserve).first()
+        if row is None:
+            # First sharded insert on this shard; concurrent seeders agree on the start
+            insert = _SEQUENCE_INSERT[connection.dialect.name]
+            connection.execute(
+                insert(sequences)
+                .values(name=table.name, next_value=self._first_counter(connection, shard, table))
+                .on_conflict_do_nothing()
+            )
+            row = connection.execute(reserve).first()
+        return row[0] - count
+
+    def _first_counter(self, connection, shard: int, table) -> int:
+        """A counter whose ids lie above every id on this shard and every id issued before sharding."""
+        highest = connection.execute(select(func.max(table.c.id))).scalar() or 0
+        if shard != 0:
+            with self.primary_engine.connect() as primary:
+                highest = max(highest, primary.execute(select(func.max(table.c.id))).scalar() or 0)
+        return highest // MAX_SHARDS + 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self._counters, shards=len(self.shards), cached_users=len(self._cache))
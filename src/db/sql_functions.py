@@ -0,0 +1,126 @@
+# db/sql_functions.py
+"""
+Date functions that compile for both SQLite and PostgreSQL.
+
+    date_format('%Y-%m', column)   strftime() on SQLite, to_char() on PostgreSQL
+    julian_day(column)             julianday() on SQLite, the same value computed
+                                   from the epoch on PostgreSQL
+
+Patterns use strftime syntax on every backend.  Weeks are ISO weeks,
+`%G-W%V`; `%W` is rejected because to_char has no equivalent.  SQLite only
+learned %G and %V in 3.46, so on SQLite they are computed from the
+Thursday of the row's week.
+"""
+from sqlalchemy import Float, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# strftime directive -> to_char template
+_TO_CHAR = {
+    "%Y": "YYYY",
+    "%m": "MM",
+    "%d": "DD",
+    "%H": "HH24",
+    "%M": "MI",
+    "%S": "SS",
+    "%j": "DDD",
+    "%G": "IYYY",
+    "%V": "IW",
+    "%%": "%",
+}
+
+# ISO year and week on SQLite; the ISO week of a day is that of its week's Thursday
+_SQLITE_ISO_THURSDAY = "date({value}, '-3 days', 'weekday 4')"
+_SQLITE_ISO = {
+    "%G": "strftime('%Y', {thursday})",
+    "%V": "printf('%02d', (strftime('%j', {thursday}) - 1) / 7 + 1)",
+}
+
+# Julian day number of 1970-01-01T00:00:00Z
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+def _directives(pattern: str):
+    """Split a strftime pattern into directives and single literal characters."""
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "%":
+            yield pattern[i:i + 2]
+            i += 2
+        else:
+            yield pattern[i]
+            i += 1
+
+
+def strftime_to_char(pattern: str) -> str:
+    """Translate a strftime pattern into a PostgreSQL to_char template."""
+    parts = []
+    for token in _directives(pattern):
+        if token in _TO_CHAR:
+            parts.append(_TO_CHAR[token])
+        elif token.startswith("%"):
+            raise ValueError(f"Unsupported strftime directive {token!r} in {pattern!r}")
+        else:
+            # Letters would be read as template patterns; quote them
+            parts.append(f'"{token}"' if token.isalpha() else token)
+    return "".join(parts)
+
+
+class date_format(GenericFunction):
+    type = String()
+    inherit_cache = True
+    # The pattern shapes the SQL, so it is part of the statement cache key
+    _traverse_internals = GenericFunction._traverse_internals + [("pattern", InternalTraversal.dp_string)]
+
+    def __init__(self, pattern: str, value, **kw):
+        self.pattern = pattern
+        super().__init__(value, **kw)
+
+
+class julian_day(GenericFunction):
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(date_format)
+def _date_format_sqlite(element, compiler, **kw):
+    template = element.pattern
+    # Same directives on every backend, so a pattern PostgreSQL can't run fails in development too
+    strftime_to_char(template)
+    value_sql = compiler.process(element.clauses, **kw)
+    if "%G" not in template and "%V" not in template:
+        return f"strftime({compiler.render_literal_value(template, String())}, {value_sql})"
+
+    thursday = _SQLITE_ISO_THURSDAY.format(value=value_sql)
+    parts, literal = [], ""
+    for token in _directives(template):
+        if token in _SQLITE_ISO:
+            if literal:
+                parts.append(f"strftime({compiler.render_literal_value(literal, String())}, {value_sql})")
+                literal = ""
+            parts.append(_SQLITE_ISO[token].format(thursday=thursday))
+        else:
+            literal += token
+    if literal:
+        parts.append(f"strftime({compiler.render_literal_value(literal, String())}, {value_sql})")
+    return "(" + " || ".join(parts) + ")"
+
+
+@compiles(date_format, "postgresql")
+def _date_format_postgresql(element, compiler, **kw):
+    template = strftime_to_char(element.pattern)
+    return f"to_char({compiler.process(element.clauses, **kw)}, {compiler.render_literal_value(template, String())})"
+
+
+@compiles(julian_day)
+def _julian_day_sqlite(element, compiler, **kw):
+    return f"julianday({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(julian_day, "postgresql")
+def _julian_day_postgresql(element, compiler, **kw):
+    return (
+        f"(EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)}) / 86400.0 "
+        f"+ {_UNIX_EPOCH_JULIAN_DAY})"
+    )
@@ -67,9 +67,12 @@ class ChatBackend:
         """Return the last *n* messages as a formatted string for the LLM."""
         return self.compile_chat_messages_to_string(self.bring_last_n_messages(n=n))
 
-    def produce_ai_response(self, *, history_count: int = 4) -> tuple[str, dict]:
+    def produce_ai_response(self, *, history_count: int = 4, context: Optional[str] = None) -> tuple[str, dict]:
         """Generate and store an assistant reply using the configured LLM service.
         
+        Args:
+            context: optional background (e.g. related journal entries) placed before the history
+        
         Returns:
             tuple: (ai_text, usage_data) where usage_data is None if not available
         """
@@ -77,6 +80,8 @@ class ChatBackend:
             return "I don't know", None
 
         history = self.generate_chat_history(n=history_count)
+        if context:
+            history = f"{context}\n\n{history}"
 
         print("history:", history) 
 
@@ -0,0 +1,168 @@
+# impl/services/affirmations/affirmation_audio.py
+"""
+Voice audio for affirmations.
+
+Audio is content-addressed: the key is a SHA-256 over the synthesizer
+engine, the voice and the normalized text, and the file lives at
+`<base_dir>/<key[:2]>/<key>.<ext>`.  Users with the same text and voice
+share one file, and editing an affirmation's text or voice simply points
+it at a different key.  Files never change once written, so they can be
+served with immutable cache headers.
+
+Synthesis runs on a small thread pool off the request path; a key that is
+already being synthesized is not queued twice.
+
+Synthesizers are pluggable.  `ToneSynthesizer` is the local stand-in used
+until a TTS provider is wired in: it renders a deterministic tone sequence
+as 16-bit mono WAV.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from traceback import format_exc
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+AUDIO_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+DEFAULT_VOICE = "default"
+
+
+# ──────────────────────────────────────────────────────────────
+# synthesizers
+# ──────────────────────────────────────────────────────────────
+class SpeechSynthesizer:
+    """Turns text into encoded audio bytes."""
+
+    engine_id = "base"
+    media_type = "application/octet-stream"
+    extension = "bin"
+
+    def synthesize(self, text: str, voice_id: str) -> bytes:
+        raise NotImplementedError
+
+
+class ToneSynthesizer(SpeechSynthesizer):
+    """One short tone per word, pitched from the word and the voice."""
+
+    engine_id = "tone-v1"
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self, sample_rate: int = 16000, word_seconds: float = 0.18, gap_seconds: float = 0.04):
+        self.sample_rate = sample_rate
+        self.word_samples = int(sample_rate * word_seconds)
+        self.gap_samples = int(sample_rate * gap_seconds)
+
+    def synthesize(self, text: str, voice_id: str) -> bytes:
+        words = text.split() or [""]
+        seeds = np.array(
+            [int.from_bytes(hashlib.blake2b(f"{voice_id}\0{word}".encode(), digest_size=2).digest(), "little")
+             for word in words],
+            dtype=np.float64,
+        )
+        frequencies = 180.0 + (seeds % 360.0)
+
+        t = np.arange(self.word_samples) / self.sample_rate
+        envelope = np.sin(np.pi * np.arange(self.word_samples) / self.word_samples)
+        tones = np.sin(2 * np.pi * frequencies[:, None] * t[None, :]) * envelope
+        frames = np.pad(tones, ((0, 0), (0, self.gap_samples))).ravel()
+        pcm = (frames * 0.3 * 32767).astype("<i2")
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm.tobytes())
+        return buffer.getvalue()
+
+
+# ──────────────────────────────────────────────────────────────
+# content-addressed store
+# ──────────────────────────────────────────────────────────────
+class AffirmationAudioCache:
+    """
+    Content-addressed audio files plus background synthesis.
+
+    Args:
+        base_dir: root directory of the audio files
+        synthesizer: SpeechSynthesizer used for missing audio
+        max_workers: concurrent synthesis jobs
+    """
+
+    def __init__(self, base_dir: str, synthesizer: SpeechSynthesizer, max_workers: int = 2):
+        self.base_dir = base_dir
+        self.synthesizer = synthesizer
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="affirmation-audio")
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    @property
+    def media_type(self) -> str:
+        return self.synthesizer.media_type
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+    def key_for(self, text: str, voice_id: Optional[str]) -> str:
+        material = "\0".join([self.synthesizer.engine_id, voice_id or DEFAULT_VOICE, self.normalize_text(text)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def path_for_key(self, key: str) -> str:
+        return os.path.join(self.base_dir, key[:2], f"{key}.{self.synthesizer.extension}")
+
+    def lookup(self, text: str, voice_id: Optional[str]) -> Tuple[str, Optional[str]]:
+        """(key, path) for the audio of `text`; path is None until it has been synthesized."""
+        key = self.key_for(text, voice_id)
+        path = self.path_for_key(key)
+        return key, path if os.path.exists(path) else None
+
+    def request(self, text: str, voice_id: Optional[str]) -> str:
+        """Queue synthesis unless the audio exists or is already queued; returns the key."""
+        key, path = self.lookup(text, voice_id)
+        if path is not None:
+            return key
+        with self._lock:
+            if key in self._in_flight:
+                return key
+            self._in_flight.add(key)
+        self._executor.submit(self._synthesize, key, text, voice_id or DEFAULT_VOICE)
+        return key
+
+    def _synthesize(self, key: str, text: str, voice_id: str):
+        path = self.path_for_key(key)
+        try:
+            audio = self.synthesizer.synthesize(self.normalize_text(text), voice_id)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file and rename, so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            logger.debug(f"Synthesized affirmation audio {key} ({len(audio)} bytes)")
+        except Exception as e:
+            logger.error(f"Affirmation audio synthesis failed for {key}: {e}\n{format_exc()}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
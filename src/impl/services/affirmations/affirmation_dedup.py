@@ -0,0 +1,160 @@
+# impl/services/affirmations/affirmation_dedup.py
+"""
+Near-duplicate suppression for generated affirmations.
+
+Texts are normalized (case, punctuation, whitespace), cut into character
+shingles and reduced to MinHash signatures.  The fraction of equal
+signature slots estimates the Jaccard similarity of two shingle sets, so a
+candidate is checked against all of a user's affirmations with one
+vectorized comparison.
+
+Signatures of each user's existing affirmations are cached together with
+the user's affirmations collection version (see
+db/models/collection_version.py); a cached set is reused only while that
+version is unchanged.
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+SHINGLE_SIZE = 4
+_MERSENNE_PRIME = (1 << 31) - 1
+_non_word_re = re.compile(r"[^\w\s]+")
+_space_re = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    text = _non_word_re.sub(" ", (text or "").lower())
+    return _space_re.sub(" ", text).strip()
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """32-bit hashes of the character shingles of a normalized text."""
+    text = normalize_text(text)
+    if len(text) <= size:
+        grams = {text}
+    else:
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=4).digest(), "little") for gram in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+class MinHasher:
+    """MinHash signatures over `num_perm` universal hash functions."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text) % _MERSENNE_PRIME
+        # a < 2**31 and hashes < 2**31, so the products fit in uint64
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        rows = [self.signature(text) for text in texts]
+        if not rows:
+            return np.empty((0, self.num_perm), dtype=np.uint64)
+        return np.vstack(rows)
+
+
+class AffirmationDeduplicator:
+    """
+    Drops candidates that are near-duplicates of a user's affirmations or of
+    each other.
+
+    Args:
+        num_perm: signature length; more slots give a tighter similarity estimate
+        threshold: estimated Jaccard similarity at which a candidate is a duplicate
+        max_users: users whose signatures are kept in memory
+    """
+
+    def __init__(self, num_perm: int = 64, threshold: float = 0.7, max_users: int = 1024):
+        self.hasher = MinHasher(num_perm)
+        self.threshold = threshold
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[int, Tuple[int, np.ndarray]]" = OrderedDict()
+
+    def _existing_signatures(self, user_id: int, version: int, load_texts: Callable[[], List[str]]) -> np.ndarray:
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(user_id)
+                return cached[1]
+        signatures = self.hasher.signatures(load_texts())
+        self._store(user_id, version, signatures)
+        return signatures
+
+    def _store(self, user_id: int, version: int, signatures: np.ndarray):
+        with self._lock:
+            self._store_locked(user_id, version, signatures)
+
+    def _store_locked(self, user_id: int, version: int, signatures: np.ndarray):
+        self._cache[user_id] = (version, signatures)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_users:
+            self._cache.popitem(last=False)
+
+    def filter(self, user_id: int, version: int, candidates: List[str],
+               load_texts: Callable[[], List[str]]) -> Tuple[List[int], np.ndarray]:
+        """
+        Indices of the candidates worth keeping, in order.
+
+        Args:
+            user_id: owner of the affirmations
+            version: the user's current affirmations collection version
+            candidates: generated texts
+            load_texts: returns the contents of the user's active affirmations on a cache miss
+
+        Returns:
+            (kept indices, signatures of the kept candidates)
+        """
+        reference = self._existing_signatures(user_id, version, load_texts)
+        kept, kept_signatures = [], []
+        for index, text in enumerate(candidates):
+            if not normalize_text(text):
+                continue
+            signature = self.hasher.signature(text)
+            if len(reference) and (reference == signature).mean(axis=1).max() >= self.threshold:
+                continue
+            kept.append(index)
+            kept_signatures.append(signature)
+            reference = np.vstack([reference, signature[None, :]])
+        if len(kept) < len(candidates):
+            logger.debug(f"Dropped {len(candidates) - len(kept)} near-duplicate affirmations for user {user_id}")
+        if kept_signatures:
+            return kept, np.vstack(kept_signatures)
+        return kept, np.empty((0, self.hasher.num_perm), dtype=np.uint64)
+
+    def remember(self, user_id: int, from_version: int, signatures: np.ndarray, to_version: Optional[int] = None):
+        """
+        Add saved affirmations to a user's cached signatures.
+
+        Only applies when the cache is still at `from_version`; the entry then
+        moves to `to_version` (by default the next version, which is what a
+        single bulk insert produces).
+        """
+        to_version = from_version + 1 if to_version is None else to_version
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is None or cached[0] != from_version:
+                return
+            self._store_locked(user_id, to_version, np.vstack([cached[1], signatures]))
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._cache.pop(user_id, None)
@@ -0,0 +1,235 @@
+# impl/services/affirmations/affirmation_scheduler.py
+"""
+Affirmation schedule engine.
+
+Every scheduled affirmation carries a precomputed, indexed `next_fire_at`
+(naive UTC).  The worker never looks at `schedule_config` JSON to find work:
+each tick is one range scan over `next_fire_at <= now + lookahead`, the rows
+go into an in-memory min-heap, and the thread sleeps until the earliest one
+is due.  Firing recomputes `next_fire_at` from the schedule and hands the
+batch to `on_fire`.  Only rows whose guarded `next_fire_at` update matched
+are handed on, so a row rescheduled meanwhile, or claimed by a scheduler in
+another process, is never delivered twice.
+
+Catch-up after downtime: an occurrence overdue by at most
+`catch_up_grace_seconds` still fires (once); older ones are skipped.  In both
+cases `next_fire_at` moves to the first occurrence after *now*, so a long
+outage never turns into a burst of stale notifications.
+
+On start the worker also recomputes every future next_fire_at in bulk, so
+tzdata / DST rule updates shipped with a deploy take effect immediately.
+
+The worker is meant to run in a single process: it is off unless
+AFFIRMATION_SCHEDULER_ENABLED=1 (see app.py).
+"""
+import heapq
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from traceback import format_exc
+from typing import Callable, List, Optional
+
+from impl.services.affirmations.schedule_compiler import compile_schedule, next_occurrences
+
+logger = logging.getLogger(__name__)
+
+
+ScheduledFire = namedtuple("ScheduledFire", ["affirmation_id", "user_id", "content", "schedule_config", "due_at", "fired_at"])
+
+
+class AffirmationScheduler:
+    """
+    Timer worker that fires scheduled affirmations.
+
+    Args:
+        session_factory: sessionmaker used for the worker's own sessions
+        affirmation_repository: factory called as `affirmation_repository(session=...)`
+        on_fire: callable receiving a list of ScheduledFire after they are committed
+        tick_seconds: maximum sleep between range scans
+        lookahead_seconds: how far ahead rows are pulled into the heap
+        batch_size: rows per range-scan page and per fire batch
+        catch_up_grace_seconds: how late an occurrence may be and still fire
+    """
+
+    def __init__(self, session_factory, affirmation_repository, on_fire: Optional[Callable[[List[ScheduledFire]], None]] = None,
+                 tick_seconds: float = 15.0, lookahead_seconds: float = 60.0, batch_size: int = 500,
+                 catch_up_grace_seconds: float = 3600.0, max_queued: int = 50000):
+        self.session_factory = session_factory
+        self.affirmation_repository = affirmation_repository
+        self.on_fire = on_fire or self._log_fires
+        self.tick_seconds = tick_seconds
+        self.lookahead = timedelta(seconds=lookahead_seconds)
+        self.batch_size = batch_size
+        self.catch_up_grace = timedelta(seconds=catch_up_grace_seconds)
+        self.max_queued = max_queued
+
+        self._heap = []         # (next_fire_at, affirmation_id); superseded pairs are dropped lazily
+        self._queued = {}       # affirmation_id -> next_fire_at it is queued for
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # ──────────────────────────────────────────────────────────────
+    # lifecycle
+    # ──────────────────────────────────────────────────────────────
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="affirmation-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Affirmation scheduler started")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Affirmation scheduler stopped")
+
+    def notify(self):
+        """Wake the worker early, e.g. after a schedule due within the lookahead was saved."""
+        self._wake.set()
+
+    def _run(self):
+        try:
+            self.recompute_upcoming()
+        except Exception as e:
+            logger.error(f"Error recomputing affirmation schedules: {e}\n{format_exc()}")
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Affirmation scheduler tick failed: {e}\n{format_exc()}")
+            self._wake.wait(self._seconds_until_next_wake())
+            self._wake.clear()
+
+    def _seconds_until_next_wake(self) -> float:
+        while self._heap and self._queued.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return self.tick_seconds
+        until_due = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+        return max(0.0, min(self.tick_seconds, until_due))
+
+    # ──────────────────────────────────────────────────────────────
+    # one tick
+    # ──────────────────────────────────────────────────────────────
+    def tick(self, now: Optional[datetime] = None):
+        now = now or datetime.utcnow()
+        self._load_due(now + self.lookahead)
+
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, affirmation_id = heapq.heappop(self._heap)
+            if self._queued.get(affirmation_id) != fire_at:
+                continue
+            del self._queued[affirmation_id]
+            due.append((fire_at, affirmation_id))
+            if len(due) >= self.batch_size:
+                self._fire_batch(due, now)
+                due = []
+        if due:
+            self._fire_batch(due, now)
+
+    def _load_due(self, until: datetime):
+        """Page through the next_fire_at index and push new rows onto the heap."""
+        session = self.session_factory()
+        try:
+            repo = self.affirmation_repository(session=session)
+            after_key = None
+            while len(self._queued) < self.max_queued:
+                rows = repo.get_due_affirmations(until, after_key=after_key, limit=self.batch_size)
+                for affirmation_id, next_fire_at in rows:
+                    if self._queued.get(affirmation_id) != next_fire_at:
+                        self._queued[affirmation_id] = next_fire_at
+                        heapq.heappush(self._heap, (next_fire_at, affirmation_id))
+                if len(rows) < self.batch_size:
+                    break
+                after_key = (rows[-1][1], rows[-1][0])
+        finally:
+            session.close()
+
+    def _fire_batch(self, due, now: datetime):
+        expected = {affirmation_id: fire_at for fire_at, affirmation_id in due}
+
+        session = self.session_factory()
+        try:
+            repo = self.affirmation_repository(session=session)
+            live = [
+                affirmation for affirmation in repo.get_affirmations_by_ids(list(expected))
+                # Rescheduled or unscheduled since it was queued; the next scan picks it up again
+                if affirmation.is_active and affirmation.next_fire_at == expected[affirmation.id]
+            ]
+            # Everything in the batch is due, so one vectorized pass from `now` covers it
+            next_times = next_occurrences([compile_schedule(a.schedule_config) for a in live], now)
+
+            fires, updates, skipped = [], [], 0
+            for affirmation, next_fire_at in zip(live, next_times):
+                due_at = expected[affirmation.id]
+                updates.append({
+                    "affirmation_id": affirmation.id,
+                    "expected_fire_at": due_at,
+                    "new_fire_at": next_fire_at,
+                })
+                if now - due_at > self.catch_up_grace:
+                    skipped += 1
+                    continue
+                fires.append(ScheduledFire(affirmation.id, affirmation.user_id, affirmation.content,
+                                           affirmation.schedule_config, due_at, now))
+
+            claimed = set(repo.set_next_fire_times(updates))
+        except Exception as e:
+            logger.error(f"Error firing scheduled affirmations: {e}\n{format_exc()}")
+            return
+        finally:
+            session.close()
+
+        # Lost the compare-and-set: rescheduled meanwhile, or fired by another worker
+        fires = [fire for fire in fires if fire.affirmation_id in claimed]
+
+        if skipped:
+            logger.info(f"Skipped {skipped} affirmation notifications missed beyond the catch-up window")
+        if fires:
+            try:
+                self.on_fire(fires)
+            except Exception as e:
+                logger.error(f"Error handing off fired affirmations: {e}\n{format_exc()}")
+
+    def recompute_upcoming(self, now: Optional[datetime] = None) -> int:
+        """
+        Recompute next_fire_at for every schedule that is not yet due.
+
+        Overdue rows are left alone so catch-up still applies to them.
+        Returns the number of rows whose time changed.
+        """
+        now = now or datetime.utcnow()
+        changed = 0
+        session = self.session_factory()
+        try:
+            repo = self.affirmation_repository(session=session)
+            after_id = 0
+            while True:
+                rows = repo.get_upcoming_schedules(now, after_id=after_id, limit=self.batch_size)
+                if not rows:
+                    break
+                next_times = next_occurrences([compile_schedule(config) for _, config, _ in rows], now)
+                updates = [
+                    {"affirmation_id": affirmation_id, "expected_fire_at": current, "new_fire_at": next_fire_at}
+                    for (affirmation_id, _, current), next_fire_at in zip(rows, next_times)
+                    if next_fire_at != current
+                ]
+                changed += len(repo.set_next_fire_times(updates))
+                after_id = rows[-1][0]
+        finally:
+            session.close()
+        if changed:
+            logger.info(f"Recomputed next_fire_at for {changed} affirmations")
+            self.notify()
+        return changed
+
+    @staticmethod
+    def _log_fires(fires: List[ScheduledFire]):
+        for fire in fires:
+            logger.info(f"Affirmation {fire.affirmation_id} due for user {fire.user_id} at {fire.due_at}")
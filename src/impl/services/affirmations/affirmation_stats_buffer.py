@@ -0,0 +1,140 @@
+# impl/services/affirmations/affirmation_stats_buffer.py
+"""
+Write-behind buffer for affirmation seen / played counters.
+
+Events are aggregated in memory per (affirmation, owner): the number of
+views, the latest view and the latest play.  A background thread writes
+the aggregate with one executemany UPDATE every `flush_interval_seconds`
+(or sooner when `max_pending` keys accumulate), and `stop()` flushes what
+is left on shutdown.  Ownership is enforced in the UPDATE's WHERE clause,
+so recording an event needs no read.
+
+A failed flush merges the counts back for the next one.  After
+`max_attempts` failed flushes in a row, the batch is written in halves
+instead, and counts that still fail on their own are logged and dropped,
+so one bad row cannot hold back every later update.
+"""
+import logging
+import threading
+from datetime import datetime
+from traceback import format_exc
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AffirmationStatsBuffer:
+    def __init__(self, session_factory, affirmation_repository, flush_interval_seconds: float = 5.0,
+                 max_pending: int = 5000, max_attempts: int = 5):
+        self.session_factory = session_factory
+        self.affirmation_repository = affirmation_repository
+        self.flush_interval = flush_interval_seconds
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._failures = 0
+
+        # (affirmation_id, user_id) -> [seen_delta, last_seen, last_played]
+        self._pending: Dict[Tuple[int, int], list] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="affirmation-stats-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Affirmation stats flush failed: {e}\n{format_exc()}")
+
+    def record(self, affirmation_id: int, user_id: int, seen: bool = False, played: bool = False,
+               at: Optional[datetime] = None):
+        """Buffer one seen and/or played event."""
+        if not seen and not played:
+            return
+        at = at or datetime.utcnow()
+        with self._lock:
+            stats = self._pending.setdefault((affirmation_id, user_id), [0, None, None])
+            if seen:
+                stats[0] += 1
+                stats[1] = at if stats[1] is None else max(stats[1], at)
+            if played:
+                stats[2] = at if stats[2] is None else max(stats[2], at)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write buffered counters; returns the number of affirmations updated."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            deltas = [
+                {
+                    "affirmation_id": affirmation_id,
+                    "owner_id": user_id,
+                    "seen_delta": seen_delta,
+                    "seen_at": last_seen,
+                    "played_at": last_played,
+                }
+                for (affirmation_id, user_id), (seen_delta, last_seen, last_played) in pending.items()
+            ]
+            if self._failures >= self.max_attempts:
+                # The same counts keep failing; find and drop the rows at fault
+                self._failures = 0
+                return self._write_isolating(deltas)
+
+            try:
+                self._write(deltas)
+            except Exception:
+                self._failures += 1
+                # Put the counts back so they go out with the next flush
+                with self._lock:
+                    for key, (seen_delta, last_seen, last_played) in pending.items():
+                        stats = self._pending.setdefault(key, [0, None, None])
+                        stats[0] += seen_delta
+                        stats[1] = max(filter(None, (stats[1], last_seen)), default=None)
+                        stats[2] = max(filter(None, (stats[2], last_played)), default=None)
+                raise
+            self._failures = 0
+            logger.debug(f"Flushed stats for {len(deltas)} affirmations")
+            return len(deltas)
+
+    def _write(self, deltas: List[dict]):
+        session = self.session_factory()
+        try:
+            self.affirmation_repository(session=session).apply_stats_deltas(deltas)
+        finally:
+            session.close()
+
+    def _write_isolating(self, deltas: List[dict]) -> int:
+        """Write `deltas`, bisecting on failure; returns the number written."""
+        try:
+            self._write(deltas)
+            return len(deltas)
+        except Exception as e:
+            if len(deltas) == 1:
+                logger.error(f"Dropped affirmation stats {deltas[0]} after {self.max_attempts} failed flushes: {e}")
+                return 0
+        middle = len(deltas) // 2
+        return self._write_isolating(deltas[:middle]) + self._write_isolating(deltas[middle:])
@@ -2,6 +2,7 @@
 
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
 from traceback import format_exc
 from typing import List
@@ -9,9 +10,18 @@ from typing import List
 from models.affirmation.ai_create_affirmations201_response import AiCreateAffirmations201Response
 from models.affirmation.affirmation import Affirmation as AffirmationModel
 from impl.myllmservice import MyLLMService
+from db.models.collection_version import AFFIRMATIONS
 
 logger = logging.getLogger(__name__)
 
+# LLM calls made to replace affirmations dropped as near-duplicates
+MAX_REGENERATION_ROUNDS = 1
+
+# Requests above the threshold are split into parallel calls of at most FANOUT_CHUNK_SIZE
+FANOUT_THRESHOLD = 10
+FANOUT_CHUNK_SIZE = 8
+MAX_CHUNK_ATTEMPTS = 3
+
 
 class AiCreateAffirmationsService:
     """
@@ -76,21 +86,73 @@ class AiCreateAffirmationsService:
                 context = self.request.context_corpus.strip()
             self.journal_id = None
         
+        # Extract request parameters matching the request model field names
+        self.context = context
+        self.category = getattr(self.request, 'affirmation_category', None)
+        count = getattr(self.request, 'amount', 5)  # Default to 5 affirmations
+        
+        self.generated_affirmations = self._generate_affirmations(count)
+        logger.debug(f"Generated {len(self.generated_affirmations)} affirmations from LLM")
+    
+    def _generate_affirmations(self, count: int) -> List[dict]:
+        """Generate `count` affirmations, fanning large requests out over parallel calls."""
+        if count <= FANOUT_THRESHOLD:
+            return self._generate_chunk(count)
+        return self._generate_fanned_out(count)
+    
+    def _generate_fanned_out(self, count: int) -> List[dict]:
+        """
+        Split a large request into parallel chunk generations.
+        
+        Every call goes through the shared LLM limiter; chunks that fail are
+        retried on their own, and exact repeats across chunks are merged away.
+        """
+        chunk_sizes = [FANOUT_CHUNK_SIZE] * (count // FANOUT_CHUNK_SIZE)
+        if count % FANOUT_CHUNK_SIZE:
+            chunk_sizes.append(count % FANOUT_CHUNK_SIZE)
+        logger.debug(f"Fanning out {count} affirmations over {len(chunk_sizes)} chunks")
+        
+        results = [None] * len(chunk_sizes)
+        pending = list(range(len(chunk_sizes)))
+        with ThreadPoolExecutor(max_workers=len(chunk_sizes), thread_name_prefix="affirmation-fanout") as executor:
+            for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+                futures = {index: executor.submit(self._generate_chunk, chunk_sizes[index]) for index in pending}
+                pending = []
+                for index, future in futures.items():
+                    try:
+                        results[index] = future.result()
+                    except HTTPException as e:
+                        logger.warning(f"Affirmation chunk {index} failed on attempt {attempt}: {e.detail}")
+                        pending.append(index)
+                if not pending:
+                    break
+        
+        if len(pending) == len(chunk_sizes):
+            raise HTTPException(status_code=500, detail="Failed to generate affirmations")
+        if pending:
+            logger.warning(f"{len(pending)} of {len(chunk_sizes)} affirmation chunks failed after {MAX_CHUNK_ATTEMPTS} attempts")
+        
+        merged, seen = [], set()
+        for chunk in results:
+            for affirmation in chunk or []:
+                text_key = " ".join(str(affirmation['content']).lower().split())
+                if text_key not in seen:
+                    seen.add(text_key)
+                    merged.append(affirmation)
+        return merged
+    
+    def _generate_chunk(self, count: int) -> List[dict]:
+        """Ask the LLM for `count` affirmations and format them for saving."""
         try:
-            # Extract request parameters matching the request model field names
-            category = getattr(self.request, 'affirmation_category', None)
-            count = getattr(self.request, 'amount', 5)  # Default to 5 affirmations
-            style = self.request.style  # Required field
-            uslub = self.request.uslub  # Required field
-            
-            # Call the LLM service method
-            result = self.llm_service.generate_affirmations_with_llm(
-                context=context,
-                category=category,
-                count=count,
-                style=style,
-                uslub=uslub
-            )
+            # Call the LLM service method; the limiter is shared by all requests in the process
+            with self.dependencies.affirmation_llm_limiter():
+                result = self.llm_service.generate_affirmations_with_llm(
+                    context=self.context,
+                    category=self.category,
+                    count=count,
+                    style=self.request.style,  # Required field
+                    uslub=self.request.uslub  # Required field
+                )
             
             if not result.success:
                 logger.error(f"LLM generation failed: {result.error_message}")
@@ -106,16 +168,13 @@ class AiCreateAffirmationsService:
             for affirmation_text in affirmations_data:
                 affirmation_dict = {
                     'content': affirmation_text,
-                    'category': category,
+                    'category': self.category,
                     'voice_enabled': getattr(self.request, 'voice_enabled', False),
                     'voice_id': getattr(self.request, 'voice_id', None)
                 }
                 formatted_affirmations.append(affirmation_dict)
             
-            affirmations_data = formatted_affirmations
-            
-            self.generated_affirmations = affirmations_data
-            logger.debug(f"Generated {len(self.generated_affirmations)} affirmations from LLM")
+            return formatted_affirmations
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {e}")
@@ -126,37 +185,69 @@ class AiCreateAffirmationsService:
             logger.error(f"Error generating affirmations with LLM: {e}\n{format_exc()}")
             raise HTTPException(status_code=500, detail="Failed to generate affirmations")
     
+    def _deduplicate(self, affirmations_data: List[dict]) -> List[dict]:
+        """
+        Drop affirmations that near-duplicate the user's existing ones or each other.
+        
+        A shortfall is regenerated once; the kept signatures are remembered
+        after saving so the next request does not reload them.
+        """
+        deduplicator = self.dependencies.affirmation_deduplicator()
+        session = self._get_session()
+        try:
+            affirmation_repo = self.dependencies.affirmation_repository(session=session)
+            self.collection_version = self.dependencies.collection_version_repository(
+                session=session
+            ).get_version(self.user_id, AFFIRMATIONS)
+            
+            def keep_unique(candidates):
+                kept, signatures = deduplicator.filter(
+                    self.user_id,
+                    self.collection_version,
+                    [candidate['content'] for candidate in candidates],
+                    lambda: affirmation_repo.get_user_affirmation_texts(self.user_id)
+                )
+                return [candidates[index] for index in kept], signatures
+            
+            unique, self.kept_signatures = keep_unique(affirmations_data)
+            shortfall = len(affirmations_data) - len(unique)
+            for _ in range(MAX_REGENERATION_ROUNDS):
+                if shortfall <= 0:
+                    break
+                logger.debug(f"Regenerating {shortfall} affirmations that duplicated existing ones")
+                try:
+                    replacements = self._generate_affirmations(shortfall)
+                except HTTPException:
+                    logger.warning("Regeneration after deduplication failed; keeping unique affirmations")
+                    break
+                unique, self.kept_signatures = keep_unique(unique + replacements)
+                shortfall = len(affirmations_data) - len(unique)
+            
+            return unique
+            
+        except Exception as e:
+            # Deduplication is an optimization; never lose the generated batch over it
+            logger.error(f"Error deduplicating affirmations: {e}\n{format_exc()}")
+            self.kept_signatures = None
+            return affirmations_data
+        finally:
+            session.close()
+    
     def _save_affirmations_to_db(self, affirmations_data: List[dict]) -> List[dict]:
         """Save multiple affirmations to the database and return their data."""
         session = self._get_session()
-        created_affirmations_data = []
         
         try:
             # Get the affirmation repository
             affirmation_repo = self.dependencies.affirmation_repository(session=session)
             
-            # Create each affirmation in the database
-            for affirmation_data in affirmations_data:
-                affirmation = affirmation_repo.create_affirmation(
-                    user_id=self.user_id,
-                    journal_id=self.journal_id if hasattr(self, 'journal_id') else None,
-                    content=affirmation_data['content'],
-                    category=affirmation_data.get('category'),
-                    voice_enabled=affirmation_data.get('voice_enabled', False),
-                    voice_id=affirmation_data.get('voice_id'),
-                    source='ai_generated'
-                )
-                
-                # Extract data while session is still open
-                affirmation_dict = {
-                    'id': affirmation.id,
-                    'content': affirmation.content,
-                    'category': affirmation.category,
-                    'voice_id': affirmation.voice_id,
-                    'created_at': affirmation.created_at,
-                    'updated_at': affirmation.updated_at
-                }
-                created_affirmations_data.append(affirmation_dict)
+            # One INSERT ... RETURNING for the whole batch
+            created_affirmations_data = affirmation_repo.create_affirmations_bulk(
+                user_id=self.user_id,
+                affirmations=affirmations_data,
+                source='ai_generated',
+                journal_id=self.journal_id if hasattr(self, 'journal_id') else None
+            )
             
             logger.debug(f"Created {len(created_affirmations_data)} affirmations for user {self.user_id}")
             return created_affirmations_data
@@ -170,8 +261,21 @@ class AiCreateAffirmationsService:
     
     def _process_request(self):
         """Save generated affirmations and build the response."""
+        # Drop near-duplicates before anything is stored, listed or voiced
+        unique_affirmations = self._deduplicate(self.generated_affirmations)
+        
         # Save to database
-        saved_affirmations = self._save_affirmations_to_db(self.generated_affirmations)
+        saved_affirmations = self._save_affirmations_to_db(unique_affirmations)
+        if self.kept_signatures is not None and saved_affirmations:
+            self.dependencies.affirmation_deduplicator().remember(
+                self.user_id, self.collection_version, self.kept_signatures
+            )
+        
+        # Synthesize voice audio ahead of the first playback
+        if getattr(self.request, 'voice_enabled', False):
+            audio_cache = self.dependencies.affirmation_audio_cache()
+            for affirmation_data in saved_affirmations:
+                audio_cache.request(affirmation_data['content'], affirmation_data['voice_id'])
         
         # Convert saved data to Pydantic response models
         affirmation_responses = []
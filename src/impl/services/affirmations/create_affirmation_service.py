@@ -74,6 +74,10 @@ class CreateAffirmationService:
         # Save to database
         affirmation = self._save_affirmation_to_db()
         
+        # Synthesize voice audio ahead of the first playback
+        if affirmation.voice_enabled:
+            self.dependencies.affirmation_audio_cache().request(affirmation.content, affirmation.voice_id)
+        
         # Convert SQLAlchemy model to Pydantic response model
         affirmation_response = AffirmationModel(
             id=affirmation.id,
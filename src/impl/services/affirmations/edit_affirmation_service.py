@@ -93,6 +93,12 @@ class EditAffirmationService:
                 'updated_at': updated_affirmation.updated_at
             }
             
+            # New text or voice means a new audio key; the old file is no longer referenced
+            if updated_affirmation.voice_enabled:
+                self.dependencies.affirmation_audio_cache().request(
+                    updated_affirmation.content, updated_affirmation.voice_id
+                )
+            
             logger.debug(f"Successfully updated affirmation {self.affirmation_id}")
             
         except HTTPException:
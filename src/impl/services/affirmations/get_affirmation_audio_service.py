@@ -0,0 +1,87 @@
+# impl/services/affirmations/get_affirmation_audio_service.py
+
+import logging
+from fastapi import HTTPException, status
+from traceback import format_exc
+
+from models.affirmation.get_affirmation_audio200_response import GetAffirmationAudio200Response
+
+logger = logging.getLogger(__name__)
+
+
+class GetAffirmationAudioService:
+    """
+    Service class for locating an affirmation's voice audio.
+    
+    Resolves the affirmation to its content-addressed audio key.  Ready audio
+    is returned as a URL under /affirmations/audio/; missing audio is queued
+    for synthesis and reported as pending.
+    """
+    
+    def __init__(self, request, dependencies):
+        self.request = request
+        self.dependencies = dependencies
+        self.response = None
+        
+        logger.debug(f"GetAffirmationAudioService initialized for affirmation_id: {request.affirmation_id}")
+        
+        self._preprocess_request_data()
+        self._process_request()
+    
+    def _get_session(self):
+        """Get database session from dependencies."""
+        return self.dependencies.session_factory()()
+    
+    def _preprocess_request_data(self):
+        """Load the affirmation and check it is the user's and voiced."""
+        session = self._get_session()
+        try:
+            affirmation_repo = self.dependencies.affirmation_repository(session=session)
+            
+            affirmation = affirmation_repo.get_affirmation_by_id(self.request.affirmation_id)
+            if not affirmation or not affirmation.is_active:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Affirmation not found"
+                )
+            
+            if affirmation.user_id != self.request.user_id:
+                logger.warning(f"User {self.request.user_id} attempted to fetch audio of affirmation {affirmation.id} owned by user {affirmation.user_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You don't have permission to access this affirmation"
+                )
+            
+            if not affirmation.voice_enabled:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Voice is not enabled for this affirmation"
+                )
+            
+            self.content = affirmation.content
+            self.voice_id = affirmation.voice_id
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching affirmation audio: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Failed to fetch affirmation audio")
+        finally:
+            session.close()
+    
+    def _process_request(self):
+        """Report ready audio, or queue synthesis and report it pending."""
+        audio_cache = self.dependencies.affirmation_audio_cache()
+        key, path = audio_cache.lookup(self.content, self.voice_id)
+        
+        if path is None:
+            audio_cache.request(self.content, self.voice_id)
+            self.response = GetAffirmationAudio200Response(status="pending", audio_key=key)
+            return
+        
+        self.response = GetAffirmationAudio200Response(
+            status="ready",
+            audio_key=key,
+            audio_url=f"/affirmations/audio/{key}",
+            media_type=audio_cache.media_type
+        )
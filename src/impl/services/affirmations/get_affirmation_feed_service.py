@@ -0,0 +1,104 @@
+# impl/services/affirmations/get_affirmation_feed_service.py
+
+import base64
+import json
+import logging
+from datetime import datetime
+from fastapi import HTTPException, status
+from traceback import format_exc
+
+from models.affirmation.get_affirmation_feed200_response import GetAffirmationFeed200Response
+from models.affirmation.affirmation import Affirmation as AffirmationModel
+
+logger = logging.getLogger(__name__)
+
+
+def encode_feed_cursor(due_at: datetime, affirmation_id: int) -> str:
+    raw = json.dumps([due_at.isoformat(), affirmation_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_feed_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        due_at, affirmation_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(due_at), int(affirmation_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class GetAffirmationFeedService:
+    """
+    Service class for the spaced-repetition affirmation feed.
+    
+    Returns the user's active affirmations that are most overdue for another
+    view: never-seen ones first, then by their stored due_at (last_time_seen
+    plus a review interval that grows with how_many_times_seen).  Pages
+    continue from an opaque (due_at, id) cursor.
+    """
+    
+    def __init__(self, request, dependencies):
+        self.request = request
+        self.dependencies = dependencies
+        self.response = None
+        
+        logger.debug(f"GetAffirmationFeedService initialized for user_id: {request.user_id}")
+        
+        self._preprocess_request_data()
+        self._process_request()
+    
+    def _get_session(self):
+        """Get a read session (replica unless the user wrote moments ago)."""
+        return self.dependencies.session_factory().for_read(self.request.user_id)
+    
+    def _preprocess_request_data(self):
+        """Fetch one page of the feed, plus one row to detect whether more follow."""
+        after_key = decode_feed_cursor(self.request.cursor) if self.request.cursor else None
+        
+        session = self._get_session()
+        try:
+            affirmation_repo = self.dependencies.affirmation_repository(session=session)
+            rows = affirmation_repo.get_feed(
+                user_id=self.request.user_id,
+                limit=self.request.limit + 1,
+                after_key=after_key,
+                category=self.request.category
+            )
+            self.has_more = len(rows) > self.request.limit
+            self.rows = rows[:self.request.limit]
+            logger.debug(f"Feed page of {len(self.rows)} affirmations for user {self.request.user_id}")
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching affirmation feed: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Failed to fetch affirmation feed")
+        finally:
+            session.close()
+    
+    def _process_request(self):
+        """Build the response page and the cursor for the next one."""
+        affirmation_responses = [
+            AffirmationModel(
+                affirmation_id=str(affirmation.id),
+                text=affirmation.content,
+                category=affirmation.category,
+                source=affirmation.source or "user_created",
+                playing_voice=affirmation.voice_id,
+                is_scheduled=affirmation.schedule_config is not None,
+                schedule_config=affirmation.schedule_config,
+                created_at=affirmation.created_at,
+                updated_at=affirmation.updated_at
+            )
+            for affirmation, _ in self.rows
+        ]
+        
+        next_cursor = None
+        if self.has_more:
+            last_affirmation, last_due_at = self.rows[-1]
+            next_cursor = encode_feed_cursor(last_due_at, last_affirmation.id)
+        
+        self.response = GetAffirmationFeed200Response(
+            affirmations=affirmation_responses,
+            next_cursor=next_cursor
+        )
@@ -26,8 +26,8 @@ class GetAffirmationsService:
         self._process_request()
     
     def _get_session(self):
-        """Get database session from dependencies."""
-        return self.dependencies.session_factory()()
+        """Get a read session (replica unless the user wrote moments ago)."""
+        return self.dependencies.session_factory().for_read(self.request.user_id)
     
     def _preprocess_request_data(self):
         """Fetch affirmations from database based on filters."""
@@ -0,0 +1,355 @@
+# impl/services/affirmations/notification_dispatcher.py
+"""
+Delivery side of affirmation scheduling.
+
+    AffirmationScheduler --on_fire--> NotificationDispatcher.submit
+        -> per-user coalescing window (several due affirmations, one notification)
+        -> per-user and global token-bucket rate limits
+        -> NotificationTransport.send (batched; failed sends are retried
+           on later flushes, up to `max_attempts`)
+        -> affirmations.last_time_seen + delivery latency metrics
+
+Transports are pluggable.  `FileQueueTransport` (JSON lines on disk) is the
+local stand-in used until a push provider is wired in, and
+`InMemoryTransport` keeps notifications in a queue for tests and scripts.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from traceback import format_exc
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+PRIVATE_TITLE = "PowerManifest"
+PRIVATE_BODY = "You have a notification from PowerManifest"
+
+
+@dataclass
+class Notification:
+    user_id: int
+    title: str
+    body: str
+    affirmation_ids: List[int]
+    private: bool
+    due_at: datetime
+    data: Dict = field(default_factory=dict)
+    attempts: int = 0
+
+
+# ──────────────────────────────────────────────────────────────
+# transports
+# ──────────────────────────────────────────────────────────────
+class NotificationTransport:
+    """Sends a batch of notifications; returns one success flag per notification."""
+
+    def send(self, notifications: List[Notification]) -> List[bool]:
+        raise NotImplementedError
+
+
+class LoggingTransport(NotificationTransport):
+    def send(self, notifications: List[Notification]) -> List[bool]:
+        for notification in notifications:
+            logger.info(f"Notification for user {notification.user_id}: {notification.title} - {notification.body}")
+        return [True] * len(notifications)
+
+
+class FileQueueTransport(NotificationTransport):
+    """Appends notifications as JSON lines to a local outbox file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def send(self, notifications: List[Notification]) -> List[bool]:
+        lines = [json.dumps(asdict(notification), default=str) for notification in notifications]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return [True] * len(notifications)
+
+
+class InMemoryTransport(NotificationTransport):
+    def __init__(self, maxsize: int = 0):
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def send(self, notifications: List[Notification]) -> List[bool]:
+        results = []
+        for notification in notifications:
+            try:
+                self.queue.put_nowait(notification)
+                results.append(True)
+            except queue.Full:
+                results.append(False)
+        return results
+
+
+# ──────────────────────────────────────────────────────────────
+# rate limiting
+# ──────────────────────────────────────────────────────────────
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def is_full(self, now: float) -> bool:
+        """A full bucket behaves exactly like a new one, so it can be dropped."""
+        return self.tokens + max(0.0, now - self.updated) * self.rate >= self.capacity
+
+
+# ──────────────────────────────────────────────────────────────
+# dispatcher
+# ──────────────────────────────────────────────────────────────
+class NotificationDispatcher:
+    """
+    Coalesces fired affirmations per user and delivers them through a transport.
+
+    Args:
+        session_factory: sessionmaker for recording last_time_seen
+        affirmation_repository: factory called as `affirmation_repository(session=...)`
+        transport: NotificationTransport used for delivery
+        coalesce_window_seconds: how long a user's first due affirmation waits for others
+        per_user_per_hour: notifications a single user may receive per hour
+        global_per_second: overall delivery rate
+        batch_size: notifications per transport call
+        max_attempts: sends of one notification before it is given up
+        bucket_sweep_seconds: how often idle per-user rate buckets are dropped
+    """
+
+    def __init__(self, session_factory, affirmation_repository, transport: NotificationTransport,
+                 coalesce_window_seconds: float = 60.0, per_user_per_hour: int = 6,
+                 global_per_second: float = 50.0, batch_size: int = 200, flush_interval_seconds: float = 5.0,
+                 max_attempts: int = 3, bucket_sweep_seconds: float = 300.0):
+        self.session_factory = session_factory
+        self.affirmation_repository = affirmation_repository
+        self.transport = transport
+        self.coalesce_window = coalesce_window_seconds
+        self.per_user_per_hour = per_user_per_hour
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_seconds
+        self.max_attempts = max_attempts
+        self.bucket_sweep_seconds = bucket_sweep_seconds
+
+        self._global_bucket = TokenBucket(global_per_second, global_per_second)
+        self._user_buckets: Dict[int, TokenBucket] = {}
+        self._buckets_swept = time.monotonic()
+        self._pending: Dict[int, dict] = {}     # user_id -> {"since": monotonic, "fires": [...]}
+        self._retries: List[Notification] = []  # failed sends waiting for another attempt
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._latencies = deque(maxlen=10000)
+        self._counters = {
+            "submitted": 0, "delivered": 0, "failed": 0, "retried": 0, "rate_limited": 0, "coalesced": 0,
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    # lifecycle
+    # ──────────────────────────────────────────────────────────────
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info("Notification dispatcher started")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        # Whatever is still waiting goes out now instead of being lost
+        self.flush(force=True)
+        with self._lock:
+            unsent, self._retries = self._retries, []
+        if unsent:
+            self._counters["failed"] += len(unsent)
+            logger.warning(f"Dropped {len(unsent)} notifications still failing at shutdown")
+        logger.info("Notification dispatcher stopped")
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Notification flush failed: {e}\n{format_exc()}")
+
+    # ──────────────────────────────────────────────────────────────
+    # intake
+    # ──────────────────────────────────────────────────────────────
+    def submit(self, fires):
+        """on_fire hook for AffirmationScheduler."""
+        now = time.monotonic()
+        with self._lock:
+            for fire in fires:
+                config = fire.schedule_config or {}
+                if config.get("notification_type", "push_notification") == "none" or fire.user_id is None:
+                    continue
+                pending = self._pending.setdefault(fire.user_id, {"since": now, "fires": []})
+                pending["fires"].append(fire)
+                self._counters["submitted"] += 1
+
+    # ──────────────────────────────────────────────────────────────
+    # delivery
+    # ──────────────────────────────────────────────────────────────
+    def flush(self, force: bool = False):
+        """
+        Deliver users whose coalescing window has passed, and earlier failed sends.
+        `force` (used at shutdown) sends everything pending, past the global rate limit.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ready = [
+                user_id for user_id, pending in self._pending.items()
+                if force or now - pending["since"] >= self.coalesce_window
+            ]
+            batches = {user_id: self._pending.pop(user_id)["fires"] for user_id in ready}
+            retries, self._retries = self._retries, []
+
+        # Retries already passed the per-user limit; they only need global budget
+        notifications, deferred_retries = [], []
+        for notification in retries:
+            if force or self._global_bucket.take(now):
+                notifications.append(notification)
+            else:
+                deferred_retries.append(notification)
+
+        deferred = {}
+        for user_id, fires in batches.items():
+            bucket = self._user_buckets.setdefault(
+                user_id, TokenBucket(self.per_user_per_hour / 3600.0, self.per_user_per_hour)
+            )
+            if not force and not self._global_bucket.take(now):
+                deferred[user_id] = fires
+                continue
+            if not bucket.take(now):
+                if not force:
+                    self._global_bucket.refund()
+                self._counters["rate_limited"] += len(fires)
+                logger.debug(f"Dropped {len(fires)} affirmation notifications for rate-limited user {user_id}")
+                continue
+            notifications.append(self._build_notification(user_id, fires))
+
+        if deferred or deferred_retries:
+            # Global budget exhausted: retry these users on the next flush
+            with self._lock:
+                for user_id, fires in deferred.items():
+                    pending = self._pending.setdefault(user_id, {"since": now - self.coalesce_window, "fires": []})
+                    pending["fires"] = fires + pending["fires"]
+                self._retries[:0] = deferred_retries
+
+        for start in range(0, len(notifications), self.batch_size):
+            self._deliver(notifications[start:start + self.batch_size])
+
+        if now - self._buckets_swept >= self.bucket_sweep_seconds:
+            self._sweep_buckets(now)
+
+    def _sweep_buckets(self, now: float):
+        """Drop per-user buckets that have refilled; the next notification starts a fresh one."""
+        with self._lock:
+            self._user_buckets = {
+                user_id: bucket for user_id, bucket in self._user_buckets.items() if not bucket.is_full(now)
+            }
+            self._buckets_swept = now
+
+    def _build_notification(self, user_id: int, fires) -> Notification:
+        fires = sorted(fires, key=lambda fire: fire.due_at)
+        private = any((fire.schedule_config or {}).get("private_notification") for fire in fires)
+        if len(fires) > 1:
+            self._counters["coalesced"] += len(fires) - 1
+
+        if private:
+            title, body = PRIVATE_TITLE, PRIVATE_BODY
+        elif len(fires) == 1:
+            title, body = "Your affirmation", fires[0].content
+        else:
+            title, body = f"{len(fires)} affirmations for you", fires[0].content
+
+        return Notification(
+            user_id=user_id,
+            title=title,
+            body=body,
+            affirmation_ids=[fire.affirmation_id for fire in fires],
+            private=private,
+            due_at=fires[0].due_at,
+        )
+
+    def _deliver(self, notifications: List[Notification]):
+        try:
+            results = self.transport.send(notifications)
+        except Exception as e:
+            logger.error(f"Notification transport failed: {e}\n{format_exc()}")
+            results = [False] * len(notifications)
+
+        sent_at = datetime.utcnow()
+        delivered = [notification for notification, ok in zip(notifications, results) if ok]
+        self._counters["delivered"] += len(delivered)
+        self._requeue([notification for notification, ok in zip(notifications, results) if not ok])
+        self._latencies.extend((sent_at - notification.due_at).total_seconds() for notification in delivered)
+
+        seen_ids = [affirmation_id for notification in delivered for affirmation_id in notification.affirmation_ids]
+        if not seen_ids:
+            return
+        session = self.session_factory()
+        try:
+            self.affirmation_repository(session=session).mark_seen(seen_ids, sent_at)
+        except Exception as e:
+            logger.error(f"Error recording notification delivery: {e}\n{format_exc()}")
+        finally:
+            session.close()
+
+    def _requeue(self, failed: List[Notification]):
+        """Queue failed sends for the next flush, giving up after `max_attempts`."""
+        retry = []
+        for notification in failed:
+            notification.attempts += 1
+            if notification.attempts < self.max_attempts:
+                retry.append(notification)
+            else:
+                self._counters["failed"] += 1
+                logger.warning(
+                    f"Gave up on notification for user {notification.user_id} "
+                    f"after {notification.attempts} attempts"
+                )
+        if retry:
+            self._counters["retried"] += len(retry)
+            with self._lock:
+                self._retries.extend(retry)
+
+    def metrics(self) -> dict:
+        """Counters plus delivery latency percentiles (seconds from due time to send)."""
+        latencies = np.fromiter(self._latencies, dtype=np.float64)
+        stats = dict(self._counters)
+        stats["pending_users"] = len(self._pending)
+        stats["retry_queue"] = len(self._retries)
+        stats["rate_buckets"] = len(self._user_buckets)
+        if len(latencies):
+            stats["latency_p50"], stats["latency_p95"], stats["latency_max"] = (
+                float(value) for value in np.percentile(latencies, [50, 95, 100])
+            )
+        return stats
@@ -0,0 +1,52 @@
+# impl/services/affirmations/record_affirmation_event_service.py
+
+import logging
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from traceback import format_exc
+
+logger = logging.getLogger(__name__)
+
+
+class RecordAffirmationEventService:
+    """
+    Service class for recording that an affirmation was seen or played.
+    
+    Events go to the write-behind stats buffer, so the request does no
+    database work; ownership is enforced when the buffer flushes.
+    """
+    
+    def __init__(self, request, dependencies):
+        self.request = request
+        self.dependencies = dependencies
+        self.response = None
+        
+        logger.debug(f"RecordAffirmationEventService initialized for affirmation_id: {request.affirmation_id}")
+        
+        self._preprocess_request_data()
+        self._process_request()
+    
+    def _preprocess_request_data(self):
+        """Normalize the event time to naive UTC, never later than now."""
+        now = datetime.utcnow()
+        occurred_at = self.request.occurred_at
+        if occurred_at is None:
+            self.occurred_at = now
+            return
+        if occurred_at.tzinfo is not None:
+            occurred_at = occurred_at.astimezone(timezone.utc).replace(tzinfo=None)
+        self.occurred_at = min(occurred_at, now)
+    
+    def _process_request(self):
+        """Buffer the event."""
+        try:
+            self.dependencies.affirmation_stats_buffer().record(
+                self.request.affirmation_id,
+                self.request.user_id,
+                seen=self.request.event == "seen",
+                played=self.request.event == "played",
+                at=self.occurred_at
+            )
+        except Exception as e:
+            logger.error(f"Error recording affirmation event: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Failed to record affirmation event")
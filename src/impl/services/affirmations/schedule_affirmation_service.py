@@ -8,6 +8,7 @@ import pytz
 
 from models.affirmation.schedule_affirmation200_response import ScheduleAffirmation200Response
 from models.affirmation.schedule_config import ScheduleConfig
+from impl.services.affirmations.schedule_compiler import next_occurrence
 
 logger = logging.getLogger(__name__)
 
@@ -94,10 +95,13 @@ class ScheduleAffirmationService:
             
             # Update affirmation with schedule_config JSON
             logger.debug(f"Updating affirmation {self.request.affirmation_id} with schedule_config: {schedule_config}")
+            self.next_notification = self._calculate_next_notification(schedule_config)
             updated_affirmation = affirmation_repo.update_affirmation(
                 affirmation_id=self.request.affirmation_id,
-                schedule_config=schedule_config
+                schedule_config=schedule_config,
+                next_fire_at=self.next_notification
             )
+            self.dependencies.affirmation_scheduler().notify()
             
             logger.debug(f"Updated affirmation schedule_config: {updated_affirmation.schedule_config}")
             self.schedule_config = schedule_config
@@ -113,62 +117,11 @@ class ScheduleAffirmationService:
     
     def _calculate_next_notification(self, schedule_config):
         """Calculate when the next notification should be sent based on the schedule."""
-        if not schedule_config.get('enabled') or not schedule_config.get('time_slots'):
-            return None
-        
-        if schedule_config.get('notification_type') == 'none':
-            return None
-        
-        now = datetime.utcnow()
-        next_times = []
-        
-        for slot in schedule_config['time_slots']:
-            time_str = slot.get('time', '00:00')
-            days = slot.get('days', [])
-            timezone_str = slot.get('timezone', 'UTC')
-            
-            # Parse time
-            hour, minute = map(int, time_str.split(':'))
-            
-            # Handle UTC offset format (e.g., "UTC-5")
-            if timezone_str.startswith('UTC'):
-                offset_str = timezone_str[3:]
-                if offset_str:
-                    offset_hours = int(offset_str)
-                    # Convert scheduled time to UTC
-                    utc_hour = (hour - offset_hours) % 24
-                else:
-                    utc_hour = hour
-            else:
-                # Default to UTC if format not recognized
-                utc_hour = hour
-            
-            # Find next occurrence for each day
-            for day in days:
-                # Calculate days until next occurrence
-                current_weekday = now.weekday()  # Monday is 0, Sunday is 6
-                target_weekday = (day - 1) % 7  # Convert from our format (0=Sunday) to Python's (0=Monday)
-                
-                days_ahead = (target_weekday - current_weekday) % 7
-                if days_ahead == 0:  # Same day
-                    # Check if time has passed
-                    target_time = now.replace(hour=utc_hour, minute=minute, second=0, microsecond=0)
-                    if target_time <= now:
-                        days_ahead = 7  # Next week
-                
-                next_date = now + timedelta(days=days_ahead)
-                next_datetime = next_date.replace(hour=utc_hour, minute=minute, second=0, microsecond=0)
-                next_times.append(next_datetime)
-        
-        # Return the earliest next notification time
-        return min(next_times) if next_times else None
+        return next_occurrence(schedule_config, datetime.utcnow())
     
     def _process_request(self):
         """Build the response with schedule information."""
-        # Calculate next notification time
-        next_notification = self._calculate_next_notification(self.schedule_config)
-        
         self.response = ScheduleAffirmation200Response(
             affirmation_id=str(self.request.affirmation_id),
-            next_notification=next_notification
+            next_notification=self.next_notification
         )
\ No newline at end of file
@@ -0,0 +1,155 @@
+# impl/services/affirmations/schedule_compiler.py
+"""
+Compiles `schedule_config` JSON into arrays and evaluates next occurrences
+for many schedules at once.
+
+A compiled schedule is one `CompiledSchedule` per timezone used by its time
+slots.  Each holds the slots as (minute_of_day, weekday_mask) pairs and the
+derived sorted minute-of-week offsets (0 = Monday 00:00 local time).
+
+`next_occurrences` groups schedules by timezone, finds the next local
+minute-of-week for all of them with one padded-matrix comparison, and
+converts the local wall-clock candidates to UTC through zoneinfo in bulk.
+Wall-clock times that fall in a DST gap move forward to the first valid
+instant.  Times that occur twice on fall-back fire on the first pass.
+"""
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from impl.services.timezones import resolve_timezone
+
+logger = logging.getLogger(__name__)
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+_NO_OFFSET = np.iinfo(np.int64).max // 2
+
+CompiledSchedule = namedtuple("CompiledSchedule", ["timezone", "slots", "offsets"])
+
+
+def _parse_minute_of_day(value) -> Optional[int]:
+    try:
+        hour, minute = map(int, str(value).split(":")[:2])
+    except (TypeError, ValueError):
+        return None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return hour * 60 + minute
+
+
+def compile_schedule(schedule_config) -> List[CompiledSchedule]:
+    """Compile one schedule_config; an empty list means it never notifies."""
+    if not schedule_config or not schedule_config.get("enabled"):
+        return []
+    if schedule_config.get("notification_type") == "none":
+        return []
+
+    slots_by_timezone = {}
+    for slot in schedule_config.get("time_slots") or []:
+        minute_of_day = _parse_minute_of_day(slot.get("time", "00:00"))
+        if minute_of_day is None:
+            logger.debug(f"Ignoring time slot with invalid time: {slot}")
+            continue
+        mask = 0
+        for day in slot.get("days") or []:
+            if isinstance(day, int) and 0 <= day <= 6:
+                mask |= 1 << ((day - 1) % 7)  # config uses 0=Sunday, masks use 0=Monday
+        if mask:
+            slots_by_timezone.setdefault(slot.get("timezone") or "UTC", []).append((minute_of_day, mask))
+
+    compiled = []
+    for tz_name, slots in slots_by_timezone.items():
+        offsets = sorted({
+            weekday * MINUTES_PER_DAY + minute_of_day
+            for minute_of_day, mask in slots
+            for weekday in range(7) if mask >> weekday & 1
+        })
+        compiled.append(CompiledSchedule(tz_name, tuple(slots), np.asarray(offsets, dtype=np.int64)))
+    return compiled
+
+
+def _to_utc_naive(after: datetime) -> datetime:
+    if after.tzinfo is not None:
+        after = after.astimezone(timezone.utc).replace(tzinfo=None)
+    return after
+
+
+def _next_in_timezone(tz_name: str, matrix: np.ndarray, after: datetime) -> np.ndarray:
+    """Next UTC instants (datetime64[ns]) after `after` for rows of padded minute-of-week offsets."""
+    tz = resolve_timezone(tz_name)
+    local_after = after.replace(tzinfo=timezone.utc).astimezone(tz).replace(tzinfo=None)
+    week_start = datetime.combine(local_after.date() - timedelta(days=local_after.weekday()), datetime.min.time())
+    after_ns = np.datetime64(after, "ns")
+
+    # Minute-of-week to search from, per row; starts at the current local time
+    position = np.full(len(matrix), (local_after - week_start).total_seconds() / 60.0)
+    first_offsets = matrix.min(axis=1)
+    result = np.full(len(matrix), np.datetime64("NaT"), dtype="datetime64[ns]")
+    pending = np.arange(len(matrix))
+
+    # Fall-back folds can make a local candidate map before `after`; those rows search again
+    for _ in range(3):
+        rows = matrix[pending]
+        later = np.where(rows > position[pending, None], rows, _NO_OFFSET).min(axis=1)
+        wrapped = later == _NO_OFFSET
+        later = np.where(wrapped, first_offsets[pending] + MINUTES_PER_WEEK, later)
+
+        local = np.datetime64(week_start, "m") + later.astype("timedelta64[m]")
+        utc = (
+            pd.DatetimeIndex(local)
+            .tz_localize(tz, ambiguous=np.ones(len(local), dtype=bool), nonexistent="shift_forward")
+            .tz_convert("UTC")
+            .tz_localize(None)
+            .to_numpy()
+        )
+
+        done = utc > after_ns
+        result[pending[done]] = utc[done]
+        position[pending[~done]] = later[~done]
+        pending = pending[~done]
+        if len(pending) == 0:
+            break
+    return result
+
+
+def next_occurrences(schedules: Sequence[List[CompiledSchedule]], after: datetime) -> List[Optional[datetime]]:
+    """
+    Next notification time strictly after `after` for each compiled schedule.
+
+    Args:
+        schedules: output of `compile_schedule` for each schedule
+        after: reference instant, naive UTC or timezone-aware
+
+    Returns:
+        Naive UTC datetimes, None where a schedule never notifies
+    """
+    after = _to_utc_naive(after)
+    best = np.full(len(schedules), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    groups = {}
+    for owner, compiled in enumerate(schedules):
+        for group in compiled:
+            groups.setdefault(group.timezone, []).append((owner, group.offsets))
+
+    for tz_name, members in groups.items():
+        owners = np.fromiter((owner for owner, _ in members), dtype=np.int64, count=len(members))
+        width = max(len(offsets) for _, offsets in members)
+        matrix = np.full((len(members), width), _NO_OFFSET, dtype=np.int64)
+        for row, (_, offsets) in enumerate(members):
+            matrix[row, :len(offsets)] = offsets
+
+        # A schedule spanning several timezones keeps its earliest candidate (fmin ignores NaT)
+        np.fmin.at(best, owners, _next_in_timezone(tz_name, matrix, after))
+
+    return best.astype("datetime64[us]").tolist()
+
+
+def next_occurrence(schedule_config, after: datetime) -> Optional[datetime]:
+    """First notification time strictly after `after` (naive UTC), or None if nothing is scheduled."""
+    return next_occurrences([compile_schedule(schedule_config)], after)[0]
@@ -66,12 +66,12 @@ class UnscheduleAffirmationService:
             # Remove schedule by setting schedule_config to None
             updated_affirmation = affirmation_repo.update_affirmation(
                 affirmation_id=self.request.affirmation_id,
-                schedule_config=None
+                schedule_config=None,
+                next_fire_at=None
             )
             
-            # In a real implementation, you might also want to:
-            # 1. Delete or deactivate the schedule configuration
-            # 2. Cancel any pending notifications
+            # Clearing next_fire_at takes it off the scheduler; a queued
+            # occurrence is discarded when it no longer matches the row
             
             logger.debug(f"Successfully unscheduled affirmation {self.request.affirmation_id}")
             
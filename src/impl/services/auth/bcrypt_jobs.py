@@ -0,0 +1,19 @@
+# impl/services/auth/bcrypt_jobs.py
+"""
+The functions PasswordHasher runs in its process pool.
+
+Spawned workers import this module to unpickle the jobs, so it imports
+nothing beyond passlib.
+"""
+from passlib.context import CryptContext
+
+# Same scheme as the services' pwd_context, so existing hashes verify unchanged
+_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return _pwd_context.hash(password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return _pwd_context.verify(password, password_hash)
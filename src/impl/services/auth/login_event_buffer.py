@@ -0,0 +1,115 @@
+# impl/services/auth/login_event_buffer.py
+"""
+Write-behind buffer for login history.
+
+Logins are queued in memory and written by a background thread every
+`flush_interval_seconds` (or sooner once `max_pending` logins accumulate):
+one executemany INSERT into login_time_logs and one executemany UPDATE of
+the denormalized user_details.last_login_at.  The login request itself
+does no writes.  `stop()` flushes what is left on shutdown.
+
+A failed flush puts the logins back for the next one.  After
+`max_attempts` failed flushes in a row, the batch is written in halves
+instead, and logins that still fail on their own are logged and dropped,
+so one bad row cannot hold back every later login.
+"""
+import logging
+import threading
+from datetime import datetime
+from traceback import format_exc
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoginEventBuffer:
+    def __init__(self, session_factory, user_repository, flush_interval_seconds: float = 5.0,
+                 max_pending: int = 5000, max_attempts: int = 5):
+        self.session_factory = session_factory
+        self.user_repository = user_repository
+        self.flush_interval = flush_interval_seconds
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+
+        self._pending: List[dict] = []
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="login-event-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Login log flush failed: {e}\n{format_exc()}")
+
+    def record(self, user_id: int, at: Optional[datetime] = None):
+        """Buffer one login."""
+        with self._lock:
+            self._pending.append({"login_user_id": user_id, "login_at": at or datetime.utcnow()})
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write buffered logins; returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+
+            if self._failures >= self.max_attempts:
+                # The same logins keep failing; find and drop the rows at fault
+                self._failures = 0
+                return self._write_isolating(pending)
+
+            try:
+                self._write(pending)
+            except Exception:
+                self._failures += 1
+                # Put the logins back so they go out with the next flush
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+            self._failures = 0
+            logger.debug(f"Flushed {len(pending)} login events")
+            return len(pending)
+
+    def _write(self, logins: List[dict]):
+        session = self.session_factory()
+        try:
+            self.user_repository(session=session).record_logins(logins)
+        finally:
+            session.close()
+
+    def _write_isolating(self, logins: List[dict]) -> int:
+        """Write `logins`, bisecting on failure; returns the number written."""
+        try:
+            self._write(logins)
+            return len(logins)
+        except Exception as e:
+            if len(logins) == 1:
+                logger.error(f"Dropped login event {logins[0]} after {self.max_attempts} failed flushes: {e}")
+                return 0
+        middle = len(logins) // 2
+        return self._write_isolating(logins[:middle]) + self._write_isolating(logins[middle:])
@@ -8,8 +8,7 @@ import jwt
 from traceback import format_exc
 
 from models.auth_login_post200_response import AuthLoginPost200Response
-from db.models.login_time_log import LoginTimeLog
-from db.models.user_details import UserDetails
+from impl.services.auth.token_revocation import token_claims
 
 from dotenv import load_dotenv
 import os
@@ -117,16 +116,17 @@ class LoginService:
     def _verify_user_password(self, db_user, password: str):
         """Verify that the given password matches the stored hash."""
         logger.debug("Verifying password")
-        if not pwd_context.verify(password, db_user.password_hash):
+        # bcrypt runs in the shared process pool, off the event loop
+        if not self.dependencies.password_hasher().verify(password, db_user.password_hash):
             logger.error("Invalid password")
             raise HTTPException(status_code=400, detail="Invalid email or password")
 
-    def _create_jwt_for_user(self, user_id: int) -> str:
+    def _create_jwt_for_user(self, user_id: int, token_epoch: int = 0) -> str:
         """Generate a JWT token for the given user_id."""
         logger.debug(f"Generating JWT token for user_id: {user_id}")
         expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        # Build the JWT payload
-        payload = {"sub": str(user_id)}
+        # Build the JWT payload; jti and the token epoch make it revocable
+        payload = token_claims(user_id, token_epoch)
         # Actually create the token
         encoded_jwt = jwt.encode(
             self._add_exp_to_payload(payload, expires_delta),
@@ -143,22 +143,10 @@ class LoginService:
         to_encode.update({"exp": expire_time})
         return to_encode
     
-    def _insert_login_log(self, session, user_id: int):
-        logger.debug("Attempting to insert login_time_log.")
-        try:
-            # We already have a real Session, so no need for "with session() as db:"        
-            user_settings = session.query(UserDetails).filter_by(user_id=user_id).first()
-            if user_settings:
-                new_log = LoginTimeLog(login_datetime=datetime.utcnow())
-                user_settings.login_time_logs.append(new_log)
-                session.add(user_settings)
-                session.commit()
-                logger.debug(f"Inserted new LoginTimeLog for user_id={user_id}")
-            else:
-                logger.debug(f"UserDetails not found for user_id={user_id}. "
-                            "Skipping login_time_log insertion.")
-        except Exception as e:
-            logger.error(f"Error inserting login log: {e}")
+    def _insert_login_log(self, user_id: int):
+        """Queue the login; the login event buffer writes it in the next batch."""
+        self.dependencies.login_event_buffer().record(user_id)
+        logger.debug(f"Queued login_time_log for user_id={user_id}")
 
     # def _insert_login_log(self, session, user_id: int):
     #     """
@@ -217,10 +205,10 @@ class LoginService:
             self._verify_user_password(db_user, self.request.password)
 
             # 5) Create the JWT
-            access_token = self._create_jwt_for_user(db_user.user_id)
+            access_token = self._create_jwt_for_user(db_user.user_id, db_user.token_epoch)
 
             # 6) Insert the login log if user settings exist
-            self._insert_login_log(session, db_user.user_id)
+            self._insert_login_log(db_user.user_id)
 
             # 7) Save the result for process_request
             self.preprocessed_data = access_token
@@ -9,8 +9,8 @@ import jwt
 from traceback import format_exc
 
 from models.auth_login_with_refresh_logic_post200_response import AuthLoginWithRefreshLogicPost200Response
-from db.models.login_time_log import LoginTimeLog
-from db.models.user_details import UserDetails
+from models.refresh_token200_response import RefreshToken200Response
+from impl.services.auth.token_revocation import token_claims
 
 
 
@@ -26,6 +26,8 @@ SECRET_KEY = os.getenv('SECRET_KEY')
 # Expiration: 15 minutes for the access token; 7 days for the refresh token.
 ACCESS_TOKEN_EXPIRE_MINUTES = 15
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+# `typ` claim of refresh tokens, so an access token cannot be used to mint more
+REFRESH_TOKEN_TYPE = "refresh"
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -49,7 +51,7 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None) -> str:
     """Create a JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "typ": REFRESH_TOKEN_TYPE})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -118,32 +120,23 @@ class LoginWithRefreshService:
     
     def _verify_user_password(self, db_user, password: str):
         logger.debug("Verifying password")
-        if not pwd_context.verify(password, db_user.password_hash):
+        # bcrypt runs in the shared process pool, off the event loop
+        if not self.dependencies.password_hasher().verify(password, db_user.password_hash):
             logger.error("Invalid password")
             raise HTTPException(status_code=400, detail="Invalid email or password")
 
-    def _create_tokens_for_user(self, user_id: int):
+    def _create_tokens_for_user(self, user_id: int, token_epoch: int = 0):
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         refresh_token_expires = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-        payload = {"sub": str(user_id)}
-        access_token = create_access_token(payload, expires_delta=access_token_expires)
-        refresh_token = create_refresh_token(payload, expires_delta=refresh_token_expires)
+        # Each token gets its own jti so either can be revoked alone
+        access_token = create_access_token(token_claims(user_id, token_epoch), expires_delta=access_token_expires)
+        refresh_token = create_refresh_token(token_claims(user_id, token_epoch), expires_delta=refresh_token_expires)
         return access_token, refresh_token
 
-    def _insert_login_log(self, session, user_id: int):
-        logger.debug("Attempting to insert login_time_log.")
-        try:
-            user_settings = session.query(UserDetails).filter_by(user_id=user_id).first()
-            if user_settings:
-                new_log = LoginTimeLog(login_datetime=datetime.utcnow())
-                user_settings.login_time_logs.append(new_log)
-                session.add(user_settings)
-                session.commit()
-                logger.debug(f"Inserted new LoginTimeLog for user_id={user_id}")
-            else:
-                logger.debug(f"UserDetails not found for user_id={user_id}. Skipping login_time_log insertion.")
-        except Exception as e:
-            logger.error(f"Error inserting login log: {e}")
+    def _insert_login_log(self, user_id: int):
+        """Queue the login; the login event buffer writes it in the next batch."""
+        self.dependencies.login_event_buffer().record(user_id)
+        logger.debug(f"Queued login_time_log for user_id={user_id}")
 
     def _preprocess_request_data(self):
         try:
@@ -156,10 +149,10 @@ class LoginWithRefreshService:
             db_user = self._fetch_user_by_email(user_repository, email)
             self._verify_user_password(db_user, self.request.password)
             # Insert login log if user settings exist
-            self._insert_login_log(session, db_user.user_id)
+            self._insert_login_log(db_user.user_id)
             # session.close()
             # Generate tokens
-            self.access_token, self.refresh_token = self._create_tokens_for_user(db_user.user_id)
+            self.access_token, self.refresh_token = self._create_tokens_for_user(db_user.user_id, db_user.token_epoch)
         except HTTPException:
             raise
         except Exception as e:
@@ -180,3 +173,54 @@ class LoginWithRefreshService:
             access_token=self.access_token,
             token_type="bearer"
         )
+
+
+class RefreshAccessTokenService:
+    """
+    Issue a new access token for the refresh token cookie set at login.
+
+      1. Verify the refresh token's signature, expiry and `typ`.
+      2. Reject it if it has been revoked: its jti was logged out, or the user's
+         token epoch moved past its `tep` (log out everywhere).
+      3. Issue an access token under the same epoch, so a later
+         log-out-everywhere revokes it too.
+
+    :param request: an object with attribute `refresh_token`
+    """
+
+    def __init__(self, request, dependencies):
+        self.request = request
+        self.dependencies = dependencies
+        self.response = None
+
+        logger.debug("Inside RefreshAccessTokenService")
+        self._preprocess_request_data()
+        self._process_request()
+
+    def _decode_refresh_token(self) -> dict:
+        if not self.request.refresh_token:
+            raise HTTPException(status_code=401, detail="Missing refresh token")
+        try:
+            claims = jwt.decode(self.request.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Refresh token expired")
+        except jwt.InvalidTokenError as e:
+            logger.error(f"Invalid refresh token: {e}")
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+        if claims.get("typ") != REFRESH_TOKEN_TYPE or claims.get("sub") is None:
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+        return claims
+
+    def _preprocess_request_data(self):
+        claims = self._decode_refresh_token()
+        revocations = self.dependencies.token_revocations()
+        if revocations.is_revoked(claims["sub"], claims.get("jti"), claims.get("tep")):
+            logger.debug(f"Refused revoked refresh token of user {claims['sub']}")
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+        self.access_token = create_access_token(
+            token_claims(int(claims["sub"]), claims.get("tep")),
+            expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+
+    def _process_request(self):
+        self.response = RefreshToken200Response(access_token=self.access_token, token_type="bearer")
@@ -0,0 +1,75 @@
+# impl/services/auth/logout_service.py
+import logging
+import os
+from datetime import datetime
+from traceback import format_exc
+
+import jwt
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from models.auth_logout_post200_response import AuthLogoutPost200Response
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+SECRET_KEY = os.getenv("SECRET_KEY")
+
+
+class LogoutService:
+    """
+    Revoke the presented access token, or every token of its user.
+
+      1. Read sub / jti / exp from the (already verified) token.
+      2. everywhere=False: add the jti to the revocation list.
+         everywhere=True, or a token without a jti: bump the user's token epoch,
+         which /auth/refresh-token checks too, so refresh tokens stop working.
+      3. Build the response.
+
+    :param request: an object with attributes `token` and `everywhere`
+    """
+
+    def __init__(self, request, dependencies):
+        self.request = request
+        self.dependencies = dependencies
+        self.response = None
+
+        logger.debug("Inside LogoutService")
+
+        self._preprocess_request_data()
+        self._process_request()
+
+    def _decode_claims(self) -> dict:
+        try:
+            return jwt.decode(self.request.token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.InvalidTokenError as e:
+            logger.error(f"Invalid token on logout: {e}")
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+    def _preprocess_request_data(self):
+        claims = self._decode_claims()
+        sub, jti = claims.get("sub"), claims.get("jti")
+        if sub is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        revocations = self.dependencies.token_revocations()
+        try:
+            if self.request.everywhere or jti is None or claims.get("exp") is None:
+                # Tokens issued before jtis existed can only be revoked through the epoch
+                revocations.revoke_user(sub)
+                self.everywhere = True
+                logger.debug(f"Revoked all tokens of user {sub}")
+            else:
+                revocations.revoke_token(sub, jti, datetime.utcfromtimestamp(claims["exp"]))
+                self.everywhere = False
+                logger.debug(f"Revoked token {jti} of user {sub}")
+        except Exception as e:
+            logger.error(f"Error revoking token: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    def _process_request(self):
+        self.response = AuthLogoutPost200Response(
+            msg="Logged out from all devices" if self.everywhere else "Logged out"
+        )
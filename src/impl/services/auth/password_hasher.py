@@ -0,0 +1,124 @@
+# impl/services/auth/password_hasher.py
+"""
+bcrypt off the event loop.
+
+Hashing and verification run in a dedicated process pool, so a burst of
+logins uses spare cores instead of stalling the worker's event loop (and
+with it chat traffic).  Admission control caps the jobs that may be queued
+or running; beyond that, callers get 503 with Retry-After immediately
+rather than piling up behind the pool.
+
+Auth routes run their services through `run_in_threadpool`; the service
+thread waits on the pool while the event loop keeps serving requests.
+
+A job holds its admission slot until it finishes or is cancelled, not
+just while its caller waits.  A caller that times out cancels the job
+if it has not started yet.  Otherwise the job keeps the slot until it
+completes, so timed-out work cannot build up in the pool's queue.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from impl.services.auth.bcrypt_jobs import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    Bounded bcrypt executor.
+
+    Args:
+        workers: pool processes; defaults to all cores but one
+        max_pending: jobs admitted at once (queued + running); defaults to 4 per worker
+        timeout_seconds: longest a caller waits for an admitted job
+        retry_after_seconds: Retry-After sent when admission is refused
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None, timeout_seconds: float = 10.0,
+                 retry_after_seconds: int = 2):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout_seconds
+        self.retry_after = retry_after_seconds
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._counters = {"admitted": 0, "rejected": 0, "timed_out": 0, "cancelled": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self._counters["rejected"] += 1
+            logger.warning("Password hashing queue is full; rejecting request")
+            raise self._busy()
+        self._counters["admitted"] += 1
+        executor = None
+        try:
+            executor = self._get_executor()
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset_executor(executor)
+            raise self._busy()
+        except BaseException:
+            self._slots.release()
+            raise
+        # From here on the slot is released when the job is done or cancelled
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._counters["timed_out"] += 1
+            if future.cancel():
+                self._counters["cancelled"] += 1
+            logger.error(f"Password hashing took longer than {self.timeout}s")
+            raise self._busy()
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise self._busy()
+
+    def _reset_executor(self, executor):
+        logger.error("Password hashing pool broke; it will be recreated")
+        with self._executor_lock:
+            if executor is not None and self._executor is executor:
+                self._executor = None
+
+    def hash(self, password: str) -> str:
+        return self._run(hash_password, password)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(verify_password, password, password_hash)
+
+    def metrics(self) -> dict:
+        return dict(self._counters, workers=self.workers, max_pending=self.max_pending)
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -9,6 +9,9 @@ import jwt
 from traceback import format_exc
 
 from models.auth_register_post200_response import AuthRegisterPost200Response
+from impl.services.auth.token_revocation import token_claims
+from impl.services.auth.verification_mail import send_verification_email
+from impl.services.chat.create_chat_service import DEFAULT_CHAT_SETTINGS
 
 logger = logging.getLogger(__name__)
 
@@ -95,23 +98,35 @@ class RegisterService:
 
                 # Hash the user's password
                 logger.debug("Hashing password")
-                hashed_password = pwd_context.hash(password)
+                hashed_password = self.dependencies.password_hasher().hash(password)
                 logger.debug("Password hashed successfully")
 
-                # Add the new user to the database
-                logger.debug("Adding new user to the database")
-                user_id = user_repository.add_new_user(email, hashed_password)
-                logger.debug(f"User added successfully with ID: {user_id}")
-                self.new_user_id = user_id    
-
-                # Commit the user creation
-                session.commit()
+                # User, UserDetails and the default chat in one transaction,
+                # unless the user's chats go to another shard
+                logger.debug("Creating account")
+                chat_shards = self.dependencies.chat_shards()
+                shard = chat_shards.place_new_user()
+                user_id, chat_id = user_repository.create_account(
+                    email, hashed_password,
+                    chat_settings=dict(DEFAULT_CHAT_SETTINGS) if shard == 0 else None,
+                    shard=shard if chat_shards.is_sharded else None
+                )
+                if chat_id is None:
+                    chat_id = self._create_default_chat(chat_shards, user_id)
+                logger.debug(f"Account created with user ID {user_id} and chat ID {chat_id}")
+                self.new_user_id = user_id
+                self.new_chat_id = chat_id
+
+                # Mail goes out after the response, off the request path
+                self.dependencies.background_tasks().submit(
+                    send_verification_email, self.dependencies.mail_sender(), email
+                )
 
                 # Generate a JWT token for the new user
                 logger.debug(f"Generating JWT token for user_id: {user_id}")
                 access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
                 access_token = create_access_token(
-                    data={"sub": str(user_id)},
+                    data=token_claims(user_id),
                     expires_delta=access_token_expires
                 )
 
@@ -134,6 +149,18 @@ class RegisterService:
             logger.error(f"An unexpected error occurred: {e}\n{format_exc()}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
+    def _create_default_chat(self, chat_shards, user_id):
+        """The default chat on the user's own shard; the account stands even if this fails."""
+        session = chat_shards.session_for(user_id)
+        try:
+            chat_repository = self.dependencies.chat_repository(session=session)
+            return chat_repository.create_chat(user_id=user_id, settings=dict(DEFAULT_CHAT_SETTINGS)).id
+        except HTTPException:
+            logger.error(f"Could not create the default chat for user {user_id}")
+            return None
+        finally:
+            session.close()
+
     def process_request(self):
         # Prepare the response with the access token
         self.response = AuthRegisterPost200Response(
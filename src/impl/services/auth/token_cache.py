@@ -0,0 +1,100 @@
+# impl/services/auth/token_cache.py
+"""
+Cache of verified bearer tokens.
+
+Decoding and HMAC-verifying a JWT on every request is wasted work when the
+same token is presented thousands of times over its lifetime.  Once a token
+has been verified, its digest maps to its identity claims here, and later
+requests only need a dict lookup.  Revocation (token_revocation.py) is
+still checked on every request, against the claims returned here.
+
+An entry is honored only until the token's `exp`, and only while the
+revocation epochs it was cached under are still current: `revoke_all()`
+drops every entry, `revoke_user(sub)` drops one user's.  Raw tokens are
+never stored.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedToken(NamedTuple):
+    sub: str
+    jti: Optional[str]
+    token_epoch: int
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified token digests.
+
+    Args:
+        max_entries: tokens kept before the least recently used is evicted
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()   # digest -> (claims, exp, epoch, user_epoch)
+        self._epoch = 0
+        self._user_epochs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "revoked": 0, "evictions": 0}
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[CachedToken]:
+        """The token's claims if it was verified before and has not expired, else None."""
+        digest = self._digest(token)
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            claims, exp, epoch, user_epoch = entry
+            if now >= exp:
+                del self._entries[digest]
+                self._counters["expired"] += 1
+                return None
+            if epoch != self._epoch or user_epoch != self._user_epochs.get(claims.sub, 0):
+                del self._entries[digest]
+                self._counters["revoked"] += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._counters["hits"] += 1
+            return claims
+
+    def put(self, token: str, sub: str, exp: float, jti: Optional[str] = None, token_epoch: Optional[int] = 0):
+        digest = self._digest(token)
+        claims = CachedToken(str(sub), jti, int(token_epoch or 0))
+        with self._lock:
+            self._entries[digest] = (claims, float(exp), self._epoch, self._user_epochs.get(claims.sub, 0))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def revoke_user(self, sub: str):
+        """Forget every cached token of one user; they are verified in full next time."""
+        with self._lock:
+            sub = str(sub)
+            self._user_epochs[sub] = self._user_epochs.get(sub, 0) + 1
+
+    def revoke_all(self):
+        with self._lock:
+            self._epoch += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["expired"] + stats["revoked"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,230 @@
+# impl/services/auth/token_revocation.py
+"""
+Token revocation without a database read per request.
+
+Two mechanisms, both answered from memory:
+
+* Per-user epochs.  Every token carries the `tep` claim: the user's
+  `users.token_epoch` when it was issued.  "Log out everywhere" bumps
+  the epoch, which revokes every older token.  Only
+  users with a non-zero epoch are held in memory.
+
+* A Bloom filter of revoked `jti`s (single-token logout).  A token whose
+  jti is not in the filter was certainly never revoked.  A hit may be a
+  false positive, so it is confirmed against revoked_tokens; only those
+  rare tokens cost a query, and the answer is remembered until the next
+  refresh.
+
+Both are rebuilt from the database every `refresh_interval_seconds`, which
+is how revocations made by other processes arrive.  Revocations made in
+this process apply immediately.  Tokens issued before jtis existed can
+only be revoked through the epoch.
+"""
+import hashlib
+import logging
+import math
+import threading
+import uuid
+from datetime import datetime
+from traceback import format_exc
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def new_jti() -> str:
+    return uuid.uuid4().hex
+
+
+def token_claims(user_id: int, token_epoch: Optional[int] = 0) -> dict:
+    """Identity claims of a newly issued token; callers add `exp`."""
+    return {"sub": str(user_id), "jti": new_jti(), "tep": int(token_epoch or 0)}
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Args:
+        capacity: items it is sized for
+        error_rate: false-positive rate at `capacity` items
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocations:
+    """
+    Args:
+        session_factory: sessionmaker for the refreshes and false-positive checks
+        revocation_repository: TokenRevocationRepository provider
+        token_cache: VerifiedTokenCache to clear when a user's tokens are revoked
+        refresh_interval_seconds: how often revocations from other processes are picked up
+        capacity: revoked, unexpired tokens the filter is sized for (it grows past that on refresh)
+        error_rate: Bloom false-positive rate at capacity
+    """
+
+    def __init__(self, session_factory, revocation_repository, token_cache=None,
+                 refresh_interval_seconds: float = 30.0, capacity: int = 100000, error_rate: float = 0.001):
+        self.session_factory = session_factory
+        self.revocation_repository = revocation_repository
+        self.token_cache = token_cache
+        self.refresh_interval = refresh_interval_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._epochs: Dict[str, int] = {}
+        # jtis revoked here, kept until a refresh that saw them completes
+        self._local = set()
+        # Bloom hits already confirmed against the database, until the next refresh
+        self._checked: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._counters = {"epoch_revoked": 0, "bloom_hits": 0, "false_positives": 0, "jti_revoked": 0}
+
+    # ──────────────────────────────────────────────────────────────
+    # lifecycle
+    # ──────────────────────────────────────────────────────────────
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        # Load the current revocations before serving requests
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-revocations", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Token revocation refresh failed: {e}\n{format_exc()}")
+
+    def refresh(self):
+        """Rebuild the filter and the epochs from the database."""
+        with self._refresh_lock:
+            with self._lock:
+                seen_local = set(self._local)
+            now = datetime.utcnow()
+            session = self.session_factory()
+            try:
+                repository = self.revocation_repository(session=session)
+                repository.purge_expired(now)
+                jtis = list(repository.active_jtis(now))
+                epochs = repository.token_epochs()
+            finally:
+                session.close()
+
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            for jti in jtis:
+                bloom.add(jti)
+            with self._lock:
+                # Revocations made while the refresh ran may be missing from its reads
+                for jti in self._local:
+                    bloom.add(jti)
+                self._local -= seen_local
+                for sub, epoch in self._epochs.items():
+                    if epochs.get(sub, 0) < epoch:
+                        epochs[sub] = epoch
+                self._bloom, self._epochs, self._checked = bloom, epochs, {}
+            logger.debug(f"Token revocations refreshed: {len(jtis)} revoked tokens, {len(epochs)} user epochs")
+
+    # ──────────────────────────────────────────────────────────────
+    # checks
+    # ──────────────────────────────────────────────────────────────
+    def is_revoked(self, sub: str, jti: Optional[str], token_epoch: Optional[int]) -> bool:
+        sub = str(sub)
+        with self._lock:
+            if (token_epoch or 0) < self._epochs.get(sub, 0):
+                self._counters["epoch_revoked"] += 1
+                return True
+            if jti is None or jti not in self._bloom:
+                return False
+            self._counters["bloom_hits"] += 1
+            if jti in self._local:
+                self._counters["jti_revoked"] += 1
+                return True
+            checked = self._checked.get(jti)
+        if checked is None:
+            checked = self._confirm(jti)
+            with self._lock:
+                self._checked[jti] = checked
+        self._counters["jti_revoked" if checked else "false_positives"] += 1
+        return checked
+
+    def _confirm(self, jti: str) -> bool:
+        session = self.session_factory()
+        try:
+            return self.revocation_repository(session=session).is_jti_revoked(jti)
+        except Exception as e:
+            # Fail closed: a Bloom hit that cannot be cleared is treated as revoked
+            logger.error(f"Could not confirm token revocation: {e}")
+            return True
+        finally:
+            session.close()
+
+    # ──────────────────────────────────────────────────────────────
+    # revocation
+    # ──────────────────────────────────────────────────────────────
+    def revoke_token(self, sub: str, jti: str, expires_at: datetime):
+        """Revoke one token (logout)."""
+        session = self.session_factory()
+        try:
+            self.revocation_repository(session=session).revoke_jti(jti, int(sub), expires_at)
+        finally:
+            session.close()
+        with self._lock:
+            self._local.add(jti)
+            self._bloom.add(jti)
+            self._checked[jti] = True
+
+    def revoke_user(self, sub: str) -> Optional[int]:
+        """
+        Revoke every token of a user issued so far.  Call it only from flows that
+        authenticate the caller (or verify a single-use reset token).
+        """
+        sub = str(sub)
+        session = self.session_factory()
+        try:
+            epoch = self.revocation_repository(session=session).bump_token_epoch(int(sub))
+        finally:
+            session.close()
+        if epoch is None:
+            return None
+        with self._lock:
+            self._epochs[sub] = max(epoch, self._epochs.get(sub, 0))
+        if self.token_cache is not None:
+            self.token_cache.revoke_user(sub)
+        return epoch
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self._counters, user_epochs=len(self._epochs), filter_bits=self._bloom.size)
@@ -0,0 +1,62 @@
+# impl/services/auth/verification_mail.py
+"""
+Verification mail sent after registration.
+
+`send_verification_email` runs on the background task queue, so SMTP
+latency and outages never hold up (or fail) the registration request.
+
+Mail senders are pluggable.  `FileOutboxMailSender` (JSON lines on disk)
+is the local stand-in used until an SMTP or provider sender is wired in.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+import jwt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+ALGORITHM = "HS256"
+SECRET_KEY = os.getenv("SECRET_KEY")
+VERIFICATION_TOKEN_EXPIRE_HOURS = 48
+VERIFICATION_URL = os.getenv("EMAIL_VERIFICATION_URL", "http://127.0.0.1:3000/auth/verify-email")
+
+
+class MailSender:
+    def send(self, to: str, subject: str, body: str):
+        raise NotImplementedError
+
+
+class FileOutboxMailSender(MailSender):
+    """Appends mails as JSON lines to a local outbox file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def send(self, to: str, subject: str, body: str):
+        line = json.dumps({"to": to, "subject": subject, "body": body, "queued_at": datetime.utcnow().isoformat()})
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def create_verification_token(email: str) -> str:
+    expire = datetime.utcnow() + timedelta(hours=VERIFICATION_TOKEN_EXPIRE_HOURS)
+    return jwt.encode({"sub": email, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def send_verification_email(mail_sender: MailSender, email: str):
+    link = f"{VERIFICATION_URL}?token={create_verification_token(email)}"
+    mail_sender.send(
+        to=email,
+        subject="Email Verification",
+        body=f"Please verify your email by clicking the following link: {link}",
+    )
+    logger.debug(f"Verification email sent to {email}")
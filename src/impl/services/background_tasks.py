@@ -0,0 +1,105 @@
+# impl/services/background_tasks.py
+"""
+In-process queue for slow side effects of a request.
+
+Work that the response does not depend on (sending mail, warming caches)
+is submitted here and run by a small pool of worker threads after the
+request has returned.  Failed tasks are retried with a growing delay;
+`stop()` drains what is already queued before the workers exit.
+"""
+import logging
+import queue
+import threading
+import time
+from traceback import format_exc
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskQueue:
+    """
+    Args:
+        workers: worker threads
+        maxsize: queued tasks; submit() refuses beyond that
+        max_attempts: runs per task before it is dropped
+        retry_delay_seconds: delay before the first retry, doubled for each further one
+    """
+
+    def __init__(self, workers: int = 2, maxsize: int = 1000, max_attempts: int = 3,
+                 retry_delay_seconds: float = 1.0):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay_seconds
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._stop = threading.Event()
+        self._counters = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+
+    def start(self):
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"background-tasks-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Run what is queued, then stop the workers."""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def submit(self, fn, *args, **kwargs) -> bool:
+        """Queue fn(*args, **kwargs); returns False when the queue is full."""
+        try:
+            self._queue.put_nowait((fn, args, kwargs, 1))
+        except queue.Full:
+            self._counters["rejected"] += 1
+            logger.error(f"Background task queue is full; dropping {getattr(fn, '__name__', fn)}")
+            return False
+        self._counters["submitted"] += 1
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                fn, args, kwargs, attempt = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            try:
+                fn(*args, **kwargs)
+                self._counters["succeeded"] += 1
+            except Exception as e:
+                name = getattr(fn, "__name__", fn)
+                if attempt >= self.max_attempts or self._stop.is_set():
+                    self._counters["failed"] += 1
+                    logger.error(f"Background task {name} failed after {attempt} attempts: {e}\n{format_exc()}")
+                else:
+                    logger.warning(f"Background task {name} failed (attempt {attempt}), retrying: {e}")
+                    self._retry_later(fn, args, kwargs, attempt + 1)
+            finally:
+                self._queue.task_done()
+
+    def _retry_later(self, fn, args, kwargs, attempt: int):
+        delay = self.retry_delay * 2 ** (attempt - 2)
+        timer = threading.Timer(delay, self._requeue, (fn, args, kwargs, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def _requeue(self, fn, args, kwargs, attempt: int):
+        try:
+            self._queue.put_nowait((fn, args, kwargs, attempt))
+        except queue.Full:
+            self._counters["failed"] += 1
+            logger.error(f"Background task queue is full; dropping retry of {getattr(fn, '__name__', fn)}")
+
+    def metrics(self) -> dict:
+        return dict(self._counters, queued=self._queue.qsize())
@@ -63,7 +63,8 @@ class BringMessagesService:
     # ------------------------------------------------------------------ #
 
     def _get_session(self):
-        return self.dependencies.session_factory()()
+        # Read-only, on the user's chat shard: a replica unless the user wrote moments ago
+        return self.dependencies.chat_shards().read_session_for(self.user_id)
 
     # ------------------------------------------------------------------ #
     # Workflow
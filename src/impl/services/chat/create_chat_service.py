@@ -8,6 +8,11 @@ from models.chat_post201_response import ChatPost201Response  # adjust if the na
 
 logger = logging.getLogger(__name__)
 
+# Settings of a freshly created chat; registration creates the user's first chat with them too
+DEFAULT_CHAT_SETTINGS = {
+    "system_prompt": "You are a helpful assistant."
+}
+
 
 class CreateChatService:
     """
@@ -39,9 +44,9 @@ class CreateChatService:
     # helpers
     # ──────────────────────────────────────────────────────────────
     def _open_session(self):
-        """Return a fresh SQLAlchemy Session object."""
-        session_factory = self.dependencies.session_factory()
-        return session_factory()                      # type: sqlalchemy.orm.Session
+        """Return a fresh SQLAlchemy Session on the user's chat shard."""
+        chat_shards = self.dependencies.chat_shards()
+        return chat_shards.session_for(self.user_id)  # type: sqlalchemy.orm.Session
 
     # ──────────────────────────────────────────────────────────────
     # main workflow
@@ -57,15 +62,10 @@ class CreateChatService:
         try:
             chat_repo = chat_repo_provider(session=session)
 
-            # Default settings; tweak as necessary
-            default_settings = {
-                "system_prompt": "You are a helpful assistant."
-            }
-
             # Insert the new chat
             chat_row = chat_repo.create_chat(
                 user_id=self.user_id,
-                settings=default_settings
+                settings=dict(DEFAULT_CHAT_SETTINGS)
             )
 
             session.commit()
@@ -38,9 +38,9 @@ class DeleteChatService:
     # helpers
     # ──────────────────────────────────────────────────────────────
     def _open_session(self):
-        """Return a fresh SQLAlchemy Session object."""
-        session_factory = self.dependencies.session_factory()
-        return session_factory()                      # type: sqlalchemy.orm.Session
+        """Return a fresh SQLAlchemy Session on the user's chat shard."""
+        chat_shards = self.dependencies.chat_shards()
+        return chat_shards.session_for(self.user_id)  # type: sqlalchemy.orm.Session
 
     # ──────────────────────────────────────────────────────────────
     # main workflow
@@ -38,9 +38,9 @@ class ListChatsService:
     # helpers
     # ──────────────────────────────────────────────────────────────
     def _open_session(self):
-        """Return a fresh SQLAlchemy Session object."""
-        session_factory = self.dependencies.session_factory()
-        return session_factory()                      # type: sqlalchemy.orm.Session
+        """Return a read session on the user's chat shard (replica unless the user wrote moments ago)."""
+        chat_shards = self.dependencies.chat_shards()
+        return chat_shards.read_session_for(self.user_id)  # type: sqlalchemy.orm.Session
 
     # ──────────────────────────────────────────────────────────────
     # main workflow
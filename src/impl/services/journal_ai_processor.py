@@ -1,7 +1,10 @@
 # impl/services/journal_ai_processor.py
 import logging
+import threading
 from traceback import format_exc
 
+from db.models.journal import content_hash_of
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +26,14 @@ def process_journal_with_ai(entry_id: int, user_id: int, services):
             logger.error(f"Entry {entry_id} not found")
             return
         
+        # Nothing to do if the current insights were computed from this very content
+        content_hash = content_hash_of(entry.content)
+        if entry.processed and entry.analyzed_hash == content_hash:
+            logger.info(f"Entry {entry_id} unchanged since last analysis, skipping LLM call")
+            entry.processing_status = 'completed'
+            session.commit()
+            return
+        
         # Update status to processing
         entry.processing_status = 'processing'
         session.commit()
@@ -44,11 +55,14 @@ def process_journal_with_ai(entry_id: int, user_id: int, services):
         
         # Update entry with results
         entry.insights = insights
-        entry.tags = insights.get("tags", [])
+        # Tags live in journal_tags only; the legacy JSON column is not kept in sync
+        journal_repo.set_entry_tags(entry.id, user_id, insights.get("tags", []))
         entry.processed = True
         entry.processing_status = 'completed'
+        entry.analyzed_hash = content_hash
         
         session.commit()
+        services.journal_pattern_cache().invalidate(user_id)
         logger.info(f"Successfully processed entry {entry_id}")
         
     except Exception as e:
@@ -60,4 +74,61 @@ def process_journal_with_ai(entry_id: int, user_id: int, services):
         except:
             pass
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+def embed_journal_entry(entry_id: int, user_id: int, services):
+    """
+    Background task: (re)embed an entry's current content for similarity search.
+    Independent of the AI analysis, so unanalyzed and failed entries are indexed too.
+    """
+    session = services.session_factory()()
+    try:
+        entry = services.journal_repository(session=session).get_entry_by_id(entry_id, user_id)
+        if not entry:
+            logger.error(f"Entry {entry_id} not found")
+            return
+        services.journal_embedding_store().index_entry(user_id, entry.id, entry.content)
+    except Exception as e:
+        logger.error(f"Error embedding entry {entry_id}: {e}\n{format_exc()}")
+    finally:
+        session.close()
+
+
+class ReanalysisDebouncer:
+    """
+    Coalesces re-analysis requests per entry.
+
+    Every `schedule` call restarts the entry's timer, so a burst of edits
+    (e.g. an autosaving editor) results in a single `process_journal_with_ai`
+    run `delay_seconds` after the last edit.
+    """
+
+    def __init__(self, delay_seconds: float = 15.0):
+        self.delay_seconds = delay_seconds
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, entry_id: int, user_id: int, services):
+        with self._lock:
+            previous = self._timers.pop(entry_id, None)
+            if previous is not None:
+                previous.cancel()
+            timer = threading.Timer(self.delay_seconds, self._fire, args=(entry_id, user_id, services))
+            timer.daemon = True
+            self._timers[entry_id] = timer
+            timer.start()
+        logger.debug(f"Re-analysis of entry {entry_id} scheduled in {self.delay_seconds}s")
+
+    def cancel(self, entry_id: int):
+        with self._lock:
+            timer = self._timers.pop(entry_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _fire(self, entry_id: int, user_id: int, services):
+        with self._lock:
+            if self._timers.get(entry_id) is not threading.current_thread():
+                return  # superseded by a newer edit
+            del self._timers[entry_id]
+        process_journal_with_ai(entry_id=entry_id, user_id=user_id, services=services)
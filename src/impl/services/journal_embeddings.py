@@ -0,0 +1,325 @@
+# impl/services/journal_embeddings.py
+"""
+Embedding pipeline for semantic journal retrieval ("entries like this one").
+
+    Embedder          text -> float32 vector; `HashingEmbedder` is a
+                      deterministic local stand-in that needs no network.
+    VectorIndex       per-user vector storage + top-k search;
+                      `BruteForceVectorIndex` keeps a flat float32 file that
+                      is memory-mapped and scanned with one matrix product.
+    JournalEmbeddingStore
+                      ties both together and is exposed as a singleton in
+                      the DI container.  Swapping in an ANN index only means
+                      passing another `index_cls`.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not POSIX; one worker process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Share of removed rows at which a save rewrites the vectors file without them
+COMPACT_REMOVED_RATIO = 0.25
+
+
+# ──────────────────────────────────────────────────────────────
+# embedders
+# ──────────────────────────────────────────────────────────────
+class Embedder:
+    """Turns texts into L2-normalised float32 vectors of size `dimension`."""
+
+    dimension: int = 0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """
+    Signed feature hashing of word unigrams and bigrams.
+
+    Deterministic across processes and machines, so vectors written by one
+    worker are comparable with queries from another.
+    """
+
+    _token_re = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> Iterable[str]:
+        tokens = self._token_re.findall((text or "").lower())
+        yield from tokens
+        yield from (f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if digest & 1 else -1.0
+                vectors[row, (digest >> 1) % self.dimension] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+# ──────────────────────────────────────────────────────────────
+# indexes
+# ──────────────────────────────────────────────────────────────
+class VectorIndex:
+    """Storage + nearest-neighbour search for one user's vectors."""
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray):
+        raise NotImplementedError
+
+    def remove(self, ids: Sequence[int]):
+        raise NotImplementedError
+
+    def search(self, query: np.ndarray, k: int, exclude: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        raise NotImplementedError
+
+    def get(self, entry_id: int) -> Optional[np.ndarray]:
+        raise NotImplementedError
+
+
+class BruteForceVectorIndex(VectorIndex):
+    """
+    Flat on-disk index: `<name>.f32` holds rows of float32 and `<name>.ids.npy`
+    the matching entry ids (-1 marks a removed row).  Vectors are opened with
+    np.memmap, so only pages touched by the scan are read.
+
+    Several worker processes may share the files.  Writers hold an exclusive
+    flock on `<name>.lock` and reload the ids from disk before changing
+    anything, so they append after rows another process committed.  Readers
+    hold a shared flock while they reload and scan, so they never pair a
+    compacted vectors file with the previous ids.
+
+    Removed rows are dropped from disk once they make up
+    COMPACT_REMOVED_RATIO of the file: the kept vectors are written to a new
+    file that replaces the old one, then the ids are saved.
+    """
+
+    def __init__(self, path_prefix: str, dimension: int):
+        self.vectors_path = f"{path_prefix}.f32"
+        self.ids_path = f"{path_prefix}.ids.npy"
+        self.lock_path = f"{path_prefix}.lock"
+        self.dimension = dimension
+        self._ids_version = None
+        self._reload()
+
+    def _ids_file_version(self):
+        try:
+            stat = os.stat(self.ids_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _reload(self):
+        self._ids_version = self._ids_file_version()
+        self._ids = self._load_ids()
+        self._positions = {int(entry_id): row for row, entry_id in enumerate(self._ids) if entry_id >= 0}
+
+    def _refresh(self):
+        if self._ids_file_version() != self._ids_version:
+            self._reload()
+
+    @contextmanager
+    def _write_lock(self):
+        with self._file_lock(exclusive=True):
+            yield
+
+    @contextmanager
+    def _read_lock(self):
+        with self._file_lock(exclusive=False):
+            yield
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        with open(self.lock_path, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                # What other processes committed since we last looked
+                self._refresh()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_ids(self) -> np.ndarray:
+        if not os.path.exists(self.ids_path) or not os.path.exists(self.vectors_path):
+            return np.empty(0, dtype=np.int64)
+        ids = np.load(self.ids_path)
+        if os.path.getsize(self.vectors_path) < len(ids) * self.dimension * 4:
+            # Vectors written by an embedder of another size - start over
+            logger.warning(f"Discarding incompatible embedding index {self.vectors_path}")
+            return np.empty(0, dtype=np.int64)
+        return ids
+
+    def _save_ids(self):
+        tmp_path = f"{self.ids_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, self._ids)
+        os.replace(tmp_path, self.ids_path)
+        self._ids_version = self._ids_file_version()
+
+    def _matrix(self, mode: str = "r") -> Optional[np.memmap]:
+        if len(self._ids) == 0:
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(len(self._ids), self.dimension))
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray):
+        with self._write_lock():
+            self._upsert(ids, vectors)
+
+    def _upsert(self, ids: Sequence[int], vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        existing = [(row, self._positions[int(i)]) for row, i in enumerate(ids) if int(i) in self._positions]
+        new_rows = [row for row, i in enumerate(ids) if int(i) not in self._positions]
+
+        if existing:
+            matrix = self._matrix("r+")
+            for row, position in existing:
+                matrix[position] = vectors[row]
+            matrix.flush()
+            del matrix
+
+        if new_rows:
+            if len(self._ids) == 0:
+                open(self.vectors_path, "wb").close()
+            with open(self.vectors_path, "r+b") as f:
+                # Append after the last committed row, dropping any torn tail
+                f.truncate(len(self._ids) * self.dimension * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors[new_rows].tobytes())
+            start = len(self._ids)
+            self._ids = np.concatenate([self._ids, np.asarray([ids[row] for row in new_rows], dtype=np.int64)])
+            for offset, row in enumerate(new_rows):
+                self._positions[int(ids[row])] = start + offset
+
+        # ids are committed last, so a crash mid-write leaves the previous state readable
+        self._save_ids()
+
+    def remove(self, ids: Sequence[int]):
+        with self._write_lock():
+            positions = [self._positions.pop(int(i)) for i in ids if int(i) in self._positions]
+            if positions:
+                self._ids[positions] = -1
+                if np.count_nonzero(self._ids < 0) >= COMPACT_REMOVED_RATIO * len(self._ids):
+                    self._compact()
+                self._save_ids()
+
+    def _compact(self):
+        """Rewrite the vectors file with live rows only; the caller saves the ids."""
+        keep = np.flatnonzero(self._ids >= 0)
+        matrix = self._matrix()
+        tmp_path = f"{self.vectors_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(np.ascontiguousarray(matrix[keep]).tobytes())
+        del matrix
+        os.replace(tmp_path, self.vectors_path)
+        logger.debug(f"Compacted {self.vectors_path}: dropped {len(self._ids) - len(keep)} removed rows")
+        self._ids = self._ids[keep]
+        self._positions = {int(entry_id): row for row, entry_id in enumerate(self._ids)}
+
+    def get(self, entry_id: int) -> Optional[np.ndarray]:
+        with self._read_lock():
+            position = self._positions.get(int(entry_id))
+            if position is None:
+                return None
+            return np.array(self._matrix()[position])
+
+    def search(self, query: np.ndarray, k: int, exclude: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        with self._read_lock():
+            return self._search(query, k, exclude)
+
+    def _search(self, query: np.ndarray, k: int, exclude: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        matrix = self._matrix()
+        if matrix is None or k <= 0:
+            return []
+
+        scores = matrix @ np.asarray(query, dtype=np.float32)
+        valid = self._ids >= 0
+        if exclude:
+            valid &= ~np.isin(self._ids, np.fromiter(exclude, dtype=np.int64))
+        scores = np.where(valid, scores, -np.inf)
+
+        k = min(k, int(valid.sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self._ids[i]), float(scores[i])) for i in top]
+
+
+# ──────────────────────────────────────────────────────────────
+# store
+# ──────────────────────────────────────────────────────────────
+class JournalEmbeddingStore:
+    """Per-user embedding indexes for journal entries."""
+
+    def __init__(self, base_dir: str, embedder: Embedder, index_cls=BruteForceVectorIndex, max_open: int = 256):
+        self.base_dir = base_dir
+        self.embedder = embedder
+        self.index_cls = index_cls
+        self.max_open = max_open
+        self._indexes: Dict[int, VectorIndex] = {}
+        self._locks: Dict[int, threading.Lock] = {}
+        self._guard = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def _lock_for(self, user_id: int) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    def _index_for(self, user_id: int) -> VectorIndex:
+        # The dict is shared by all users' threads; the per-user lock only covers the index itself
+        with self._guard:
+            index = self._indexes.get(user_id)
+            if index is None:
+                if len(self._indexes) >= self.max_open:
+                    self._indexes.pop(next(iter(self._indexes)))
+                prefix = os.path.join(self.base_dir, f"user_{user_id}")
+                index = self.index_cls(prefix, self.embedder.dimension)
+                self._indexes[user_id] = index
+            return index
+
+    def index_entry(self, user_id: int, entry_id: int, content: str):
+        """Embed one entry and store (or overwrite) its vector."""
+        vector = self.embedder.embed([content])
+        with self._lock_for(user_id):
+            self._index_for(user_id).upsert([entry_id], vector)
+
+    def remove_entry(self, user_id: int, entry_id: int):
+        with self._lock_for(user_id):
+            self._index_for(user_id).remove([entry_id])
+
+    def similar_to_entry(self, user_id: int, entry_id: int, k: int = 5,
+                         fallback_text: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Top-k (entry_id, score) neighbours of an entry, excluding itself."""
+        with self._lock_for(user_id):
+            index = self._index_for(user_id)
+            query = index.get(entry_id)
+            if query is None:
+                if fallback_text is None:
+                    return []
+                query = self.embedder.embed([fallback_text])[0]
+            return index.search(query, k, exclude=[entry_id])
+
+    def similar_to_text(self, user_id: int, text: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top-k (entry_id, score) entries related to free text, e.g. a chat message."""
+        query = self.embedder.embed([text])[0]
+        with self._lock_for(user_id):
+            return self._index_for(user_id).search(query, k)
@@ -0,0 +1,298 @@
+# impl/services/journal_patterns.py
+"""
+Pattern analysis behind GET /journal/patterns.
+
+The engine works on a compact columnar extract of a user's journal
+(entry id, created_at, mood and the journal_tags rows) and computes every
+aggregate with pandas / NumPy, so no ORM objects are touched.  Results are
+cached per user in `JournalPatternCache` and dropped whenever the user's
+journal changes.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Mood values arrive either as the spec's words or as the app's emojis
+MOOD_SCORES = {
+    "great": 5, "good": 4, "okay": 3, "mixed": 3, "low": 2,
+    "🤩": 5, "🎉": 5, "😄": 5, "😁": 5,
+    "😊": 4, "🙂": 4, "😌": 4,
+    "😐": 3, "🤔": 3,
+    "😕": 2, "😔": 2, "😟": 2,
+    "😢": 1, "😞": 1, "😭": 1, "😡": 1,
+}
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Hour of day -> period label, indexed by the local hour
+DAY_PERIODS = np.array(
+    ["night"] * 5 + ["morning"] * 7 + ["afternoon"] * 5 + ["evening"] * 4 + ["night"] * 3
+)
+
+MAX_THEMES = 20               # themes considered for co-occurrence
+BREAKTHROUGH_WINDOW = 5       # entries in the rolling mood baseline
+BREAKTHROUGH_LIFT = 1.5       # mood points above the baseline
+TREND_THRESHOLD = 0.1         # mood points per week to call a trend
+
+
+class JournalPatternEngine:
+    """
+    Computes recurring themes, emotional patterns and breakthrough moments
+    from column data.
+
+    Args:
+        entry_rows: (id, created_at, mood) tuples, created_at in UTC
+        tag_rows: (entry_id, tag) tuples
+        tz: tzinfo used for weekday / time-of-day grouping
+        today: reference date for the current streak (defaults to today in `tz`)
+    """
+
+    def __init__(self, entry_rows: Sequence[Tuple], tag_rows: Sequence[Tuple], tz=timezone.utc, today=None):
+        self.entries = pd.DataFrame(list(entry_rows), columns=["id", "created_at", "mood"])
+        self.tags = pd.DataFrame(list(tag_rows), columns=["entry_id", "tag"])
+        self.tz = tz
+        self.today = today or datetime.now(tz).date()
+
+        if not self.entries.empty:
+            local = pd.to_datetime(self.entries["created_at"]).dt.tz_localize("UTC").dt.tz_convert(tz)
+            self.entries["local"] = local
+            self.entries["score"] = self.entries["mood"].map(MOOD_SCORES).astype("float64")
+            self.entries.sort_values("local", inplace=True, kind="stable")
+            self.entries.reset_index(drop=True, inplace=True)
+
+    # ──────────────────────────────────────────────────────────────
+    # public API
+    # ──────────────────────────────────────────────────────────────
+    def compute(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self.entries.empty:
+            return {"recurringThemes": [], "emotionalPatterns": [], "breakthroughMoments": []}
+
+        return {
+            "recurringThemes": self._recurring_themes(),
+            "emotionalPatterns": [
+                self._mood_trajectory(),
+                self._weekday_effect(),
+                self._time_of_day_effect(),
+                self._streaks(),
+            ],
+            "breakthroughMoments": self._breakthrough_moments(),
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    # themes
+    # ──────────────────────────────────────────────────────────────
+    def _recurring_themes(self) -> List[Dict[str, Any]]:
+        tags = self.tags[self.tags["entry_id"].isin(self.entries["id"])]
+        if tags.empty:
+            return []
+
+        counts = tags["tag"].value_counts()
+        top = counts.index[:MAX_THEMES]
+        tags = tags[tags["tag"].isin(top)]
+
+        # entries x themes incidence matrix -> theme x theme co-occurrence counts
+        incidence = pd.crosstab(tags["entry_id"], tags["tag"]).clip(upper=1)
+        incidence = incidence.reindex(columns=top, fill_value=0)
+        matrix = incidence.to_numpy(dtype=np.int32)
+        co_occurrence = matrix.T @ matrix
+        np.fill_diagonal(co_occurrence, 0)
+
+        last_seen = (
+            tags.merge(self.entries[["id", "local"]], left_on="entry_id", right_on="id")
+            .groupby("tag")["local"].max()
+        )
+        total_entries = len(self.entries)
+
+        themes = []
+        for i, tag in enumerate(top):
+            partners = np.argsort(-co_occurrence[i], kind="stable")[:3]
+            themes.append({
+                "theme": tag,
+                "count": int(counts[tag]),
+                "share": round(float(counts[tag]) / total_entries, 3),
+                "lastSeen": last_seen[tag].isoformat(),
+                "coOccursWith": [
+                    {"theme": top[j], "count": int(co_occurrence[i, j])}
+                    for j in partners if co_occurrence[i, j] > 0
+                ],
+            })
+        return themes
+
+    # ──────────────────────────────────────────────────────────────
+    # mood
+    # ──────────────────────────────────────────────────────────────
+    def _scored(self) -> pd.DataFrame:
+        return self.entries[self.entries["score"].notna()]
+
+    def _mood_trajectory(self) -> Dict[str, Any]:
+        scored = self._scored()
+        if scored.empty:
+            return {"type": "moodTrajectory", "points": [], "trend": 0.0, "direction": "stable"}
+
+        day = scored["local"].dt.tz_localize(None).dt.normalize()
+        week_start = day - pd.to_timedelta(day.dt.dayofweek, unit="D")
+        weekly = scored.groupby(week_start)["score"].agg(["mean", "count"])
+
+        trend = 0.0
+        if len(weekly) >= 2:
+            weeks = ((weekly.index - weekly.index[0]).days / 7.0).to_numpy()
+            trend = float(np.polyfit(weeks, weekly["mean"].to_numpy(), 1)[0])
+        direction = "stable"
+        if trend >= TREND_THRESHOLD:
+            direction = "improving"
+        elif trend <= -TREND_THRESHOLD:
+            direction = "declining"
+
+        return {
+            "type": "moodTrajectory",
+            "points": [
+                {"week": week.date().isoformat(), "averageMood": round(float(row["mean"]), 2), "entries": int(row["count"])}
+                for week, row in weekly.iterrows()
+            ],
+            "trend": round(trend, 3),
+            "direction": direction,
+        }
+
+    def _grouped_effect(self, kind: str, key: pd.Series, label_key: str, order: List[str]) -> Dict[str, Any]:
+        scored = self._scored()
+        stats = scored.groupby(key.loc[scored.index])["score"].agg(["mean", "count"])
+        stats = stats.reindex([label for label in order if label in stats.index])
+        values = [
+            {label_key: label, "averageMood": round(float(row["mean"]), 2), "entries": int(row["count"])}
+            for label, row in stats.iterrows()
+        ]
+        effect = {"type": kind, "values": values, "best": None, "worst": None}
+        if len(stats) >= 2:
+            effect["best"] = stats["mean"].idxmax()
+            effect["worst"] = stats["mean"].idxmin()
+        return effect
+
+    def _weekday_effect(self) -> Dict[str, Any]:
+        weekday = pd.Series(np.array(WEEKDAYS)[self.entries["local"].dt.dayofweek.to_numpy()], index=self.entries.index)
+        return self._grouped_effect("weekdayEffect", weekday, "weekday", WEEKDAYS)
+
+    def _time_of_day_effect(self) -> Dict[str, Any]:
+        period = pd.Series(DAY_PERIODS[self.entries["local"].dt.hour.to_numpy()], index=self.entries.index)
+        return self._grouped_effect("timeOfDayEffect", period, "period", ["morning", "afternoon", "evening", "night"])
+
+    # ──────────────────────────────────────────────────────────────
+    # streaks
+    # ──────────────────────────────────────────────────────────────
+    def _streaks(self) -> Dict[str, Any]:
+        days = np.unique(self.entries["local"].dt.tz_localize(None).to_numpy().astype("datetime64[D]"))
+        gaps = np.diff(days).astype(np.int64)
+
+        # A streak ends wherever consecutive journaling days are more than one day apart
+        break_at = np.flatnonzero(gaps > 1)
+        starts = np.concatenate(([0], break_at + 1))
+        ends = np.concatenate((break_at, [len(days) - 1]))
+        lengths = ends - starts + 1
+
+        today = np.datetime64(self.today, "D")
+        current = int(lengths[-1]) if (today - days[-1]).astype(np.int64) <= 1 else 0
+
+        breaks = [
+            {
+                "streakEnd": str(days[ends[i]]),
+                "streakLength": int(lengths[i]),
+                "gapDays": int(gaps[ends[i]] - 1),
+            }
+            for i in range(len(break_at)) if lengths[i] >= 2
+        ]
+        return {
+            "type": "streakBreaks",
+            "currentStreak": current,
+            "longestStreak": int(lengths.max()),
+            "breaks": breaks[-10:],
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    # breakthroughs
+    # ──────────────────────────────────────────────────────────────
+    def _breakthrough_moments(self) -> List[Dict[str, Any]]:
+        scored = self._scored()
+        baseline = scored["score"].shift(1).rolling(BREAKTHROUGH_WINDOW, min_periods=2).mean()
+        lift = scored["score"] - baseline
+        hits = scored[lift >= BREAKTHROUGH_LIFT]
+        return [
+            {
+                "entryId": str(row.id),
+                "timestamp": row.local.isoformat(),
+                "mood": row.mood,
+                "lift": round(float(lift[index]), 2),
+            }
+            for index, row in zip(hits.index, hits.itertuples(index=False))
+        ]
+
+
+class JournalPatternCache:
+    """
+    Per-user cache of computed patterns.
+
+    Each user has a generation number that `invalidate` moves forward; a
+    result is only stored if the generation it was computed against is still
+    current, so a write that lands during a computation is never masked.
+
+    Generations and results share one LRU of `max_users` users.  Generations
+    come from a single counter, and a user without an entry reads the value
+    of that counter at the last eviction, so evicting a user can never let a
+    computation that started before the eviction store its result.
+
+    The cache lives in one process.  An invalidation only reaches the worker
+    that handled the write; other workers keep serving their cached patterns
+    until they evict them, so run one worker or accept that staleness.
+    """
+
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        # user_id -> (generation, {key: result})
+        self._entries: "OrderedDict[int, Tuple[int, Dict[Any, Any]]]" = OrderedDict()
+        self._clock = 0
+        self._evicted_at = 0
+
+    def _evict(self):
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+            self._evicted_at = self._clock
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            return entry[0] if entry is not None else self._evicted_at
+
+    def get(self, user_id: int, key=None):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or key not in entry[1]:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1][key]
+
+    def put(self, user_id: int, generation: int, value, key=None):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                if generation != self._evicted_at:
+                    return
+                entry = self._entries[user_id] = (generation, {})
+            elif entry[0] != generation:
+                return
+            entry[1][key] = value
+            self._entries.move_to_end(user_id)
+            self._evict()
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._clock += 1
+            self._entries[user_id] = (self._clock, {})
+            self._entries.move_to_end(user_id)
+            self._evict()
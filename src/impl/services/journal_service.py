@@ -2,13 +2,14 @@
 # Copy this content to replace the existing journal_service.py
 
 import logging
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from traceback import format_exc
 from fastapi import HTTPException
 
 from models.journal.journal_entry import JournalEntry
 from models.journal.get_entries_response import GetEntriesResponse
 from models.journal.journal_entry_preview import JournalEntryPreview
+from db.models.journal import flatten_insights
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,10 @@ class JournalService:
         session_factory = self.dependencies.session_factory()
         return session_factory()
     
+    def _open_read_session(self, user_id: int):
+        """Session for read-only calls: a replica unless the user wrote moments ago."""
+        return self.dependencies.session_factory().for_read(user_id)
+    
     def create_entry(self, content: str, mood: str, user_id: int, timestamp: datetime = None, 
                      auto_process: bool = True, background_tasks=None, services=None):
         """Create a new journal entry"""
@@ -47,6 +52,8 @@ class JournalService:
             )
             
             session.commit()
+            self._invalidate_user_caches(user_id)
+            self._queue_embedding(entry.id, user_id, background_tasks)
             logger.debug(f"Journal entry created (id={entry.id})")
             
             # Automatically trigger AI processing if requested
@@ -69,27 +76,14 @@ class JournalService:
                 logger.info(f"NOT auto-processing: auto_process={auto_process}, has_background_tasks={background_tasks is not None}, has_services={services is not None}")
             
             # Convert to response model
-            # Handle insights - if it's a dict (from AI processing), extract relevant values
-            insights_list = []
-            if entry.insights:
-                if isinstance(entry.insights, dict):
-                    # Extract key insights from the AI-generated dict
-                    if 'emotionalState' in entry.insights:
-                        insights_list.append(f"Emotional state: {entry.insights['emotionalState']}")
-                    if 'themes' in entry.insights:
-                        for theme in entry.insights['themes']:
-                            insights_list.append(f"Theme: {theme}")
-                elif isinstance(entry.insights, list):
-                    insights_list = entry.insights
-            
             return JournalEntry(
                 id=str(entry.id),
                 userId=str(entry.user_id),
                 content=entry.content,
                 mood=entry.mood,
                 timestamp=entry.created_at,
-                tags=entry.tags,
-                insights=insights_list,
+                tags=[],
+                insights=flatten_insights(entry.insights),
                 suggestionsAvailable=bool(entry.processed and entry.insights),
                 processed=entry.processed,
                 processingStatus=entry.processing_status
@@ -103,56 +97,53 @@ class JournalService:
             session.close()
     
     def get_entries(self, user_id: int, filter: str = None, limit: int = 20, 
-                    offset: int = 0, search: str = None):
+                    offset: int = 0, search: str = None, include_total: bool = True):
         """Get journal entries with filtering"""
         logger.debug(f"Getting journal entries for user_id={user_id}")
         
         journal_repo_provider = self.dependencies.journal_repository
-        session = self._open_session()
+        session = self._open_read_session(user_id)
         
         try:
             journal_repo = journal_repo_provider(session=session)
             
-            # Get entries from repository
-            entries, total = journal_repo.get_entries(
+            # Get preview rows from repository (no full content / insights)
+            rows, has_more = journal_repo.get_entry_previews(
                 user_id=user_id,
                 limit=limit,
                 offset=offset
             )
             
+            # The total is only counted when it can't be derived from the probe.
+            # An empty page past offset 0 says nothing about how many rows precede it.
+            total = None
+            if not has_more and (rows or offset == 0):
+                total = offset + len(rows)
+            elif include_total or not has_more:
+                total = journal_repo.count_entries(user_id)
+            
+            tags_by_entry = journal_repo.get_tags_for_entries(user_id, [row.id for row in rows])
+            
             # Convert to preview models
-            entry_previews = []
-            for entry in entries:
-                # Handle insights - if it's a dict (from AI processing), extract relevant values
-                insights_list = []
-                if entry.insights:
-                    if isinstance(entry.insights, dict):
-                        # Extract key insights from the AI-generated dict
-                        if 'emotionalState' in entry.insights:
-                            insights_list.append(f"Emotional state: {entry.insights['emotionalState']}")
-                        if 'themes' in entry.insights:
-                            for theme in entry.insights['themes']:
-                                insights_list.append(f"Theme: {theme}")
-                    elif isinstance(entry.insights, list):
-                        insights_list = entry.insights
-                
-                preview = JournalEntryPreview(
-                    id=str(entry.id),
-                    content=entry.content[:200] if len(entry.content) > 200 else entry.content,
-                    mood=entry.mood,
-                    timestamp=entry.created_at,
-                    tags=entry.tags,
-                    insights=insights_list,
+            entry_previews = [
+                JournalEntryPreview(
+                    id=str(row.id),
+                    content=row.preview,
+                    mood=row.mood,
+                    timestamp=row.created_at,
+                    tags=tags_by_entry[row.id],
+                    insights=row.insights_flat or [],
                     hasAffirmation=False,
                     hasScript=False
                 )
-                entry_previews.append(preview)
+                for row in rows
+            ]
             
             # Build response
             return GetEntriesResponse(
                 entries=entry_previews,
                 total=total,
-                hasMore=(offset + limit) < total
+                hasMore=has_more
             )
             
         except Exception as e:
@@ -166,7 +157,7 @@ class JournalService:
         logger.debug(f"Getting journal entry id={entry_id} for user_id={user_id}")
         
         journal_repo_provider = self.dependencies.journal_repository
-        session = self._open_session()
+        session = self._open_read_session(user_id)
         
         try:
             journal_repo = journal_repo_provider(session=session)
@@ -181,27 +172,14 @@ class JournalService:
                 raise HTTPException(status_code=404, detail="Journal entry not found")
             
             # Convert to response model
-            # Handle insights - if it's a dict (from AI processing), extract relevant values
-            insights_list = []
-            if entry.insights:
-                if isinstance(entry.insights, dict):
-                    # Extract key insights from the AI-generated dict
-                    if 'emotionalState' in entry.insights:
-                        insights_list.append(f"Emotional state: {entry.insights['emotionalState']}")
-                    if 'themes' in entry.insights:
-                        for theme in entry.insights['themes']:
-                            insights_list.append(f"Theme: {theme}")
-                elif isinstance(entry.insights, list):
-                    insights_list = entry.insights
-            
             return JournalEntry(
                 id=str(entry.id),
                 userId=str(entry.user_id),
                 content=entry.content,
                 mood=entry.mood,
                 timestamp=entry.created_at,
-                tags=entry.tags,
-                insights=insights_list,
+                tags=journal_repo.get_tags_for_entries(user_id, [entry.id])[entry.id],
+                insights=flatten_insights(entry.insights),
                 suggestionsAvailable=bool(entry.processed and entry.insights),
                 processed=entry.processed,
                 processingStatus=entry.processing_status
@@ -264,7 +242,7 @@ class JournalService:
                 insights={
                     "status": entry.processing_status,
                     "message": status_message,
-                    "tags": entry.tags if entry.processed else [],
+                    "tags": journal_repo.get_tags_for_entries(user_id, [entry.id])[entry.id] if entry.processed else [],
                     "emotionalState": entry.insights.get("emotionalState") if entry.processed and isinstance(entry.insights, dict) else None,
                     "themes": entry.insights.get("themes", []) if entry.processed and isinstance(entry.insights, dict) else [],
                     "suggestedActions": entry.insights.get("suggestedActions", []) if entry.processed and isinstance(entry.insights, dict) else []
@@ -280,7 +258,7 @@ class JournalService:
         finally:
             session.close()
     
-    def update_entry(self, entry_id: int, content: str, mood: str, user_id: int):
+    def update_entry(self, entry_id: int, content: str, mood: str, user_id: int, background_tasks=None):
         """Update a journal entry"""
         logger.debug(f"Updating journal entry id={entry_id} for user_id={user_id}")
         
@@ -301,14 +279,24 @@ class JournalService:
             if not entry:
                 raise HTTPException(status_code=404, detail="Journal entry not found")
             
-            # Reset processing status since content changed
-            entry.processed = False
-            entry.processing_status = 'pending'
-            entry.insights = []
-            entry.tags = []
+            # Insights stay until a re-analysis replaces them. Only content that differs
+            # (after normalization) from what was analyzed triggers one, debounced so a
+            # burst of autosaves costs a single LLM call.
+            needs_reanalysis = (
+                (entry.processed or entry.processing_status == 'processing')
+                and entry.content_hash != entry.analyzed_hash
+            )
+            if needs_reanalysis:
+                entry.processing_status = 'pending'
             
             session.commit()
-            logger.debug(f"Journal entry updated (id={entry.id})")
+            self._invalidate_user_caches(user_id)
+            if content is not None:
+                self._queue_embedding(entry.id, user_id, background_tasks)
+            logger.debug(f"Journal entry updated (id={entry.id}), reanalysis={needs_reanalysis}")
+            
+            if needs_reanalysis:
+                self.dependencies.journal_reanalysis_debouncer().schedule(entry.id, user_id, self.dependencies)
             
             # Convert to response model
             return JournalEntry(
@@ -317,9 +305,9 @@ class JournalService:
                 content=entry.content,
                 mood=entry.mood,
                 timestamp=entry.created_at,
-                tags=entry.tags,
-                insights=[],
-                suggestionsAvailable=False,
+                tags=journal_repo.get_tags_for_entries(user_id, [entry.id])[entry.id],
+                insights=flatten_insights(entry.insights),
+                suggestionsAvailable=bool(entry.processed and entry.insights),
                 processed=entry.processed,
                 processingStatus=entry.processing_status
             )
@@ -353,6 +341,13 @@ class JournalService:
                 raise HTTPException(status_code=404, detail="Journal entry not found")
             
             session.commit()
+            self._invalidate_user_caches(user_id)
+            self.dependencies.journal_reanalysis_debouncer().cancel(int(entry_id))
+            # The entry is already deleted; a stale vector only costs a filtered search hit
+            try:
+                self.dependencies.journal_embedding_store().remove_entry(user_id, int(entry_id))
+            except Exception as e:
+                logger.error(f"Error removing embedding of journal entry {entry_id}: {e}\n{format_exc()}")
             logger.debug(f"Journal entry deleted (id={entry_id})")
             
             # Return response
@@ -458,13 +453,198 @@ class JournalService:
         raise HTTPException(status_code=501, detail="Not implemented")
     
     def search_entries(self, query: str, mood: str, tags: list, date_from, date_to, limit: int, user_id: int):
-        raise HTTPException(status_code=501, detail="Not implemented")
+        """Search journal entries by content, mood, tags and date range"""
+        logger.debug(f"Searching journal entries for user_id={user_id}, query={query}, tags={tags}")
+        
+        journal_repo_provider = self.dependencies.journal_repository
+        session = self._open_read_session(user_id)
+        
+        try:
+            journal_repo = journal_repo_provider(session=session)
+            
+            # Dates are inclusive on both ends
+            if date_from:
+                date_from = datetime.combine(date_from, time.min)
+            if date_to:
+                date_to = datetime.combine(date_to, time.min) + timedelta(days=1)
+            
+            entries, total = journal_repo.search_entries(
+                user_id=user_id,
+                query=query,
+                mood=mood,
+                tags=tags,
+                date_from=date_from,
+                date_to=date_to,
+                limit=limit or 20
+            )
+            
+            from models.journal.search_results import SearchResults, SearchResult
+            needle = (query or "").lower()
+            results = []
+            for entry in entries:
+                results.append(SearchResult(
+                    id=str(entry.id),
+                    content=entry.content[:200] if len(entry.content) > 200 else entry.content,
+                    mood=entry.mood,
+                    timestamp=entry.created_at,
+                    relevanceScore=float(entry.content.lower().count(needle)) if needle else 1.0
+                ))
+            
+            return SearchResults(results=results, total=total)
+            
+        except Exception as e:
+            logger.error(f"Error searching journal entries: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Unable to search journal entries")
+        finally:
+            session.close()
     
-    def get_patterns(self, user_id: int):
-        raise HTTPException(status_code=501, detail="Not implemented")
+    def get_similar_entries(self, entry_id: int, user_id: int, limit: int = 5):
+        """Find the user's entries semantically closest to a given entry"""
+        logger.debug(f"Getting entries similar to id={entry_id} for user_id={user_id}")
+        
+        journal_repo_provider = self.dependencies.journal_repository
+        session = self._open_session()
+        
+        try:
+            journal_repo = journal_repo_provider(session=session)
+            
+            entry = journal_repo.get_entry_by_id(
+                entry_id=int(entry_id),
+                user_id=user_id
+            )
+            
+            if not entry:
+                raise HTTPException(status_code=404, detail="Journal entry not found")
+            
+            # Entries not embedded yet are queried by their text
+            neighbours = self.dependencies.journal_embedding_store().similar_to_entry(
+                user_id, entry.id, k=limit, fallback_text=entry.content
+            )
+            scores = dict(neighbours)
+            entries = journal_repo.get_entries_by_ids(user_id, [neighbour_id for neighbour_id, _ in neighbours])
+            
+            from models.journal.search_results import SearchResults, SearchResult
+            results = [
+                SearchResult(
+                    id=str(similar.id),
+                    content=similar.content[:200] if len(similar.content) > 200 else similar.content,
+                    mood=similar.mood,
+                    timestamp=similar.created_at,
+                    relevanceScore=round(scores[similar.id], 4)
+                )
+                for similar in entries
+            ]
+            
+            return SearchResults(results=results, total=len(results))
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting similar journal entries: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Unable to get similar journal entries")
+        finally:
+            session.close()
+    
+    def get_patterns(self, user_id: int, tags: list = None):
+        """Get mood / theme patterns, served from the per-user cache when fresh"""
+        logger.debug(f"Getting journal patterns for user_id={user_id}, tags={tags}")
+        
+        from impl.services.journal_patterns import JournalPatternEngine
+        from impl.services.timezones import resolve_timezone
+        from models.journal.journal_patterns import JournalPatterns
+        
+        cache = self.dependencies.journal_pattern_cache()
+        cache_key = tuple(sorted(tags)) if tags else None
+        cached = cache.get(user_id, cache_key)
+        if cached is not None:
+            logger.debug(f"Journal patterns cache hit for user_id={user_id}")
+            return JournalPatterns(**cached)
+        generation = cache.generation(user_id)
+        
+        journal_repo_provider = self.dependencies.journal_repository
+        session = self._open_session()
+        
+        try:
+            journal_repo = journal_repo_provider(session=session)
+            entry_rows, tag_rows = journal_repo.get_pattern_extract(user_id, tags=tags)
+            
+            from db.models.user_details import UserDetails
+            timezone_name = session.query(UserDetails.timezone).filter_by(user_id=user_id).scalar()
+        except Exception as e:
+            logger.error(f"Error loading journal patterns data: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Unable to get journal patterns")
+        finally:
+            session.close()
+        
+        try:
+            patterns = JournalPatternEngine(entry_rows, tag_rows, tz=resolve_timezone(timezone_name)).compute()
+        except Exception as e:
+            logger.error(f"Error computing journal patterns: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Unable to get journal patterns")
+        
+        cache.put(user_id, generation, patterns, cache_key)
+        return JournalPatterns(**patterns)
+    
+    def _queue_embedding(self, entry_id: int, user_id: int, background_tasks=None):
+        """Embed the entry after the response, or right away when there are no background tasks."""
+        from impl.services.journal_ai_processor import embed_journal_entry
+        if background_tasks is not None:
+            background_tasks.add_task(embed_journal_entry, entry_id=entry_id, user_id=user_id, services=self.dependencies)
+        else:
+            embed_journal_entry(entry_id=entry_id, user_id=user_id, services=self.dependencies)
+    
+    def _invalidate_user_caches(self, user_id: int):
+        """Drop cached per-user aggregates after the journal changed"""
+        self.dependencies.journal_pattern_cache().invalidate(user_id)
     
     def export_entries(self, format: str, date_from, date_to, user_id: int):
         raise HTTPException(status_code=501, detail="Not implemented")
     
     def batch_tag_management(self, action: str, entry_ids: list, tags: list, user_id: int):
-        raise HTTPException(status_code=501, detail="Not implemented")
\ No newline at end of file
+        """Add, remove or replace tags on many entries with set-based statements"""
+        logger.debug(f"Batch tag '{action}' on {len(entry_ids or [])} entries for user_id={user_id}")
+        
+        if action not in ('add', 'remove', 'replace'):
+            raise HTTPException(status_code=400, detail="Action must be one of add, remove, replace")
+        try:
+            ids = [int(entry_id) for entry_id in entry_ids or []]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Entry IDs must be numeric")
+        
+        journal_repo_provider = self.dependencies.journal_repository
+        session = self._open_session()
+        
+        try:
+            journal_repo = journal_repo_provider(session=session)
+            
+            owned_ids = journal_repo.get_owned_entry_ids(user_id, ids)
+            if action == 'add':
+                journal_repo.add_tags(user_id, owned_ids, tags)
+            elif action == 'remove':
+                journal_repo.remove_tags(user_id, owned_ids, tags)
+            else:
+                journal_repo.replace_tags(user_id, owned_ids, tags)
+            
+            session.commit()
+            self._invalidate_user_caches(user_id)
+            logger.debug(f"Batch tag '{action}' applied to {len(owned_ids)} entries")
+            
+            tags_by_entry = journal_repo.get_tags_for_entries(user_id, owned_ids)
+            
+            from models.journal.batch_tag_response import BatchTagResponse
+            return BatchTagResponse(
+                updated=len(owned_ids),
+                entries=[
+                    JournalEntryPreview(id=str(entry_id), tags=tags_by_entry[entry_id])
+                    for entry_id in owned_ids
+                ]
+            )
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error managing tags: {e}\n{format_exc()}")
+            raise HTTPException(status_code=500, detail="Unable to update tags")
+        finally:
+            session.close()
\ No newline at end of file
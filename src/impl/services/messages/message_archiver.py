@@ -0,0 +1,126 @@
+# impl/services/messages/message_archiver.py
+"""
+Cold-storage archival of old chat messages.
+
+Every `interval_seconds` the worker sweeps each chat shard for chats
+with at least `min_messages` messages older than `archive_after_days`.
+It moves those messages into compressed per-chat segments
+(`MessageRepository.archive_messages`), one transaction per chat, which
+keeps the hot `messages` table and its indexes small.  Reads are
+unaffected: `MessageRepository.fetch_messages` reads through to the
+segments.
+
+Chats whose owner is being moved between shards, or whose rows are a
+leftover copy on a shard the user no longer maps to, are skipped.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from traceback import format_exc
+from typing import Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+class MessageArchiver:
+    """
+    Args:
+        chat_shards: ShardMap; every shard is swept
+        message_repository: factory called as `message_repository(session=...)`
+        archive_after_days: messages older than this go to cold storage
+        interval_seconds: pause between sweeps
+        segment_size: messages per compressed segment
+        min_messages: a chat is archived once this many of its messages are old
+        chats_per_sweep: chats archived per shard and sweep at most
+    """
+
+    def __init__(self, chat_shards, message_repository, archive_after_days: float = 90.0,
+                 interval_seconds: float = 3600.0, segment_size: int = 500,
+                 min_messages: int = 100, chats_per_sweep: int = 1000):
+        self.chat_shards = chat_shards
+        self.message_repository = message_repository
+        self.archive_after = timedelta(days=archive_after_days)
+        self.interval_seconds = interval_seconds
+        self.segment_size = segment_size
+        self.min_messages = min_messages
+        self.chats_per_sweep = chats_per_sweep
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._counters = {"sweeps": 0, "chats_archived": 0, "messages_archived": 0, "chats_skipped": 0}
+
+    # ──────────────────────────────────────────────────────────────
+    # lifecycle
+    # ──────────────────────────────────────────────────────────────
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="message-archiver", daemon=True)
+        self._thread.start()
+        logger.info("Message archiver started")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Message archiver stopped")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Message archive sweep failed: {e}\n{format_exc()}")
+            self._stop.wait(self.interval_seconds)
+
+    # ──────────────────────────────────────────────────────────────
+    # one sweep
+    # ──────────────────────────────────────────────────────────────
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        before = (now or datetime.utcnow()) - self.archive_after
+        archived = 0
+        for shard in range(self.chat_shards.shard_count):
+            if self._stop.is_set():
+                break
+            session = self.chat_shards.session_for_shard(shard)
+            try:
+                repo = self.message_repository(session=session)
+                for chat_id, user_id in repo.chats_to_archive(
+                    before=before, min_messages=self.min_messages, limit=self.chats_per_sweep
+                ):
+                    if self._stop.is_set():
+                        break
+                    if not self._owns(shard, user_id):
+                        self._counters["chats_skipped"] += 1
+                        continue
+                    try:
+                        count = repo.archive_messages(chat_id=chat_id, before=before, segment_size=self.segment_size)
+                    except HTTPException as e:
+                        # Fenced by a move that started after the lookup
+                        session.rollback()
+                        self._counters["chats_skipped"] += 1
+                        logger.info(f"Skipped archiving chat {chat_id}: {e.detail}")
+                        continue
+                    if count:
+                        archived += count
+                        self._counters["chats_archived"] += 1
+                        self._counters["messages_archived"] += count
+            finally:
+                session.close()
+        self._counters["sweeps"] += 1
+        if archived:
+            logger.info(f"Archived {archived} messages older than {before:%Y-%m-%d}")
+        return archived
+
+    def _owns(self, shard: int, user_id: int) -> bool:
+        try:
+            return self.chat_shards.shard_for(user_id) == shard
+        except HTTPException:
+            # Being moved right now
+            return False
+
+    def metrics(self) -> dict:
+        return dict(self._counters)
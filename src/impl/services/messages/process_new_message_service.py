@@ -15,11 +15,16 @@ from db.models.message import Message              # ORM row type
 
 logger = logging.getLogger(__name__)
 
+# Journal entries related to the user's message that are passed to the LLM
+JOURNAL_CONTEXT_ENTRIES = 3
+JOURNAL_CONTEXT_MIN_SCORE = 0.2
+JOURNAL_CONTEXT_CHARS = 300
+
 
 class ProcessNewMessageService:
     """
     • Persist the user's message
-    • Build chat history for the LLM
+    • Build chat history for the LLM, with related journal entries as context
     • Generate & persist assistant reply
     • Return `NewMessageResponse`
     """
@@ -54,7 +59,48 @@ class ProcessNewMessageService:
     # internal helpers
     # ----------------------------
     def _open_session(self):
-        return self.deps.session_factory()()
+        # The user's chat shard (db/sharding.py)
+        return self.deps.chat_shards().session_for(self.user_id)
+
+    def _add_llm_operation(self, session, llm_operation) -> None:
+        """llm_operations lives on the primary; commit it there when the chat is on another shard."""
+        if self.deps.chat_shards().shard_for(self.user_id) == 0:
+            session.add(llm_operation)
+            return
+        primary = self.deps.session_factory()()
+        try:
+            primary.add(llm_operation)
+            primary.commit()
+        except SQLAlchemyError:
+            primary.rollback()
+            raise
+        finally:
+            primary.close()
+
+    def _journal_context(self) -> Optional[str]:
+        """The user's journal entries closest to the new message, or None; never fails the reply."""
+        try:
+            neighbours = self.deps.journal_embedding_store().similar_to_text(
+                self.user_id, self.req.message, k=JOURNAL_CONTEXT_ENTRIES
+            )
+            entry_ids = [entry_id for entry_id, score in neighbours if score >= JOURNAL_CONTEXT_MIN_SCORE]
+            if not entry_ids:
+                return None
+            session = self.deps.session_factory().for_read(self.user_id)
+            try:
+                entries = self.deps.journal_repository(session=session).get_entries_by_ids(self.user_id, entry_ids)
+            finally:
+                session.close()
+        except Exception as exc:
+            logger.warning("Journal context unavailable: %s", exc)
+            return None
+        if not entries:
+            return None
+        lines = [
+            f"- {entry.created_at:%Y-%m-%d} ({entry.mood}): {entry.content[:JOURNAL_CONTEXT_CHARS]}"
+            for entry in entries
+        ]
+        return "Related journal entries of the user:\n" + "\n".join(lines)
 
     # ----------------------------
     # main workflow
@@ -101,7 +147,10 @@ class ProcessNewMessageService:
                 )
 
             # 5 ─ Generate assistant reply
-            ai_text, usage_data = backend.produce_ai_response(history_count=self.history_size)
+            ai_text, usage_data = backend.produce_ai_response(
+                history_count=self.history_size,
+                context=self._journal_context(),
+            )
             
             # Save LLM usage data if available
             if usage_data:
@@ -111,7 +160,7 @@ class ProcessNewMessageService:
                     operation_type='chat_message',
                     usage_data=usage_data
                 )
-                session.add(llm_operation)
+                self._add_llm_operation(session, llm_operation)
 
             # 6 ─ Persist assistant message
             ai_msg_row: Message = msg_repo.insert_message(
@@ -0,0 +1,51 @@
+# impl/services/timezones.py
+"""
+Timezone parsing shared by journal analytics and affirmation scheduling.
+
+Accepts the formats listed in timezone_format_note.md: IANA names
+("Europe/London"), UTC offsets ("UTC-5", "UTC+5:30") and the common
+abbreviations.  Abbreviations map to the IANA zone users mean by them, so
+"EST" follows New York's daylight saving rules.
+"""
+import logging
+import re
+from datetime import timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+ABBREVIATIONS = {
+    "GMT": "UTC",
+    "EST": "America/New_York", "EDT": "America/New_York",
+    "CST": "America/Chicago", "CDT": "America/Chicago",
+    "MST": "America/Denver", "MDT": "America/Denver",
+    "PST": "America/Los_Angeles", "PDT": "America/Los_Angeles",
+    "BST": "Europe/London", "CET": "Europe/Paris", "CEST": "Europe/Paris",
+    "IST": "Asia/Kolkata", "JST": "Asia/Tokyo", "AEST": "Australia/Sydney",
+}
+
+_offset_re = re.compile(r"^(?:UTC|GMT)\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def resolve_timezone(name: Optional[str]):
+    """Return a tzinfo for an IANA name, a 'UTC±H[:MM]' offset or an abbreviation, falling back to UTC."""
+    if not name or not name.strip():
+        return timezone.utc
+    name = name.strip()
+
+    match = _offset_re.match(name)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return timezone(-offset if sign == "-" else offset)
+
+    name = ABBREVIATIONS.get(name.upper(), name)
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.debug(f"Unknown timezone '{name}', using UTC")
+        return timezone.utc
@@ -1,9 +1,16 @@
-from app import app
-
 import logging
 logger = logging.getLogger(__name__)
 import sys
-from app import app
+
+
+# Imported lazily: the password hasher's spawned pool workers re-import this
+# module as __mp_main__ and must not build the app and its container.
+# `uvicorn main:app` still resolves it through __getattr__.
+def __getattr__(name):
+    if name == "app":
+        from app import app
+        return app
+    raise AttributeError(name)
 
 
 
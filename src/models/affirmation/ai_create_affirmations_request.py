@@ -37,7 +37,7 @@ class AiCreateAffirmationsRequest(BaseModel):
     context_corpus: StrictStr = Field(description="User's context data (goals, blocks, journal entries, etc.)")
     journal_id: Optional[StrictInt] = Field(default=None, description="Optional journal entry ID to base affirmations on")
     affirmation_category: Optional[AffirmationCategory] = None
-    amount: Optional[Annotated[int, Field(le=20, strict=True, ge=1)]] = Field(default=5, description="Number of affirmations to generate")
+    amount: Optional[Annotated[int, Field(le=50, strict=True, ge=1)]] = Field(default=5, description="Number of affirmations to generate")
     style: StrictStr = Field(description="Communication style preference")
     uslub: StrictStr = Field(description="Tone and approach style")
     __properties: ClassVar[List[str]] = ["context_corpus", "journal_id", "affirmation_category", "amount", "style", "uslub"]
@@ -0,0 +1,104 @@
+# coding: utf-8
+
+"""
+    PowerManifest Affirmations API
+
+    API for managing personalized affirmations in the PowerManifest life coaching app
+
+    The version of the OpenAPI document: 1.0.0
+    Contact: api@powermanifest.com
+    Generated by OpenAPI Generator (https://openapi-generator.tech)
+
+    Do not edit the class manually.
+"""  # noqa: E501
+
+
+from __future__ import annotations
+import pprint
+import re  # noqa: F401
+import json
+
+
+
+
+from pydantic import BaseModel, ConfigDict, Field, StrictStr, field_validator
+from typing import Any, ClassVar, Dict, List, Optional
+try:
+    from typing import Self
+except ImportError:
+    from typing_extensions import Self
+
+class GetAffirmationAudio200Response(BaseModel):
+    """
+    GetAffirmationAudio200Response
+    """ # noqa: E501
+    status: StrictStr = Field(description="ready when the audio can be fetched, pending while it is synthesized")
+    audio_key: Optional[StrictStr] = None
+    audio_url: Optional[StrictStr] = None
+    media_type: Optional[StrictStr] = None
+    __properties: ClassVar[List[str]] = ["status", "audio_key", "audio_url", "media_type"]
+
+    @field_validator('status')
+    def status_validate_enum(cls, value):
+        """Validates the enum"""
+        if value not in ('ready', 'pending',):
+            raise ValueError("must be one of enum values ('ready', 'pending')")
+        return value
+
+    model_config = {
+        "populate_by_name": True,
+        "validate_assignment": True,
+        "protected_namespaces": (),
+    }
+
+
+    def to_str(self) -> str:
+        """Returns the string representation of the model using alias"""
+        return pprint.pformat(self.model_dump(by_alias=True))
+
+    def to_json(self) -> str:
+        """Returns the JSON representation of the model using alias"""
+        # TODO: pydantic v2: use .model_dump_json(by_alias=True, exclude_unset=True) instead
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, json_str: str) -> Self:
+        """Create an instance of GetAffirmationAudio200Response from a JSON string"""
+        return cls.from_dict(json.loads(json_str))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the dictionary representation of the model using alias.
+
+        This has the following differences from calling pydantic's
+        `self.model_dump(by_alias=True)`:
+
+        * `None` is only added to the output dict for nullable fields that
+          were set at model initialization. Other fields with value `None`
+          are ignored.
+        """
+        _dict = self.model_dump(
+            by_alias=True,
+            exclude={
+            },
+            exclude_none=True,
+        )
+        return _dict
+
+    @classmethod
+    def from_dict(cls, obj: Dict) -> Self:
+        """Create an instance of GetAffirmationAudio200Response from a dict"""
+        if obj is None:
+            return None
+
+        if not isinstance(obj, dict):
+            return cls.model_validate(obj)
+
+        _obj = cls.model_validate({
+            "status": obj.get("status"),
+            "audio_key": obj.get("audio_key"),
+            "audio_url": obj.get("audio_url"),
+            "media_type": obj.get("media_type")
+        })
+        return _obj
+
+
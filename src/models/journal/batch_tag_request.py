@@ -28,14 +28,14 @@ class BatchTagRequest(BaseModel):
     """  # noqa: E501
     action: StrictStr = Field(description="Action to perform")
     entryIds: List[StrictStr] = Field(description="Entry IDs to update", alias="entryIds")
-    tags: List[StrictStr] = Field(description="Tags to add or remove")
+    tags: List[StrictStr] = Field(description="Tags to add, remove or replace with")
     __properties: ClassVar[List[str]] = ["action", "entryIds", "tags"]
 
     @field_validator('action')
     def action_validate_enum(cls, value):
         """Validates the enum"""
-        if value not in ('add', 'remove'):
-            raise ValueError("must be one of enum values ('add', 'remove')")
+        if value not in ('add', 'remove', 'replace'):
+            raise ValueError("must be one of enum values ('add', 'remove', 'replace')")
         return value
 
     model_config = {
@@ -15,7 +15,7 @@ from fastapi.security import (  # noqa: F401
     SecurityScopes,
 )
 from fastapi.security.api_key import APIKeyCookie, APIKeyHeader, APIKeyQuery
-from fastapi import Depends, HTTPException, Security
+from fastapi import Depends, HTTPException, Request, Security
 
 from models.extra_models import TokenModel
 
@@ -34,10 +34,14 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def get_token_bearerAuth(credentials: HTTPAuthorizationCredentials = Depends(bearer_auth)) -> TokenModel:
+def get_token_bearerAuth(request: Request, credentials: HTTPAuthorizationCredentials = Depends(bearer_auth)) -> TokenModel:
     """
     Check and retrieve authentication information from custom bearer token.
 
+    Tokens verified before are answered from the services' token_cache
+    without decoding them again.  Either way the token is checked against
+    token_revocations, which answers from memory.
+
     :param credentials: Credentials provided by Authorization header
     :type credentials: HTTPAuthorizationCredentials
     :return: Decoded token information or None if token is invalid
@@ -49,6 +53,16 @@ def get_token_bearerAuth(credentials: HTTPAuthorizationCredentials = Depends(bea
         logger.error("No credentials provided")
         raise HTTPException(status_code=403, detail="No authorization header")
     
+    services = getattr(request.app.state, "services", None)
+    token_cache = services.token_cache() if services is not None else None
+    revocations = services.token_revocations() if services is not None else None
+    if token_cache is not None:
+        cached = token_cache.get(credentials.credentials)
+        if cached is not None:
+            if revocations is not None and revocations.is_revoked(cached.sub, cached.jti, cached.token_epoch):
+                raise HTTPException(status_code=401, detail="Token has been revoked")
+            return TokenModel(sub=cached.sub)
+    
     try:
         # logger.debug(f"Credentials scheme: {credentials.scheme}")
         # logger.debug(f"Attempting to decode token: {credentials.credentials[:20] if credentials.credentials else 'NO TOKEN'}...")
@@ -62,10 +76,20 @@ def get_token_bearerAuth(credentials: HTTPAuthorizationCredentials = Depends(bea
             logger.error("No 'sub' field in token payload")
             raise HTTPException(status_code=401, detail="Invalid token")
 
+        if revocations is not None and revocations.is_revoked(user_id, payload.get("jti"), payload.get("tep")):
+            logger.debug(f"Revoked token presented for user {user_id}")
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+
+        # Tokens without an expiry are never cached
+        if token_cache is not None and payload.get("exp") is not None:
+            token_cache.put(credentials.credentials, str(user_id), payload["exp"], payload.get("jti"), payload.get("tep"))
+
         # Populate TokenModel with the relevant information
         return TokenModel(sub=user_id)
         # return user_id
 
+    except HTTPException:
+        raise
     except JWTError as e:
         logger.error(f"JWT decode error: {str(e)}")
         raise HTTPException(status_code=401, detail="Invalid token")